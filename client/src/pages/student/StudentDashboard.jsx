@@ -5,6 +5,21 @@ import { Calendar as CalendarIcon, TrendingUp, CheckCircle2, XCircle, Users, Mes
 import { useAuth } from '../../context/AuthContext';
 import { useNavigate } from 'react-router-dom';
 
+// Expand the compact calendar payload (bit d-1 of each mask = day d) into per-day records
+const decodeCalendar = ({ month, days, present, absent, absent_ids, reasons }) => {
+    const records = [];
+    for (let day = 1; day <= days; day++) {
+        const bit = 2 ** (day - 1);
+        const date = `${month}-${String(day).padStart(2, '0')}`;
+        if (Math.floor(present / bit) % 2) {
+            records.push({ date, status: 'PRESENT' });
+        } else if (Math.floor(absent / bit) % 2) {
+            records.push({ id: absent_ids[day], date, status: 'ABSENT', absence_reason: reasons[day] || null });
+        }
+    }
+    return records;
+};
+
 const StudentDashboard = () => {
     const [selectedMonth, setSelectedMonth] = useState(format(new Date(), 'yyyy-MM'));
     const [attendance, setAttendance] = useState([]);
@@ -20,8 +35,8 @@ const StudentDashboard = () => {
     const fetchAttendance = useCallback(async () => {
         setLoading(true);
         try {
-            const response = await api.get(`/student/attendance/?month=${selectedMonth}`);
-            setAttendance(response.data);
+            const response = await api.get(`/student/attendance/calendar/?month=${selectedMonth}`);
+            setAttendance(decodeCalendar(response.data));
         } catch (error) {
             console.error('Failed to fetch attendance:', error);
             setMsg('Error loading attendance');
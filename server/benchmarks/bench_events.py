@@ -0,0 +1,83 @@
+"""
+Fan-out of attendance change events (core.events) to many open dashboards.
+
+--streams subscriptions (each watching one of --classrooms classrooms) wait on one
+event loop while a writer thread publishes --writes roll-call changes over
+--seconds, the way a morning of marking looks to a process serving SSE streams.
+Reports how many messages the streams received in total against the writes made
+(the coalescing), and the broker's cost per published change.
+
+    python -m benchmarks.bench_events --streams 500 --writes 2000 --seconds 5
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from benchmarks.common import setup_django
+
+
+async def run(num_streams, num_classrooms, num_writes, seconds, window):
+    from core.events import Broker, Subscription
+
+    broker = Broker()
+    loop = asyncio.get_running_loop()
+    subscriptions = [Subscription(loop, classroom_id=i % num_classrooms) for i in range(num_streams)]
+    for subscription in subscriptions:
+        broker.subscribe(subscription)
+
+    received = [0] * num_streams
+    done = asyncio.Event()
+
+    async def listen(index, subscription):
+        while not done.is_set():
+            if await subscription.next_batch(window, 0.1) is not None:
+                received[index] += 1
+
+    dispatch_time = [0.0]
+
+    def write():
+        for i in range(num_writes):
+            classroom_id = random.randrange(num_classrooms)
+            change = {'dates': ['2025-03-03'], 'students': {i: [classroom_id]}}
+            started = time.perf_counter()
+            broker.dispatch(change)
+            dispatch_time[0] += time.perf_counter() - started
+            time.sleep(seconds / num_writes)
+
+    listeners = [asyncio.create_task(listen(i, s)) for i, s in enumerate(subscriptions)]
+    await asyncio.to_thread(write)
+    await asyncio.sleep(window + 0.2)
+    done.set()
+    await asyncio.gather(*listeners)
+
+    return {
+        'streams': num_streams,
+        'classrooms': num_classrooms,
+        'writes': num_writes,
+        'seconds': seconds,
+        'batch_window_s': window,
+        # Without coalescing every write would reach every stream watching its classroom
+        'messages_uncoalesced': num_writes * num_streams // num_classrooms,
+        'messages_sent': sum(received),
+        'max_messages_per_stream': max(received),
+        'dispatch_us_per_write': round(dispatch_time[0] / num_writes * 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--streams', type=int, default=500)
+    parser.add_argument('--classrooms', type=int, default=20)
+    parser.add_argument('--writes', type=int, default=2000)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--window', type=float, default=1.0, help='EVENTS_BATCH_SECONDS')
+    args = parser.parse_args()
+
+    setup_django()
+    print(json.dumps(asyncio.run(run(args.streams, args.classrooms, args.writes, args.seconds, args.window)), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Throughput of the CSV import pipeline (core.imports) in rows per second:
+
+  roster               import_roster over --students rows
+  attendance_insert    import_attendance of --students x --days new rows
+  attendance_update    the same file again, so every row hits ON CONFLICT DO UPDATE
+  rollup_rebuild       the single rebuild_rollups() call that ends an attendance import
+
+    python -m benchmarks.bench_import --students 2000 --days 100
+"""
+import argparse
+import io
+import json
+import time
+from datetime import date, timedelta
+
+from benchmarks.common import setup_django, test_database
+
+
+def make_csv(students, days):
+    roster = io.StringIO()
+    roster.write('username,first_name,last_name,classroom\n')
+    for i in range(students):
+        roster.write(f'import{i},Student,{i},Class {i % 40}\n')
+
+    attendance = io.StringIO()
+    attendance.write('username,date,status,absence_reason\n')
+    start = date(2024, 9, 2)
+    for d in range(days):
+        day = (start + timedelta(days=d)).isoformat()
+        for i in range(students):
+            if (i + d) % 13 == 0:
+                attendance.write(f'import{i},{day},ABSENT,Sick\n')
+            else:
+                attendance.write(f'import{i},{day},PRESENT,\n')
+    return roster.getvalue(), attendance.getvalue()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def run(students, days, batch_size):
+    from unittest import mock
+    from core import imports
+
+    roster, attendance = make_csv(students, days)
+    rows = students * days
+
+    def drain(progress):
+        for event in progress:
+            pass
+        return event
+
+    results = {'students': students, 'days': days, 'batch_size': batch_size}
+    _, seconds = timed(lambda: drain(imports.import_roster(
+        imports.read_csv(io.StringIO(roster), imports.ROSTER_COLUMNS), batch_size=batch_size
+    )))
+    results['roster'] = {'rows_per_s': round(students / seconds)}
+
+    rebuilds = []
+    with mock.patch.object(imports, 'rebuild_rollups', side_effect=lambda *a: rebuilds.append(a)):
+        for name in ('attendance_insert', 'attendance_update'):
+            _, seconds = timed(lambda: drain(imports.import_attendance(
+                imports.read_csv(io.StringIO(attendance), imports.ATTENDANCE_COLUMNS), None, batch_size=batch_size
+            )))
+            results[name] = {'rows_per_s': round(rows / seconds)}
+
+    _, seconds = timed(lambda: imports.rebuild_rollups(*rebuilds[-1]))
+    results['rollup_rebuild'] = {'seconds': round(seconds, 3)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=100)
+    parser.add_argument('--batch-size', type=int, default=10000)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        print(json.dumps(run(args.students, args.days, args.batch_size), indent=2))
+
+
+if __name__ == '__main__':
+    main()
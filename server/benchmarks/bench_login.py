@@ -0,0 +1,94 @@
+"""
+Login throughput on POST /api/auth/login/ for each available password hasher:
+
+  <hasher>             logins/s with the stored hash already in that hasher's format
+  <hasher>+pool        the same through core.backends.ProcessPoolModelBackend
+
+Concurrent logins run in --concurrency threads against the in-process test client,
+roughly how a threaded WSGI worker or an ASGI worker's thread pool sees a login spike.
+
+    python -m benchmarks.bench_login --users 200 --concurrency 8
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import setup_django, test_database
+
+PASSWORD = 'exam-morning-8:55'
+
+
+def available_hashers():
+    import importlib.util
+    from django.conf import settings
+
+    hashers = {
+        'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+    }
+    if importlib.util.find_spec('argon2'):
+        hashers['argon2'] = 'django.contrib.auth.hashers.Argon2PasswordHasher'
+    if importlib.util.find_spec('bcrypt'):
+        hashers['bcrypt'] = 'django.contrib.auth.hashers.BCryptSHA256PasswordHasher'
+    return {name: [path] + [p for p in settings.PASSWORD_HASHERS if p != path] for name, path in hashers.items()}
+
+
+def login_rate(usernames, concurrency):
+    from django.test import Client
+
+    local = threading.local()
+
+    def one(username):
+        if not hasattr(local, 'client'):
+            local.client = Client()
+        response = local.client.post('/api/auth/login/', {'username': username, 'password': PASSWORD},
+                                     content_type='application/json')
+        assert response.status_code == 200, response.content[:200]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, usernames))
+    return len(usernames) / (time.perf_counter() - started)
+
+
+def run(num_users, concurrency):
+    from django.contrib.auth.hashers import make_password
+    from django.db import connections
+    from django.test.utils import override_settings
+    from core.backends import shutdown_pool
+    from core.models import User
+
+    results = {'users': num_users, 'concurrency': concurrency, 'cpus': os.cpu_count(), 'logins_per_s': {}}
+    for name, hashers in available_hashers().items():
+        with override_settings(PASSWORD_HASHERS=hashers):
+            User.objects.all().delete()
+            encoded = make_password(PASSWORD)
+            User.objects.bulk_create([
+                User(username=f'login{i}', password=encoded, role=User.Role.STUDENT) for i in range(num_users)
+            ])
+            usernames = [f'login{i}' for i in range(num_users)]
+            results['logins_per_s'][name] = round(login_rate(usernames, concurrency), 1)
+            with override_settings(AUTHENTICATION_BACKENDS=['core.backends.ProcessPoolModelBackend']):
+                results['logins_per_s'][f'{name}+pool'] = round(login_rate(usernames, concurrency), 1)
+            # Workers captured this iteration's PASSWORD_HASHERS when they started
+            shutdown_pool()
+        connections.close_all()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        print(json.dumps(run(args.users, args.concurrency), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Requests/s with and without persistent or pooled database connections.
+
+Each configuration runs in its own process with the CAS_DB_* environment
+variables from config/settings.py, and drives Django's WSGI handler directly
+(unlike the test client, it opens and closes connections per request exactly
+as a real server does). It uses the configured database, not a test database,
+so seed it first:
+
+    CAS_DB_ENGINE=sqlite CAS_DB_NAME=/tmp/bench.sqlite3 python manage.py migrate
+    CAS_DB_ENGINE=sqlite CAS_DB_NAME=/tmp/bench.sqlite3 python manage.py seed_data --classrooms 2 --students 20 --days 20
+    CAS_DB_ENGINE=sqlite CAS_DB_NAME=/tmp/bench.sqlite3 python -m benchmarks.bench_pooling --requests 2000
+
+Against Postgres, drop CAS_DB_ENGINE/CAS_DB_NAME; the pooled configuration
+needs psycopg 3 with the pool extra (pip install "psycopg[pool]").
+"""
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from benchmarks.common import BASE_DIR, setup_django
+
+CONFIGURATIONS = {
+    'no_persistence': {'CAS_DB_CONN_MAX_AGE': '0', 'CAS_DB_POOL': '0'},
+    'persistent': {'CAS_DB_CONN_MAX_AGE': '600', 'CAS_DB_POOL': '0', 'CAS_DB_CONN_HEALTH_CHECKS': '0'},
+    'persistent_health_checks': {'CAS_DB_CONN_MAX_AGE': '600', 'CAS_DB_POOL': '0', 'CAS_DB_CONN_HEALTH_CHECKS': '1'},
+    'pool': {'CAS_DB_POOL': '1'},
+}
+
+
+def call(handler, path, token=None, method='GET', body=None):
+    data = json.dumps(body).encode() if body is not None else b''
+    path, _, query = path.partition('?')
+    environ = {
+        'REQUEST_METHOD': method, 'PATH_INFO': path, 'QUERY_STRING': query,
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(data), 'CONTENT_LENGTH': str(len(data)), 'CONTENT_TYPE': 'application/json',
+    }
+    if token:
+        environ['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+    result = {}
+
+    def start_response(status, headers, exc_info=None):
+        result['status'] = int(status.split()[0])
+
+    response = handler(environ, start_response)
+    content = b''.join(response)
+    # Closing the response fires request_finished, which closes or keeps the connection
+    response.close()
+    return result['status'], content
+
+
+def worker(num_requests, concurrency):
+    """Runs inside the per-configuration subprocess."""
+    setup_django()
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connection
+
+    handler = WSGIHandler()
+    status, content = call(handler, '/api/auth/login/', method='POST',
+                           body={'username': 'student1', 'password': 'password123'})
+    if status != 200:
+        raise SystemExit(f'Login failed ({status}); seed the database with seed_data --classrooms first')
+    token = json.loads(content)['access']
+    # Always touches the database, unlike /me/ with the cached user lookup
+    path = f'/api/student/attendance/?month={date.today():%Y-%m}'
+
+    def one(_):
+        status, _ = call(handler, path, token)
+        return status
+
+    call(handler, path, token)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        statuses = list(pool.map(one, range(num_requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        'requests_per_s': round(num_requests / elapsed, 1),
+        'mean_ms': round(elapsed / num_requests * concurrency * 1000, 3),
+        'errors': sum(1 for s in statuses if s != 200),
+        'vendor': connection.vendor,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--configurations', nargs='*', default=list(CONFIGURATIONS))
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(worker(args.requests, args.concurrency)))
+        return
+
+    results = {'requests': args.requests, 'concurrency': args.concurrency, 'configurations': {}}
+    for name in args.configurations:
+        env = {**os.environ, **CONFIGURATIONS[name]}
+        if name == 'pool' and env.get('CAS_DB_ENGINE') == 'sqlite':
+            results['configurations'][name] = {'skipped': 'pooling needs PostgreSQL with psycopg 3'}
+            continue
+        completed = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_pooling', '--worker',
+             '--requests', str(args.requests), '--concurrency', str(args.concurrency)],
+            cwd=BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if completed.returncode:
+            results['configurations'][name] = {'error': completed.stderr.strip().splitlines()[-1:]}
+        else:
+            results['configurations'][name] = json.loads(completed.stdout.strip().splitlines()[-1])
+        print(f'{name:26} {results["configurations"][name]}', file=sys.stderr, flush=True)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
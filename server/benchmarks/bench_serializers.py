@@ -0,0 +1,73 @@
+"""
+Latency per 1,000 AttendanceRecords for the list serialization paths:
+
+  model_serializer     AttendanceRecordSerializer, no select_related (one query per row)
+  select_related       AttendanceRecordSerializer over a select_related('student') queryset
+  values_fast_path     record_values() + serialize_record_rows(), as the list views now do
+
+    python -m benchmarks.bench_serializers --records 5000
+"""
+import argparse
+import json
+from datetime import date, timedelta
+
+from benchmarks.common import setup_django, test_database, best_of
+
+
+def seed(num_records, students=50):
+    from core.models import User, AttendanceRecord
+
+    User.objects.bulk_create([
+        User(username=f'bench{i}', first_name=f'Bench {i}', role=User.Role.STUDENT) for i in range(students)
+    ])
+    student_ids = list(User.objects.values_list('id', flat=True))
+    days = -(-num_records // students)
+    rows = [
+        AttendanceRecord(student_id=student_id, date=date(2024, 1, 1) + timedelta(days=d),
+                         status='ABSENT' if (d + i) % 5 == 0 else 'PRESENT')
+        for d in range(days)
+        for i, student_id in enumerate(student_ids)
+    ][:num_records]
+    AttendanceRecord.objects.bulk_create(rows, batch_size=5000)
+
+
+def run(num_records, repeat):
+    from django.db import connection, reset_queries
+    from django.test.utils import CaptureQueriesContext
+    from core.models import AttendanceRecord
+    from core.serializers import AttendanceRecordSerializer, record_values, serialize_record_rows
+
+    seed(num_records)
+    records = AttendanceRecord.objects.order_by('date', 'id')
+    paths = {
+        'model_serializer': lambda: AttendanceRecordSerializer(records.all(), many=True).data,
+        'select_related': lambda: AttendanceRecordSerializer(records.select_related('student'), many=True).data,
+        'values_fast_path': lambda: serialize_record_rows(record_values(records.all())),
+    }
+
+    results = {'records': num_records, 'paths': {}}
+    for name, fn in paths.items():
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            fn()
+        seconds = best_of(fn, repeat)
+        results['paths'][name] = {
+            'ms_per_1000': round(seconds * 1000 / num_records * 1000, 3),
+            'queries': len(queries),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        print(json.dumps(run(args.records, args.repeat), indent=2))
+
+
+if __name__ == '__main__':
+    main()
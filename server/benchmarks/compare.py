@@ -0,0 +1,58 @@
+"""
+Compare two benchmark reports from benchmarks.run and flag regressions.
+
+    python -m benchmarks.compare before.json after.json --threshold 20
+
+Exits with status 1 when any endpoint's p95 latency grew by more than --threshold
+percent, or its queries per request increased.
+"""
+import argparse
+import json
+import sys
+
+
+def compare(before, after, threshold):
+    rows, regressions = [], []
+    for name, new in sorted(after['endpoints'].items()):
+        old = before['endpoints'].get(name)
+        if not old:
+            rows.append((name, None, new['p95_ms'], None, old, new))
+            continue
+        change = (new['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100 if old['p95_ms'] else 0.0
+        rows.append((name, old['p95_ms'], new['p95_ms'], change, old, new))
+        more_queries = (
+            old.get('queries_per_request') is not None and new.get('queries_per_request') is not None
+            and new['queries_per_request'] > old['queries_per_request']
+        )
+        if change > threshold or more_queries:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=20.0, help='Allowed p95 growth in percent')
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    print(f"{before['meta'].get('commit', '?')[:10]} -> {after['meta'].get('commit', '?')[:10]}")
+    rows, regressions = compare(before, after, args.threshold)
+    for name, old_p95, new_p95, change, old, new in rows:
+        queries = f"{(old or {}).get('queries_per_request')} -> {new.get('queries_per_request')}"
+        delta = f'{change:+.1f}%' if change is not None else 'new'
+        flag = '  REGRESSION' if name in regressions else ''
+        print(f'{name:32} p95 {old_p95} -> {new_p95} ms ({delta}), queries {queries}{flag}')
+
+    if regressions:
+        print(f'{len(regressions)} regression(s): {", ".join(regressions)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,323 @@
+"""
+Load-test every endpoint in core/urls.py and report latency, queries and throughput as JSON.
+
+In-process mode (default) seeds a synthetic school into a throwaway test database
+with `seed_data --classrooms/--students/--days` and drives the Django test client,
+which also lets it count queries per request:
+
+    python -m benchmarks.run --classrooms 5 --students 40 --days 60 --output before.json
+
+Live mode drives a running server over HTTP instead (seed its database first with
+the same seed_data options; query counts are not available):
+
+    python -m benchmarks.run --url http://localhost:8000/api --concurrency 16
+
+Compare two runs with `python -m benchmarks.compare before.json after.json`.
+SQLite serialises writers, so keep --concurrency at 1 for in-process runs on SQLite.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from benchmarks.common import BASE_DIR, setup_django, test_database
+
+PASSWORD = 'password123'
+
+# Operational routes that are not part of the user-facing workload, multipart uploads
+# (covered by benchmarks.bench_import instead) and never-ending event streams
+# (benchmarks.bench_events)
+EXCLUDED_ROUTES = {
+    'metrics', 'roster_import', 'attendance_import',
+    'async_attendance_events', 'async_classroom_attendance_events', 'async_student_attendance_events',
+    # Needs a finished job, i.e. a running `manage.py run_workers`
+    'job_download',
+}
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=BASE_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class InProcessTransport:
+    """Django test client per thread, counting queries on that thread's connection."""
+    counts_queries = True
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def client(self):
+        if not hasattr(self.local, 'client'):
+            from django.test import Client
+            self.local.client = Client()
+        return self.local.client
+
+    def request(self, method, path, token=None, body=None):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        call = getattr(self.client(), method.lower())
+        kwargs = {'data': json.dumps(body), 'content_type': 'application/json'} if body is not None else {}
+        with CaptureQueriesContext(connection) as queries:
+            response = call(f'/api/{path}', **kwargs, **headers)
+            content = b''.join(response.streaming_content) if response.streaming else response.content
+        return response.status_code, content, len(queries)
+
+    def close(self):
+        from django.db import connections
+        connections.close_all()
+
+
+class HttpTransport:
+    counts_queries = False
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, token=None, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(f'{self.base_url}/{path}', data=data, method=method)
+        request.add_header('Content-Type', 'application/json')
+        if token:
+            request.add_header('Authorization', f'Bearer {token}')
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                return response.status, response.read(), None
+        except urllib.error.HTTPError as e:
+            return e.code, e.read(), None
+
+    def close(self):
+        pass
+
+
+def login(transport, username):
+    status, content, _ = transport.request('POST', 'auth/login/', body={'username': username, 'password': PASSWORD})
+    if status != 200:
+        raise SystemExit(f'Login failed for {username}: {status} {content[:200]!r}')
+    return json.loads(content)['access']
+
+
+def latest_weekday():
+    day = date.today()
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+
+def build_scenarios(transport):
+    """
+    One scenario per named route: name -> (method, path, role, body).
+    IDs are discovered through the API so the same code works in both modes.
+    """
+    teacher = login(transport, 'teacher')
+    student = login(transport, 'student1')
+
+    def get_json(path, token):
+        status, content, _ = transport.request('GET', path, token)
+        return json.loads(content) if status == 200 else None
+
+    day = latest_weekday()
+    month = day.strftime('%Y-%m')
+    classrooms = get_json('teacher/classrooms/', teacher) or []
+    classroom_id = classrooms[0]['id'] if classrooms else None
+    roster = get_json(f'teacher/classrooms/{classroom_id}/students/', teacher) if classroom_id else []
+    if not roster:
+        roster = get_json('teacher/students/?page_size=40', teacher)['results']
+    student_ids = [s['id'] for s in roster]
+    # Before the week the roll-call and ingest scenarios overwrite with PRESENT
+    window_start = (day - timedelta(days=6)).isoformat()
+    own_records = [
+        record
+        for m in (month, (day.replace(day=1) - timedelta(days=1)).strftime('%Y-%m'))
+        for record in get_json(f'student/attendance/?month={m}', student) or []
+    ]
+    absent = next((r['id'] for r in own_records if r['status'] == 'ABSENT' and r['date'] < window_start), None)
+
+    roll_call = {'date': day.isoformat(), 'records': [{'student_id': i, 'status': 'PRESENT'} for i in student_ids]}
+    week = {'start_date': window_start, 'end_date': day.isoformat(),
+            'status': 'PRESENT', 'overwrite': False}
+    # A week of queued roll calls with fixed keys: after the first request every
+    # repetition is the flaky-connection retry, answered from the stored receipts
+    ingest = {'roll_calls': [
+        {'key': f'benchmark-{offset}', 'date': (day - timedelta(days=offset)).isoformat(), 'records': roll_call['records']}
+        for offset in range(7)
+    ]}
+    tokens = {'teacher': teacher, 'student': student}
+    # Queued only (nothing runs workers here), which is enough to read its status
+    export = f'teacher/attendance/export/?start={day.replace(day=1)}&end={day}'
+    _, content, _ = transport.request('POST', export, teacher)
+    job_id = json.loads(content)['id']
+
+    scenarios = {
+        'token_obtain_pair': ('POST', 'auth/login/', None, {'username': 'teacher', 'password': PASSWORD}),
+        'user_me': ('GET', 'me/', 'student', None),
+        'student_list': ('GET', 'teacher/students/?page_size=100', 'teacher', None),
+        'attendance_list': ('GET', f'teacher/attendance/?date={day}', 'teacher', None),
+        'attendance_mark': ('POST', 'teacher/attendance/mark/', 'teacher', roll_call),
+        'attendance_ingest': ('POST', 'teacher/attendance/ingest/', 'teacher', ingest),
+        'student_attendance_list': ('GET', f'student/attendance/?month={month}', 'student', None),
+        'student_attendance_calendar': ('GET', f'student/attendance/calendar/?month={month}', 'student', None),
+        'attendance_changes': ('GET', f'teacher/attendance/changes/?start={day}&end={day}', 'teacher', None),
+        'student_attendance_changes': ('GET', f'student/attendance/changes/?start={day.replace(day=1)}', 'student', None),
+        'class_analytics': ('GET', f'teacher/analytics/class/?month={month}', 'teacher', None),
+        'student_analytics': ('GET', f'teacher/analytics/student/?month={month}&student_id={student_ids[0]}', 'teacher', None),
+        'bulk_attendance': ('POST', 'teacher/attendance/bulk/', 'teacher',
+                            {'student_id': student_ids[0], 'month': month, 'status': 'PRESENT', 'overwrite': False}),
+        'bulk_attendance_range': ('POST', 'teacher/attendance/bulk/range/', 'teacher', {**week, 'student_ids': student_ids[:5]}),
+        'classroom_list': ('GET', 'teacher/classrooms/', 'teacher', None),
+        'attendance_export': ('GET', export, 'teacher', None),
+        # Request-side cost of handing the same backfill to a worker
+        'bulk_attendance_range_background': ('POST', 'teacher/attendance/bulk/range/?background=1', 'teacher',
+                                             {**week, 'student_ids': student_ids[:5]}),
+        'job_list': ('GET', 'teacher/jobs/?page_size=50', 'teacher', None),
+        'job_detail': ('GET', f'teacher/jobs/{job_id}/', 'teacher', None),
+    }
+    # Async counterparts (core.async_views); serve with uvicorn and use --url to see the concurrency gain
+    for name in ('student_attendance_list', 'attendance_list', 'class_analytics', 'student_analytics'):
+        method, path, role, body = scenarios[name]
+        scenarios[f'async_{name}'] = (method, f'async/{path}', role, body)
+    if absent:
+        scenarios['student_absence_reason_update'] = (
+            'PATCH', f'student/attendance/{absent}/reason/', 'student', {'absence_reason': 'Benchmark'}
+        )
+    if classroom_id:
+        scoped = f'teacher/classrooms/{classroom_id}'
+        scenarios.update({
+            'classroom_student_list': ('GET', f'{scoped}/students/', 'teacher', None),
+            'classroom_attendance_list': ('GET', f'{scoped}/attendance/?date={day}', 'teacher', None),
+            'classroom_attendance_mark': ('POST', f'{scoped}/attendance/mark/', 'teacher', roll_call),
+            'classroom_attendance_ingest': ('POST', f'{scoped}/attendance/ingest/', 'teacher', {'roll_calls': [
+                {**item, 'key': f'classroom-{item["key"]}'} for item in ingest['roll_calls']
+            ]}),
+            'classroom_bulk_attendance': ('POST', f'{scoped}/attendance/bulk/', 'teacher', week),
+            'classroom_analytics': ('GET', f'{scoped}/analytics/?month={month}', 'teacher', None),
+            'classroom_attendance_changes': ('GET', f'{scoped}/attendance/changes/?start={day}&end={day}', 'teacher', None),
+            'classroom_attendance_matrix': ('GET', f'{scoped}/attendance/matrix/?month={month}', 'teacher', None),
+            'async_classroom_attendance_list': ('GET', f'async/{scoped}/attendance/?date={day}', 'teacher', None),
+            'async_classroom_analytics': ('GET', f'async/{scoped}/analytics/?month={month}', 'teacher', None),
+            'classroom_attendance_export': ('GET', f'{scoped}/attendance/export/?start={day.replace(day=1)}&end={day}', 'teacher', None),
+        })
+    return scenarios, tokens
+
+
+def run_scenario(transport, scenario, tokens, num_requests, concurrency):
+    method, path, role, body = scenario
+    token = tokens.get(role)
+
+    def one(_):
+        start = time.perf_counter()
+        status, content, queries = transport.request(method, path, token, body)
+        return time.perf_counter() - start, status, len(content), queries
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(one, range(num_requests)))
+    wall = time.perf_counter() - started
+
+    latencies = [s[0] * 1000 for s in samples]
+    statuses = {}
+    for _, status, _, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    queries = [s[3] for s in samples if s[3] is not None]
+    return {
+        'requests': num_requests,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(statistics.mean(latencies), 3),
+        'throughput_rps': round(num_requests / wall, 1),
+        'queries_per_request': round(statistics.mean(queries), 2) if queries else None,
+        'response_bytes': round(statistics.mean(s[2] for s in samples)),
+        'status': statuses,
+    }
+
+
+def run(transport, args):
+    from core.urls import urlpatterns
+
+    scenarios, tokens = build_scenarios(transport)
+    if args.endpoints:
+        scenarios = {name: s for name, s in scenarios.items() if name in args.endpoints}
+
+    results = {}
+    for name, scenario in scenarios.items():
+        for _ in range(args.warmup):
+            transport.request(scenario[0], scenario[1], tokens.get(scenario[2]), scenario[3])
+        results[name] = run_scenario(transport, scenario, tokens, args.requests, args.concurrency)
+        failed = {code: count for code, count in results[name]['status'].items() if not code.startswith('2')}
+        if failed:
+            raise SystemExit(f'{name}: non-2xx responses {failed} from {scenario[0]} {scenario[1]}')
+        print(f"{name:32} p50={results[name]['p50_ms']:>9}ms p95={results[name]['p95_ms']:>9}ms "
+              f"q={results[name]['queries_per_request']}", flush=True)
+
+    route_names = {p.name for p in urlpatterns if p.name}
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'mode': 'http' if args.url else 'in-process',
+            'size': {'classrooms': args.classrooms, 'students': args.students, 'days': args.days},
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'not_benchmarked': sorted(route_names - set(scenarios) - EXCLUDED_ROUTES),
+        },
+        'endpoints': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='Base API URL of a running server, e.g. http://localhost:8000/api')
+    parser.add_argument('--classrooms', type=int, default=3)
+    parser.add_argument('--students', type=int, default=30, help='Students per classroom')
+    parser.add_argument('--days', type=int, default=40)
+    parser.add_argument('--requests', type=int, default=50, help='Requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--warmup', type=int, default=2, help='Unmeasured requests per endpoint')
+    parser.add_argument('--endpoints', nargs='*', help='Only run these route names')
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    args = parser.parse_args()
+
+    setup_django()
+    if args.url:
+        report = run(HttpTransport(args.url), args)
+    else:
+        from django.core.management import call_command
+        with test_database():
+            call_command('seed_data', classrooms=args.classrooms, students=args.students, days=args.days)
+            transport = InProcessTransport()
+            try:
+                report = run(transport, args)
+            finally:
+                transport.close()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,9 @@
 
 from pathlib import Path
+import importlib.util
 import os
 from datetime import timedelta
+from django.core.exceptions import ImproperlyConfigured
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -27,6 +29,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.metrics.MetricsMiddleware', # First, so it times the whole stack
     'corsheaders.middleware.CorsMiddleware', # Check this
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -57,16 +60,120 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'cas_db',       # Assuming this DB name
-        'USER': 'postgres',     # Trying system user
-        'PASSWORD': 'admin', # Empty password for local trust/peer auth
-        'HOST': 'localhost',
-        'PORT': '5432',
+# Database, configured from the environment. Defaults match the local development setup.
+#   CAS_DB_ENGINE            postgresql (default) or sqlite (a stand-in for local runs and benchmarks)
+#   CAS_DB_NAME/USER/PASSWORD/HOST/PORT
+#   CAS_DB_CONN_MAX_AGE      seconds to keep a connection open between requests (default 0 closes it after each).
+#                            WSGI only: under ASGI connections are bound to threads, so use CAS_DB_POOL or pgbouncer
+#   CAS_DB_CONN_HEALTH_CHECKS  1 to ping a reused connection before its first query in a request
+#   CAS_DB_POOL              1 to use psycopg 3's connection pool (Django 5.1+, pip install "psycopg[pool]");
+#                            sized by CAS_DB_POOL_MIN_SIZE/MAX_SIZE, waits CAS_DB_POOL_TIMEOUT seconds for a free
+#                            connection. Pooling replaces persistent connections, so CONN_MAX_AGE is forced to 0.
+#   CAS_DB_PGBOUNCER         1 when connecting through pgbouncer in transaction mode: disables server-side
+#                            cursors (so .iterator() fetches client-side). Django already leaves psycopg 3's
+#                            prepared statements and server-side binding off, which pgbouncer also needs.
+_DB_ENGINE = os.environ.get('CAS_DB_ENGINE', 'postgresql')
+if _DB_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('CAS_DB_NAME', str(BASE_DIR / 'db.sqlite3')),
+            'OPTIONS': {
+                # WAL lets readers run alongside the single writer; IMMEDIATE avoids upgrade deadlocks
+                'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    }
+elif _DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('CAS_DB_NAME', 'cas_db'),
+            'USER': os.environ.get('CAS_DB_USER', 'postgres'),
+            'PASSWORD': os.environ.get('CAS_DB_PASSWORD', 'admin'),
+            'HOST': os.environ.get('CAS_DB_HOST', 'localhost'),
+            'PORT': os.environ.get('CAS_DB_PORT', '5432'),
+            'OPTIONS': {},
+        }
+    }
+    if os.environ.get('CAS_DB_POOL') == '1':
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('CAS_DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('CAS_DB_POOL_MAX_SIZE', 10)),
+            'timeout': float(os.environ.get('CAS_DB_POOL_TIMEOUT', 10)),
+        }
+    if os.environ.get('CAS_DB_PGBOUNCER') == '1':
+        DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+else:
+    raise ImproperlyConfigured('CAS_DB_ENGINE must be postgresql or sqlite')
+
+DATABASES['default']['CONN_MAX_AGE'] = (
+    0 if 'pool' in DATABASES['default'].get('OPTIONS', {}) else int(os.environ.get('CAS_DB_CONN_MAX_AGE', 0))
+)
+DATABASES['default']['CONN_HEALTH_CHECKS'] = os.environ.get('CAS_DB_CONN_HEALTH_CHECKS', '1') == '1'
+
+# Local-memory cache by default. LocMem is per-process, so multi-worker deployments
+# should set CAS_REDIS_URL (or CAS_CACHE_DIR for a shared file-based cache) to keep
+# write-through invalidation visible to every worker.
+if os.environ.get('CAS_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['CAS_REDIS_URL'],
+        }
+    }
+elif os.environ.get('CAS_CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ['CAS_CACHE_DIR'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'cas-default',
+        }
     }
-}
+
+# Analytics response cache TTLs (seconds). Writes invalidate explicitly; the TTL
+# is only a safety net, so closed months can live much longer.
+ANALYTICS_CACHE_TTL = int(os.environ.get('CAS_ANALYTICS_CACHE_TTL', 60))
+ANALYTICS_CACHE_PAST_TTL = int(os.environ.get('CAS_ANALYTICS_CACHE_PAST_TTL', 7 * 24 * 3600))
+
+# Seconds an authenticated user's row is cached by CachedJWTAuthentication (0 disables)
+AUTH_USER_CACHE_TTL = int(os.environ.get('CAS_AUTH_USER_CACHE_TTL', 300))
+
+# Seconds the attendance change feed (core.sync) holds its cursor back, so rows from
+# transactions that commit late are not skipped
+SYNC_SETTLE_SECONDS = int(os.environ.get('CAS_SYNC_SETTLE_SECONDS', 5))
+
+# First month of the academic year (8 = August). AttendanceRecord partitions on
+# PostgreSQL (core.partitions) and archive_year (core.archive) work in academic years.
+ACADEMIC_YEAR_START_MONTH = int(os.environ.get('CAS_ACADEMIC_YEAR_START_MONTH', 8))
+
+# Background jobs (core.jobs, run by `manage.py run_workers`). Uploads waiting to be
+# imported and finished exports are kept under JOBS_DIR, which workers must share.
+JOBS_DIR = os.environ.get('CAS_JOBS_DIR', str(BASE_DIR / 'jobs'))
+JOBS_PROGRESS_SECONDS = float(os.environ.get('CAS_JOBS_PROGRESS_SECONDS', 1.0))
+JOBS_HEARTBEAT_SECONDS = float(os.environ.get('CAS_JOBS_HEARTBEAT_SECONDS', 30))
+JOBS_STALE_SECONDS = int(os.environ.get('CAS_JOBS_STALE_SECONDS', 600))
+JOBS_MAX_ATTEMPTS = int(os.environ.get('CAS_JOBS_MAX_ATTEMPTS', 3))
+# Uploads and exports under JOBS_DIR are deleted this long after they were written (0 keeps them)
+JOBS_FILE_RETENTION_SECONDS = int(os.environ.get('CAS_JOBS_FILE_RETENTION_SECONDS', 7 * 24 * 3600))
+
+# Server push of attendance changes (core.events). Streams send at most one message
+# per EVENTS_BATCH_SECONDS; EVENTS_REDIS_URL relays changes between processes.
+EVENTS_BATCH_SECONDS = float(os.environ.get('CAS_EVENTS_BATCH_SECONDS', 1.0))
+EVENTS_HEARTBEAT_SECONDS = float(os.environ.get('CAS_EVENTS_HEARTBEAT_SECONDS', 15))
+EVENTS_REDIS_URL = os.environ.get('CAS_EVENTS_REDIS_URL')
+
+# Request instrumentation (core.metrics), scraped from /api/metrics/ by admin users.
+# Requests slower than METRICS_SLOW_REQUEST_MS are logged with their slowest SQL (0 = off).
+METRICS_ENABLED = os.environ.get('CAS_METRICS_ENABLED', '1') == '1'
+METRICS_SLOW_REQUEST_MS = int(os.environ.get('CAS_SLOW_REQUEST_MS', 0))
 
 AUTH_USER_MODEL = 'core.User'
 
@@ -85,6 +192,33 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing. CAS_PASSWORD_HASHER picks the hasher for new and rehashed passwords:
+# argon2 (pip install argon2-cffi), bcrypt (pip install bcrypt) or pbkdf2 (default).
+# The others stay listed when importable, so existing hashes still verify and are
+# upgraded to the preferred hasher transparently on the user's next successful login.
+_PASSWORD_HASHERS = {
+    'argon2': ('django.contrib.auth.hashers.Argon2PasswordHasher', 'argon2'),
+    'bcrypt': ('django.contrib.auth.hashers.BCryptSHA256PasswordHasher', 'bcrypt'),
+    'pbkdf2': ('django.contrib.auth.hashers.PBKDF2PasswordHasher', None),
+    'pbkdf2_sha1': ('django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher', None),
+    'scrypt': ('django.contrib.auth.hashers.ScryptPasswordHasher', None),
+}
+PASSWORD_HASHER = os.environ.get('CAS_PASSWORD_HASHER', 'pbkdf2')
+if PASSWORD_HASHER not in _PASSWORD_HASHERS:
+    raise ImproperlyConfigured(f'CAS_PASSWORD_HASHER must be one of {", ".join(_PASSWORD_HASHERS)}')
+if _PASSWORD_HASHERS[PASSWORD_HASHER][1] and not importlib.util.find_spec(_PASSWORD_HASHERS[PASSWORD_HASHER][1]):
+    raise ImproperlyConfigured(f'CAS_PASSWORD_HASHER={PASSWORD_HASHER} needs the {_PASSWORD_HASHERS[PASSWORD_HASHER][1]} package')
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER][0]] + [
+    path for name, (path, module) in _PASSWORD_HASHERS.items()
+    if name != PASSWORD_HASHER and (module is None or importlib.util.find_spec(module))
+]
+
+# CAS_AUTH_PROCESS_POOL=N verifies login passwords in a pool of N worker processes
+# (core.backends), so a login spike uses every core and never blocks an ASGI worker.
+AUTH_PROCESS_POOL_SIZE = int(os.environ.get('CAS_AUTH_PROCESS_POOL', 0))
+if AUTH_PROCESS_POOL_SIZE:
+    AUTHENTICATION_BACKENDS = ['core.backends.ProcessPoolModelBackend']
+
 LANGUAGE_CODE = 'en-us'
 
 TIME_ZONE = 'Asia/Kolkata'
@@ -101,8 +235,11 @@ CORS_ALLOW_ALL_ORIGINS = True # For dev
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        'core.authentication.CachedJWTAuthentication',
+    ),
+    # Keyset pagination; opt-in per request with ?page_size= or ?cursor=
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
+    'PAGE_SIZE': 100,
 }
 
 SIMPLE_JWT = {
@@ -1,3 +1,29 @@
 from django.contrib import admin
+from .attendance import delete_records, records_changed
+from .models import AttendanceRecord
 
-# Register your models here.
+@admin.register(AttendanceRecord)
+class AttendanceRecordAdmin(admin.ModelAdmin):
+    list_display = ('date', 'student', 'status', 'marked_by', 'updated_at')
+    list_filter = ('status', 'date')
+    search_fields = ('student__username', 'student__first_name')
+    raw_id_fields = ('student', 'marked_by')
+
+    # Admin edits bypass the API views, so they report changes to the same hook
+    def save_model(self, request, obj, form, change):
+        students, dates = {obj.student_id}, {obj.date}
+        if change:
+            # Moving a record vacates its old (student, date) slot
+            students.add(form.initial.get('student', obj.student_id))
+            dates.add(form.initial.get('date', obj.date))
+        super().save_model(request, obj, form, change)
+        records_changed(students, dates)
+
+    # Deletes go through delete_records() so the change feed sees them
+    def delete_model(self, request, obj):
+        delete_records(AttendanceRecord.objects.filter(pk=obj.pk))
+        records_changed([obj.student_id], [obj.date])
+
+    def delete_queryset(self, request, queryset):
+        affected = delete_records(queryset)
+        records_changed({student_id for student_id, _ in affected}, {d for _, d in affected})
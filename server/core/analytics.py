@@ -0,0 +1,107 @@
+"""
+Shared analytics queries for the teacher dashboards.
+
+Counts come from the rollup tables maintained by core.rollups, so a month costs
+O(days) rather than O(records): the class view is one query, the student view
+one rollup lookup plus the absence list. Rollups outlive archiving (core.archive),
+so archived academic years are served the same way, with the absence list read
+from the archive.
+"""
+from django.db.models import Q
+
+from .archive import aarchived_absences, archived_absences
+from .models import AttendanceRecord, DailyAttendanceRollup, MonthlyStudentRollup
+
+ABSENT = Q(status=AttendanceRecord.Status.ABSENT)
+
+
+def rate(present, total):
+    return round(present / total * 100, 1) if total > 0 else 0
+
+
+def month_records(start, end, **filters):
+    """Records in the half-open [start, end) range, additionally filtered by `filters`."""
+    return AttendanceRecord.objects.filter(date__gte=start, date__lt=end, **filters)
+
+
+def _class_daily_rows(start, end, classroom_id):
+    return DailyAttendanceRollup.objects.filter(
+        classroom_id=classroom_id, date__gte=start, date__lt=end
+    ).values('date', 'present', 'absent', 'total').order_by('date')
+
+
+def _class_overview(daily_stats):
+    daily = []
+    totals = {'total': 0, 'present': 0, 'absent': 0}
+    for day in daily_stats:
+        for key in totals:
+            totals[key] += day[key]
+        daily.append({
+            'date': day['date'],
+            'present': day['present'],
+            'absent': day['absent'],
+            'rate': rate(day['present'], day['total'])
+        })
+
+    overview = {
+        'total_records': totals['total'],
+        'present': totals['present'],
+        'absent': totals['absent'],
+        'attendance_rate': rate(totals['present'], totals['total'])
+    }
+    return overview, daily
+
+
+def class_summary(start, end, classroom_id=None):
+    """
+    Overview and daily breakdown for [start, end), read from DailyAttendanceRollup.
+    One query over at most one row per day; classroom_id=None is the whole school.
+    """
+    return _class_overview(_class_daily_rows(start, end, classroom_id))
+
+
+async def aclass_summary(start, end, classroom_id=None):
+    """Async ORM version of class_summary()."""
+    return _class_overview([day async for day in _class_daily_rows(start, end, classroom_id)])
+
+
+def _student_counts(student_id, start):
+    return MonthlyStudentRollup.objects.filter(
+        student_id=student_id, month=start
+    ).values('total', 'present', 'absent')
+
+
+def _student_absences(student_id, start, end):
+    return month_records(start, end, student_id=student_id).filter(ABSENT).order_by('date').values('id', 'date', 'absence_reason')
+
+
+def _student_stats(counts):
+    counts = counts or {'total': 0, 'present': 0, 'absent': 0}
+    return {
+        'total': counts['total'],
+        'present': counts['present'],
+        'absent': counts['absent'],
+        'rate': rate(counts['present'], counts['total'])
+    }
+
+
+def student_summary(student_id, start, end):
+    """
+    Stats for one student's month from MonthlyStudentRollup, plus the absence list
+    from the raw records: two queries in total, three for an archived month.
+    """
+    stats = _student_stats(_student_counts(student_id, start).first())
+    absences = list(_student_absences(student_id, start, end))
+    if stats['absent'] and not absences:
+        # Absences counted but none live: the month's year has been archived
+        absences = archived_absences(student_id, start, end)
+    return stats, absences
+
+
+async def astudent_summary(student_id, start, end):
+    """Async ORM version of student_summary()."""
+    stats = _student_stats(await _student_counts(student_id, start).afirst())
+    absences = [row async for row in _student_absences(student_id, start, end)]
+    if stats['absent'] and not absences:
+        absences = await aarchived_absences(student_id, start, end)
+    return stats, absences
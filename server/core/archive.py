@@ -0,0 +1,167 @@
+"""
+Archival of closed academic years.
+
+archive_year() moves a finished year's AttendanceRecords out of the live table
+into AttendanceArchive: one row per student and year, holding that student's
+records as zlib-compressed column-oriented JSON (a few hundred bytes for a full
+year). On PostgreSQL the year's emptied partition is then dropped (core.partitions).
+
+Archived years stay visible through the analytics views. Their counts live in
+the rollup tables, which archiving leaves alone and rebuild_rollups() skips, and
+the student view reads its absence list from the archive when no live absences
+remain for the month. Lists, calendars, exports and the change feed only cover
+live records. restore_year() moves a year back into the live table, e.g. to
+correct it; until then, writes to an archived year are not counted in its rollups.
+
+Archiving does not go through records_changed(): nothing about the attendance
+changed, so there are no rollup refreshes, tombstones or change events. Change-feed
+clients (core.sync) are therefore not told that archived records left the live
+table; they keep their copies, which stay correct, and can drop a closed year by date.
+"""
+import json
+import zlib
+from datetime import date as date_cls, datetime, timedelta
+
+from django.db import transaction
+
+from .models import AttendanceArchive, AttendanceRecord
+from .partitions import drop_year_partition, restore_year_partition
+from .rollups import rebuild_rollups
+from .utils import academic_year, academic_year_bounds
+
+COLUMNS = ('id', 'date', 'status', 'absence_reason', 'marked_by_id', 'marked_at', 'updated_at')
+BATCH_SIZE = 500
+DELETE_CHUNK = 5000
+
+
+class ArchiveError(Exception):
+    """The year cannot be archived or restored as asked."""
+
+
+def pack(rows):
+    """zlib-compressed {column: [values]} JSON for `rows`, dicts with COLUMNS."""
+    columns = {name: [] for name in COLUMNS}
+    for row in rows:
+        for name in COLUMNS:
+            value = row[name]
+            columns[name].append(value.isoformat() if isinstance(value, (date_cls, datetime)) else value)
+    return zlib.compress(json.dumps(columns, separators=(',', ':')).encode(), 9)
+
+
+def unpack(data):
+    """The rows packed by pack(), with dates and timestamps parsed back."""
+    columns = json.loads(zlib.decompress(bytes(data)))
+    rows = [dict(zip(COLUMNS, values)) for values in zip(*(columns[name] for name in COLUMNS))]
+    for row in rows:
+        row['date'] = date_cls.fromisoformat(row['date'])
+        row['marked_at'] = datetime.fromisoformat(row['marked_at'])
+        row['updated_at'] = datetime.fromisoformat(row['updated_at'])
+    return rows
+
+
+def archive_year(year, batch_size=BATCH_SIZE, today=None):
+    """
+    Move academic year `year`'s records into AttendanceArchive, `batch_size` students
+    per transaction. Safe to re-run after an interruption, or to sweep up records
+    written since: they are merged into the existing archives.
+    Returns (students, records) archived.
+    """
+    start, end = academic_year_bounds(year)
+    if end > (today or date_cls.today()):
+        raise ArchiveError(f'The {year} academic year has not ended yet')
+
+    records = AttendanceRecord.objects.filter(date__gte=start, date__lt=end)
+    student_ids = list(records.order_by('student_id').values_list('student_id', flat=True).distinct())
+    archived = 0
+    for i in range(0, len(student_ids), batch_size):
+        batch = student_ids[i:i + batch_size]
+        with transaction.atomic():
+            rows = {}
+            for archive in AttendanceArchive.objects.select_for_update().filter(year=year, student_id__in=batch):
+                rows[archive.student_id] = {row['id']: row for row in unpack(archive.records)}
+            # Locked so an update cannot land between packing a row and deleting it
+            live = (records.select_for_update().filter(student_id__in=batch)
+                    .order_by('student_id', 'date').values('student_id', *COLUMNS))
+            packed = []
+            for row in live:
+                rows.setdefault(row.pop('student_id'), {})[row['id']] = row
+                packed.append(row['id'])
+            archived += len(packed)
+            AttendanceArchive.objects.bulk_create(
+                [
+                    AttendanceArchive(
+                        student_id=student_id, year=year, count=len(by_id),
+                        records=pack(sorted(by_id.values(), key=lambda row: (row['date'], row['id']))),
+                    )
+                    for student_id, by_id in rows.items()
+                ],
+                update_conflicts=True,
+                unique_fields=['year', 'student'],
+                update_fields=['records', 'count', 'archived_at'],
+            )
+            # Only the rows packed above: one inserted meanwhile stays live for the next run.
+            # A plain DELETE: no tombstones or rollup refreshes (see the module docstring)
+            for j in range(0, len(packed), DELETE_CHUNK):
+                AttendanceRecord.objects.filter(id__in=packed[j:j + DELETE_CHUNK]).delete()
+    drop_year_partition(year)
+    return len(student_ids), archived
+
+
+def restore_year(year, batch_size=BATCH_SIZE):
+    """
+    Move academic year `year`'s archives back into AttendanceRecord, keeping their ids.
+    Live records written for the same day since win. Returns the number of archived records.
+    Restored records get fresh timestamps, so change-feed clients pick them up again.
+    """
+    if not AttendanceArchive.objects.filter(year=year).exists():
+        raise ArchiveError(f'The {year} academic year is not archived')
+    restore_year_partition(year)
+
+    restored = 0
+    while True:
+        with transaction.atomic():
+            archives = list(
+                AttendanceArchive.objects.select_for_update().filter(year=year).order_by('student_id')[:batch_size]
+            )
+            if not archives:
+                break
+            records = [
+                AttendanceRecord(
+                    id=row['id'], date=row['date'], student_id=archive.student_id, status=row['status'],
+                    absence_reason=row['absence_reason'], marked_by_id=row['marked_by_id'],
+                )
+                for archive in archives
+                for row in unpack(archive.records)
+            ]
+            AttendanceRecord.objects.bulk_create(records, ignore_conflicts=True)
+            AttendanceArchive.objects.filter(pk__in=[archive.pk for archive in archives]).delete()
+            restored += len(records)
+
+    # Writes made while the year was archived were left out of its rollups
+    start, end = academic_year_bounds(year)
+    rebuild_rollups(start, end - timedelta(days=1))
+    return restored
+
+
+def _absences(archive, start, end):
+    if archive is None:
+        return []
+    return [
+        {'id': row['id'], 'date': row['date'], 'absence_reason': row['absence_reason']}
+        for row in unpack(archive.records)
+        if start <= row['date'] < end and row['status'] == AttendanceRecord.Status.ABSENT
+    ]
+
+
+def _archive_for(student_id, start):
+    return AttendanceArchive.objects.filter(student_id=student_id, year=academic_year(start)).only('records')
+
+
+def archived_absences(student_id, start, end):
+    """A student's archived absences in [start, end), shaped like the live absence list."""
+    return _absences(_archive_for(student_id, start).first(), start, end)
+
+
+async def aarchived_absences(student_id, start, end):
+    """Async ORM version of archived_absences()."""
+    return _absences(await _archive_for(student_id, start).afirst(), start, end)
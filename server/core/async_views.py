@@ -0,0 +1,215 @@
+"""
+Async versions of the hot read endpoints, for deployment under an ASGI server.
+
+These are plain Django async views on the async ORM (aget, afirst, async for),
+so a slow database round-trip suspends a coroutine instead of holding a worker
+thread. Responses match their DRF counterparts in core.views. Differences:
+- list endpoints accept ?fields= but are never paginated;
+- authentication is CachedJWTAuthentication.aauthenticate.
+They are routed under /api/async/ with the same paths as the sync views.
+
+attendance_events is async-only: a Server-Sent Events stream of attendance changes.
+"""
+import asyncio
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework import exceptions, status
+
+from .analytics import aclass_summary, astudent_summary
+from .attendance import AttendanceValidationError, parse_date
+from .authentication import CachedJWTAuthentication
+from .cache import acached_response, agenerated_key, class_key, student_key
+from .events import Subscription, broker
+from .models import User, AttendanceRecord, Classroom
+from .serializers import AttendanceRecordSerializer, record_values, serialize_record_rows
+from .utils import parse_month
+
+
+def error(message, status_code, key='error'):
+    return JsonResponse({key: message}, status=status_code)
+
+
+def async_api_view(role=None, query_token=False):
+    """
+    GET-only async view with JWT authentication and an optional role check.
+    Errors use the same bodies and status codes as the DRF views.
+    With query_token, a ?token= access token is accepted when there is no
+    Authorization header (EventSource cannot send headers).
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return error('Method "%s" not allowed.' % request.method, status.HTTP_405_METHOD_NOT_ALLOWED, 'detail')
+            authenticator = CachedJWTAuthentication()
+            try:
+                user = await authenticator.aauthenticate(request)
+                if user is None and query_token and request.GET.get('token'):
+                    user = await authenticator.aget_user(authenticator.get_validated_token(request.GET['token']))
+                if user is None:
+                    raise exceptions.NotAuthenticated()
+            except exceptions.APIException as e:
+                # Same body as DRF's exception handler
+                data = e.detail if isinstance(e.detail, (list, dict)) else {'detail': e.detail}
+                response = JsonResponse(data, status=e.status_code, safe=False)
+                response['WWW-Authenticate'] = authenticator.authenticate_header(request)
+                return response
+            request.user = user
+            if role is not None and user.role != role:
+                return error('Only teachers can access this data', status.HTTP_403_FORBIDDEN)
+            return await view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def projected_fields(request):
+    """Validated ?fields= list, or None for every field. Raises ValueError naming unknown fields."""
+    raw = request.GET.get('fields')
+    if not raw:
+        return None
+    requested = [name.strip() for name in raw.split(',') if name.strip()]
+    unknown = [name for name in requested if name not in AttendanceRecordSerializer.Meta.fields]
+    if unknown:
+        raise ValueError(f'Unknown fields: {", ".join(unknown)}')
+    return requested
+
+
+async def record_list(request, records):
+    try:
+        fields = projected_fields(request)
+    except ValueError as e:
+        return JsonResponse({'fields': [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
+    rows = [row async for row in record_values(records, fields)]
+    return JsonResponse(serialize_record_rows(rows, fields), safe=False)
+
+
+async def classroom_or_404(classroom_id):
+    if classroom_id is not None and not await Classroom.objects.filter(pk=classroom_id).aexists():
+        return error('Classroom not found', status.HTTP_404_NOT_FOUND, 'detail')
+    return None
+
+
+@async_api_view()
+async def student_attendance(request):
+    """Async StudentAttendanceListView: the student's own records for ?month=YYYY-MM."""
+    month = request.GET.get('month')
+    if request.user.role != User.Role.STUDENT or not month:
+        return JsonResponse([], safe=False)
+    try:
+        start, end = parse_month(month)
+    except ValueError:
+        return JsonResponse([], safe=False)
+    records = AttendanceRecord.objects.filter(student=request.user, date__gte=start, date__lt=end).order_by('date')
+    return await record_list(request, records)
+
+
+@async_api_view()
+async def attendance_list(request, classroom_id=None):
+    """Async AttendanceListView: every record for ?date=YYYY-MM-DD, optionally for one classroom."""
+    missing = await classroom_or_404(classroom_id)
+    if missing:
+        return missing
+    if not request.GET.get('date'):
+        return JsonResponse([], safe=False)
+    try:
+        date = parse_date(request.GET['date'])
+    except AttendanceValidationError:
+        return error('Invalid date format. Use YYYY-MM-DD', status.HTTP_400_BAD_REQUEST)
+    records = AttendanceRecord.objects.filter(date=date)
+    if classroom_id is not None:
+        records = records.filter(student__enrollments__classroom_id=classroom_id)
+    return await record_list(request, records)
+
+
+@async_api_view(role=User.Role.TEACHER)
+async def class_analytics(request, classroom_id=None):
+    """Async ClassMonthlySummaryView."""
+    month_str = request.GET.get('month')
+    if not month_str:
+        return error('Month parameter is required', status.HTTP_400_BAD_REQUEST)
+    try:
+        start, end = parse_month(month_str)
+    except ValueError:
+        return error('Invalid month format. Use YYYY-MM', status.HTTP_400_BAD_REQUEST)
+    missing = await classroom_or_404(classroom_id)
+    if missing:
+        return missing
+
+    async def compute():
+        overview, daily_breakdown = await aclass_summary(start, end, classroom_id)
+        return {'month': f'{start:%Y-%m}', 'overview': overview, 'daily': daily_breakdown}
+
+    key = await agenerated_key(class_key, start, classroom_id)
+    return await acached_response(request, key, start, compute)
+
+
+@async_api_view(role=User.Role.TEACHER)
+async def student_analytics(request):
+    """Async StudentMonthlySummaryView."""
+    month_str = request.GET.get('month')
+    student_id = request.GET.get('student_id')
+    if not month_str or not student_id:
+        return error('Month and student_id are required', status.HTTP_400_BAD_REQUEST)
+    try:
+        start, end = parse_month(month_str)
+        student_id = int(student_id)
+    except ValueError:
+        return error('Invalid format', status.HTTP_400_BAD_REQUEST)
+
+    async def compute():
+        stats, absences = await astudent_summary(student_id, start, end)
+        return {'student_id': student_id, 'month': f'{start:%Y-%m}', 'stats': stats, 'absences': absences}
+
+    key = await agenerated_key(student_key, start, student_id)
+    return await acached_response(request, key, start, compute)
+
+
+@async_api_view(query_token=True)
+async def attendance_events(request, classroom_id=None):
+    """
+    Server-Sent Events: an `attendance` event with {classrooms, dates, students} whenever
+    records in scope change, coalesced to at most one per EVENTS_BATCH_SECONDS.
+    Teachers get every classroom, or one when routed under it, optionally only for
+    ?date=YYYY-MM-DD; students get their own records. Fetch the changes themselves
+    from the change feed (or the list endpoints).
+    """
+    user = request.user
+    date = student_id = None
+    if user.role == User.Role.TEACHER:
+        missing = await classroom_or_404(classroom_id)
+        if missing:
+            return missing
+        if request.GET.get('date'):
+            try:
+                date = parse_date(request.GET['date']).isoformat()
+            except AttendanceValidationError:
+                return error('Invalid date format. Use YYYY-MM-DD', status.HTTP_400_BAD_REQUEST)
+    else:
+        classroom_id, student_id = None, user.id
+
+    window = settings.EVENTS_BATCH_SECONDS
+    heartbeat = settings.EVENTS_HEARTBEAT_SECONDS
+
+    async def stream():
+        # Subscribed on the first read, so a response that is never sent leaks nothing
+        subscription = Subscription(asyncio.get_running_loop(), classroom_id, student_id, date)
+        broker.subscribe(subscription)
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                batch = await subscription.next_batch(window, heartbeat)
+                if batch is None:
+                    yield ': keepalive\n\n'
+                else:
+                    yield f'event: attendance\ndata: {json.dumps(batch)}\n\n'
+        finally:
+            broker.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,287 @@
+"""
+Set-based write paths for AttendanceRecord.
+
+Views validate their payloads and hand the resulting rows to these helpers so
+the number of queries stays constant regardless of class size.
+"""
+from datetime import date as date_cls, timedelta
+
+from django.db import transaction
+
+from .models import User, AttendanceRecord, AttendanceTombstone
+from .rollups import refresh_rollups
+from .cache import invalidate_analytics
+from .events import publish_changes
+
+VALID_STATUSES = {choice for choice, _ in AttendanceRecord.Status.choices}
+
+
+class AttendanceValidationError(Exception):
+    """Raised when an attendance payload fails validation. Carries per-row errors."""
+
+    def __init__(self, errors):
+        super().__init__('Invalid attendance payload')
+        self.errors = errors
+
+
+def parse_date(value):
+    if isinstance(value, date_cls):
+        return value
+    try:
+        return date_cls.fromisoformat(str(value))
+    except ValueError:
+        raise AttendanceValidationError([{'date': 'Invalid date format. Use YYYY-MM-DD'}])
+
+
+def records_changed(student_ids, dates):
+    """
+    Single hook for every AttendanceRecord write path.
+    Call it with the students and dates that were created, updated or deleted.
+    """
+    refresh_rollups(student_ids, dates)
+    invalidate_analytics(student_ids, dates)
+    publish_changes(student_ids, dates)
+
+
+def enrollments_changed(student_ids):
+    """
+    Hook for new enrollments: the students' existing records now count towards
+    their new classrooms. Refreshes rollups and cached analytics on every date they
+    have records; no change events, since no record changed.
+    """
+    dates = set(AttendanceRecord.objects.filter(student_id__in=student_ids).values_list('date', flat=True).distinct())
+    refresh_rollups(student_ids, dates)
+    invalidate_analytics(student_ids, dates)
+
+
+def delete_records(queryset):
+    """
+    Delete AttendanceRecords, leaving a tombstone for each so the change feed
+    (core.sync) reports the deletion. Returns the (student_id, date) pairs deleted;
+    callers still report them through records_changed().
+    """
+    with transaction.atomic():
+        deleted = list(queryset.values_list('id', 'student_id', 'date'))
+        if deleted:
+            AttendanceTombstone.objects.bulk_create([
+                AttendanceTombstone(record_id=record_id, student_id=student_id, date=day)
+                for record_id, student_id, day in deleted
+            ])
+            AttendanceRecord.objects.filter(id__in=[record_id for record_id, _, _ in deleted]).delete()
+    return [(student_id, day) for _, student_id, day in deleted]
+
+
+def mark_student_dates(student_id, dates, status_val, marked_by, overwrite=True):
+    """
+    Mark one student `status_val` on `dates` (BulkAttendanceView). With `overwrite`,
+    existing records on those dates are replaced; otherwise they are kept.
+    Returns the number of records created.
+    """
+    with transaction.atomic():
+        if overwrite:
+            # Replaced records are tombstoned for the change feed
+            delete_records(AttendanceRecord.objects.filter(student_id=student_id, date__in=dates))
+            to_create = dates
+        else:
+            existing = set(AttendanceRecord.objects.filter(
+                student_id=student_id, date__in=dates
+            ).values_list('date', flat=True))
+            to_create = [d for d in dates if d not in existing]
+
+        if to_create:
+            AttendanceRecord.objects.bulk_create([
+                AttendanceRecord(student_id=student_id, date=d, status=status_val, marked_by=marked_by)
+                for d in to_create
+            ])
+            # Only the dates written: kept records need no rollup refresh or change event
+            records_changed([student_id], to_create)
+    return len(to_create)
+
+
+def known_students(student_ids, classroom_id=None):
+    """The subset of `student_ids` that are students (enrolled in `classroom_id`, if given)."""
+    students = User.objects.filter(id__in=student_ids, role=User.Role.STUDENT)
+    if classroom_id is not None:
+        students = students.filter(enrollments__classroom_id=classroom_id)
+    return set(students.values_list('id', flat=True))
+
+
+def parse_student_ids(values):
+    """The distinct integer ids in a student_ids list; each one that is not an integer is reported by index."""
+    ids = set()
+    errors = []
+    for index, value in enumerate(values):
+        try:
+            ids.add(int(value))
+        except (TypeError, ValueError):
+            errors.append({'index': index, 'error': 'student_id must be an integer'})
+    if errors:
+        raise AttendanceValidationError(errors)
+    return ids
+
+
+def validate_roll_call(records, classroom_id=None, known=None):
+    """
+    Validate a roll-call payload in one pass.
+    With `classroom_id`, every student must be enrolled in that classroom.
+    `known`, a known_students() result covering the payload, saves the lookup.
+    Returns an ordered {student_id: status} dict; the last entry wins for duplicates.
+    """
+    if not isinstance(records, list):
+        raise AttendanceValidationError([{'records': 'Expected a list'}])
+
+    errors = []
+    statuses = {}
+    indexes = {}
+    for index, record in enumerate(records):
+        if not isinstance(record, dict):
+            errors.append({'index': index, 'error': 'Expected an object'})
+            continue
+        try:
+            student_id = int(record.get('student_id'))
+        except (TypeError, ValueError):
+            errors.append({'index': index, 'error': 'student_id must be an integer'})
+            continue
+        status_val = record.get('status')
+        if status_val not in VALID_STATUSES:
+            errors.append({'index': index, 'error': f'Invalid status: {status_val}'})
+            continue
+        statuses[student_id] = status_val
+        indexes[student_id] = index
+
+    if statuses:
+        # One lookup for the whole payload instead of a FK violation mid-write
+        if known is None:
+            known = known_students(statuses, classroom_id)
+        for student_id in statuses.keys() - known:
+            errors.append({'index': indexes[student_id], 'error': f'Unknown student: {student_id}'})
+
+    if errors:
+        errors.sort(key=lambda error: error.get('index', -1))
+        raise AttendanceValidationError(errors)
+    return statuses
+
+
+def upsert_roll_call(date, statuses, marked_by):
+    """
+    Write a validated roll call for one date with a single INSERT ... ON CONFLICT.
+    Records already holding the requested status are left alone, so a resubmitted
+    roll call does not bump their updated_at.
+    Returns the records, in payload order, with `student` preloaded.
+    """
+    if not statuses:
+        return []
+
+    current = dict(
+        AttendanceRecord.objects.filter(date=date, student_id__in=statuses).values_list('student_id', 'status')
+    )
+    changed = {student_id: status_val for student_id, status_val in statuses.items()
+               if current.get(student_id) != status_val}
+    if changed:
+        with transaction.atomic():
+            write_statuses({(student_id, date): status_val for student_id, status_val in changed.items()}, marked_by)
+            records_changed(changed, [date])
+
+    written = AttendanceRecord.objects.filter(
+        date=date, student_id__in=statuses
+    ).select_related('student')
+    by_student = {record.student_id: record for record in written}
+    return [by_student[student_id] for student_id in statuses if student_id in by_student]
+
+
+def write_statuses(slots, marked_by):
+    """Upsert {(student_id, date): status} with a single INSERT ... ON CONFLICT."""
+    if not slots:
+        return
+    AttendanceRecord.objects.bulk_create(
+        [
+            AttendanceRecord(date=date, student_id=student_id, status=status_val, marked_by=marked_by)
+            for (student_id, date), status_val in slots.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['date', 'student'],
+        update_fields=['status', 'marked_by', 'updated_at'],
+    )
+
+
+def backfill_dates(start, end, exclude_weekdays=(), holidays=(), today=None):
+    """Dates in [start, end], skipping excluded weekdays (0=Monday), holidays and the future."""
+    today = today or date_cls.today()
+    end = min(end, today)
+    exclude_weekdays = set(exclude_weekdays)
+    holidays = set(holidays)
+    dates = []
+    current = start
+    while current <= end:
+        if current.weekday() not in exclude_weekdays and current not in holidays:
+            dates.append(current)
+        current += timedelta(days=1)
+    return dates
+
+
+def iter_backfill(student_ids, dates, status_val, marked_by, overwrite=True, chunk_size=5000):
+    """
+    Mark `status_val` for every (student, date) pair, one chunk of students at a time.
+
+    Each chunk costs one existence query plus one bulk write in its own transaction,
+    and yields a progress dict so callers can stream it back to the client. Rollups,
+    caches and change events are updated once, after the last chunk.
+    """
+    student_ids = list(student_ids)
+    total = len(student_ids) * len(dates)
+    students_per_chunk = max(1, chunk_size // max(1, len(dates)))
+    first, last = (dates[0], dates[-1]) if dates else (None, None)
+    date_set = set(dates)
+    totals = {'created': 0, 'updated': 0, 'skipped': 0}
+    written = []
+
+    try:
+        for offset in range(0, len(student_ids) if dates else 0, students_per_chunk):
+            chunk = student_ids[offset:offset + students_per_chunk]
+            with transaction.atomic():
+                # Range predicate rather than a long IN list; filter to the wanted dates in Python
+                existing = {
+                    pair for pair in AttendanceRecord.objects.filter(
+                        student_id__in=chunk, date__gte=first, date__lte=last
+                    ).values_list('student_id', 'date')
+                    if pair[1] in date_set
+                }
+                pairs = [(student_id, d) for student_id in chunk for d in dates]
+                if overwrite:
+                    to_write = pairs
+                    counts = {'created': len(pairs) - len(existing), 'updated': len(existing), 'skipped': 0}
+                else:
+                    to_write = [pair for pair in pairs if pair not in existing]
+                    counts = {'created': len(to_write), 'updated': 0, 'skipped': len(existing)}
+
+                rows = [
+                    AttendanceRecord(student_id=student_id, date=d, status=status_val,
+                                     absence_reason=None, marked_by=marked_by)
+                    for student_id, d in to_write
+                ]
+                if rows and overwrite:
+                    AttendanceRecord.objects.bulk_create(
+                        rows,
+                        update_conflicts=True,
+                        unique_fields=['date', 'student'],
+                        update_fields=['status', 'absence_reason', 'marked_by', 'updated_at'],
+                    )
+                elif rows:
+                    AttendanceRecord.objects.bulk_create(rows)
+            if rows:
+                written.extend(chunk)
+
+            for key, value in counts.items():
+                totals[key] += value
+            yield {
+                'processed': min(offset + len(chunk), len(student_ids)) * len(dates),
+                'total': total,
+                **counts,
+            }
+    finally:
+        # Once for the whole run, also when it stops early: refreshing per chunk would
+        # re-aggregate the school-wide daily rollups of every date for each chunk
+        if written:
+            records_changed(written, dates)
+
+    yield {'done': True, 'total': total, **totals}
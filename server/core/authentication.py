@@ -0,0 +1,116 @@
+"""
+JWT authentication with a cached user lookup.
+
+simplejwt's JWTAuthentication loads the User row on every request. The row
+rarely changes, so CachedJWTAuthentication keeps it in Django's cache for
+AUTH_USER_CACHE_TTL seconds (0 disables caching). Saves and deletes of a User
+drop its entry through the signal handlers in core.signals; paths that bypass
+signals (bulk_update, QuerySet.update) must call invalidate_cached_users().
+With a per-process cache (LocMem) other workers only see a change once their
+entry expires, so use the shared cache backend in multi-process deployments.
+
+Entries hold CACHED_FIELDS, never the password hash: a shared cache would otherwise
+hold every active user's hash. For the revoke check they keep the same digest of
+it that tokens carry. Other fields load from the database on first access.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+# What authentication and permission checks read, plus the profile that UserMeView returns
+CACHED_FIELDS = ('id', 'username', 'role', 'is_active', 'is_staff', 'is_superuser', 'first_name', 'last_name', 'email')
+
+
+def user_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def _entry(user):
+    entry = {name: getattr(user, name) for name in CACHED_FIELDS}
+    entry['password_digest'] = get_md5_hash_password(user.password)
+    return entry
+
+
+def _user(model, entry):
+    """A User built from a cache entry, as if loaded with .only(*CACHED_FIELDS)."""
+    fields = [f.attname for f in model._meta.concrete_fields if f.attname in entry]
+    return model.from_db(model.objects.db, fields, [entry[name] for name in fields])
+
+
+def invalidate_cached_users(user_ids):
+    keys = [user_key(user_id) for user_id in user_ids]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    # A request may re-cache the old row before the writing transaction commits
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        ttl = getattr(settings, 'AUTH_USER_CACHE_TTL', 0)
+        if not ttl:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        key = user_key(user_id)
+        entry = cache.get(key)
+        if entry is None:
+            # Raises for missing or inactive users, so only valid rows are cached
+            user = super().get_user(validated_token)
+            cache.set(key, _entry(user), ttl)
+            return user
+
+        self.check_revoked(entry['password_digest'], validated_token)
+        return _user(self.user_model, entry)
+
+    def check_revoked(self, password_digest, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != password_digest:
+            raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+
+    async def aget_user(self, validated_token):
+        """get_user() for async views: the same checks, through the async cache and ORM APIs."""
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        ttl = getattr(settings, 'AUTH_USER_CACHE_TTL', 0)
+        entry = await cache.aget(user_key(user_id)) if ttl else None
+        if entry is None:
+            try:
+                user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found')
+            if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+                raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+            entry = _entry(user)
+            if ttl:
+                await cache.aset(user_key(user_id), entry, ttl)
+        else:
+            user = _user(self.user_model, entry)
+        self.check_revoked(entry['password_digest'], validated_token)
+        return user
+
+    async def aauthenticate(self, request):
+        """authenticate() for plain Django async views; returns the user or None without a token."""
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        # Signature and expiry checks are CPU-only, no I/O to await
+        return await self.aget_user(self.get_validated_token(raw_token))
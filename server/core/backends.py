@@ -0,0 +1,74 @@
+"""
+Authentication backend that verifies passwords in a process pool.
+
+Password hashing is deliberately CPU-bound. ProcessPoolModelBackend runs the
+hash comparison (and any rehash) in AUTH_PROCESS_POOL_SIZE worker processes,
+so concurrent logins spread across cores instead of queueing on one
+interpreter, and the calling worker thread only waits on a future. It behaves
+like ModelBackend otherwise, including rehash-on-login when PASSWORD_HASHERS
+prefers a different hasher or stronger settings than the stored hash.
+
+Workers are spawned rather than forked: forking a multithreaded WSGI/ASGI
+server can hand the child locks held by other threads. They run core.hashing
+with the PASSWORD_HASHERS in effect when the pool started.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import make_password
+
+from .hashing import init_worker, verify
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def hash_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=getattr(settings, 'AUTH_PROCESS_POOL_SIZE', 0) or os.cpu_count(),
+                initializer=init_worker,
+                initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings'), settings.PASSWORD_HASHERS),
+                # Forking a multithreaded server process can copy held locks into the child
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _pool
+
+
+def shutdown_pool():
+    """Stop the workers; the next login starts a fresh pool (e.g. after changing settings)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+class ProcessPoolModelBackend(ModelBackend):
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Hash anyway so unknown usernames take as long as wrong passwords
+            hash_pool().submit(make_password, password).result()
+            return None
+
+        matches, rehashed = hash_pool().submit(verify, password, user.password).result()
+        if not matches or not self.user_can_authenticate(user):
+            return None
+        if rehashed:
+            user.password = rehashed
+            user.save(update_fields=['password'])
+        return user
@@ -0,0 +1,127 @@
+"""
+Response cache for the analytics endpoints.
+
+Entries are keyed by (classroom | school | student, month) on Django's cache
+framework. Every AttendanceRecord write path invalidates the affected keys via
+attendance.records_changed(); rebuild_rollups() bumps a generation counter that
+orphans every entry at once. Past months get a long TTL, the current month a
+short one as a safety net.
+"""
+import hashlib
+import json
+import time
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import HttpResponseNotModified, JsonResponse
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import Enrollment
+
+GENERATION_KEY = 'analytics:generation'
+
+
+def _new_generation():
+    # Time-based so an evicted counter never resurrects entries from an older generation
+    return int(time.time() * 1000)
+
+
+def _generation():
+    return cache.get_or_set(GENERATION_KEY, _new_generation, timeout=None)
+
+
+def class_key(month_start, classroom_id=None, generation=None):
+    scope = classroom_id or 'school'
+    return f'analytics:{generation or _generation()}:class:{scope}:{month_start:%Y-%m}'
+
+
+def student_key(month_start, student_id, generation=None):
+    return f'analytics:{generation or _generation()}:student:{student_id}:{month_start:%Y-%m}'
+
+
+def _timeout(month_start):
+    current = date.today().replace(day=1)
+    if month_start < current:
+        return settings.ANALYTICS_CACHE_PAST_TTL
+    return settings.ANALYTICS_CACHE_TTL
+
+
+def _entry(payload):
+    body = json.dumps(payload, cls=DjangoJSONEncoder, sort_keys=True)
+    return payload, '"%s"' % hashlib.md5(body.encode()).hexdigest()
+
+
+def cached_response(request, key, month_start, compute):
+    """
+    Serve `compute()` from the cache under `key`, with an ETag.
+    Returns 304 when the client's If-None-Match matches.
+    """
+    entry = cache.get(key)
+    if entry is None:
+        entry = _entry(compute())
+        cache.set(key, entry, timeout=_timeout(month_start))
+
+    payload, etag = entry
+    if etag in request.headers.get('If-None-Match', ''):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(payload)
+    response['ETag'] = etag
+    return response
+
+
+async def agenerated_key(make_key, *args):
+    """Build a key with make_key(*args, generation) using the async cache API."""
+    generation = await cache.aget_or_set(GENERATION_KEY, _new_generation, timeout=None)
+    return make_key(*args, generation)
+
+
+async def acached_response(request, key, month_start, compute):
+    """
+    Async counterpart of cached_response() for plain Django async views:
+    `compute` is a coroutine function and the result is a JsonResponse.
+    """
+    entry = await cache.aget(key)
+    if entry is None:
+        entry = _entry(await compute())
+        await cache.aset(key, entry, timeout=_timeout(month_start))
+
+    payload, etag = entry
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        response = JsonResponse(payload, safe=False)
+    response['ETag'] = etag
+    return response
+
+
+def _delete_keys(student_ids, months):
+    generation = _generation()
+    classroom_ids = set(
+        Enrollment.objects.filter(student_id__in=student_ids).values_list('classroom_id', flat=True)
+    )
+    keys = []
+    for month_start in months:
+        keys.append(class_key(month_start, generation=generation))
+        keys.extend(class_key(month_start, classroom_id, generation) for classroom_id in classroom_ids)
+        keys.extend(student_key(month_start, student_id, generation) for student_id in student_ids)
+    cache.delete_many(keys)
+
+
+def invalidate_analytics(student_ids, dates):
+    """Drop cached summaries covering `student_ids` on `dates`."""
+    student_ids = {int(student_id) for student_id in student_ids}
+    months = {d.replace(day=1) for d in dates}
+    if not student_ids or not months:
+        return
+    _delete_keys(student_ids, months)
+    # Again after commit, in case a reader re-cached pre-commit data in between
+    transaction.on_commit(lambda: _delete_keys(student_ids, months))
+
+
+def invalidate_all_analytics():
+    cache.set(GENERATION_KEY, _new_generation(), timeout=None)
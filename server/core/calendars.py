@@ -0,0 +1,94 @@
+"""
+Compact month calendars.
+
+A student's month is encoded as two bitmasks, where bit d-1 is set when day d
+is PRESENT (or ABSENT). Days in neither mask are unmarked. Absence reasons and
+the ids of absent records (needed to edit a reason) are sparse maps keyed by
+day of the month. Everything comes from one query over at most 31 rows.
+
+A classroom's month is a column-oriented matrix: parallel student columns and
+one status string per student, where character d-1 is day d.
+"""
+from django.db.models import FilteredRelation, Q
+
+from .models import AttendanceRecord, User
+
+# Status codes shared by run_length() and class_matrix()
+STATUS_CODES = {AttendanceRecord.Status.PRESENT: 'P', AttendanceRecord.Status.ABSENT: 'A'}
+UNMARKED = 'U'
+
+
+def month_calendar(student_id, start, end):
+    present = absent = 0
+    reasons = {}
+    absent_ids = {}
+    rows = AttendanceRecord.objects.filter(
+        student_id=student_id, date__gte=start, date__lt=end
+    ).values_list('date', 'status', 'id', 'absence_reason')
+    for day, status_val, record_id, reason in rows:
+        bit = 1 << (day.day - 1)
+        if status_val == AttendanceRecord.Status.PRESENT:
+            present |= bit
+        else:
+            absent |= bit
+            absent_ids[day.day] = record_id
+            if reason:
+                reasons[day.day] = reason
+    return {
+        'month': f'{start:%Y-%m}',
+        'days': (end - start).days,
+        'present': present,
+        'absent': absent,
+        'absent_ids': absent_ids,
+        'reasons': reasons,
+    }
+
+
+def run_length(present, absent, days):
+    """Encode the masks as runs, e.g. 'U2P3A1P5' (unmarked, present, absent)."""
+    runs = []
+    for day in range(days):
+        bit = 1 << day
+        code = 'P' if present & bit else 'A' if absent & bit else UNMARKED
+        if runs and runs[-1][0] == code:
+            runs[-1][1] += 1
+        else:
+            runs.append([code, 1])
+    return ''.join(f'{code}{count}' for code, count in runs)
+
+
+def class_matrix(classroom_id, start, end):
+    """
+    Students x days for a classroom's month in one query: each enrolled student is
+    LEFT JOINed to their records in [start, end) via a FilteredRelation, so students
+    with no records still get a row, and the join is served by the (student, date) index.
+    """
+    days = (end - start).days
+    rows = User.objects.filter(
+        role=User.Role.STUDENT, enrollments__classroom_id=classroom_id
+    ).annotate(
+        month_records=FilteredRelation(
+            'attendance_records',
+            condition=Q(attendance_records__date__gte=start, attendance_records__date__lt=end),
+        )
+    ).order_by('id').values_list(
+        'id', 'username', 'first_name', 'last_name', 'month_records__date', 'month_records__status'
+    )
+
+    columns = {'student_id': [], 'username': [], 'first_name': [], 'last_name': []}
+    grid = []
+    for student_id, username, first_name, last_name, day, status_val in rows:
+        if not columns['student_id'] or columns['student_id'][-1] != student_id:
+            columns['student_id'].append(student_id)
+            columns['username'].append(username)
+            columns['first_name'].append(first_name)
+            columns['last_name'].append(last_name)
+            grid.append([UNMARKED] * days)
+        if day is not None:
+            grid[-1][day.day - 1] = STATUS_CODES[status_val]
+    return {
+        'month': f'{start:%Y-%m}',
+        'days': days,
+        **columns,
+        'status': [''.join(row) for row in grid],
+    }
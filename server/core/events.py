@@ -0,0 +1,184 @@
+"""
+Server push of attendance changes over Server-Sent Events.
+
+records_changed() publishes each committed write as {dates, students: {id: [classroom ids]}}.
+Every open stream has a Subscription that keeps only the changes it cares about
+(one classroom, one student, one date) and merges them into a single pending
+batch, so a stream sends at most one message per EVENTS_BATCH_SECONDS however
+many writes land, and a burst of writes costs each dashboard one delta fetch
+(e.g. from core.sync) rather than a poll loop.
+
+The broker is in-process by default, which is enough when one process serves both
+the writes and the streams. With several processes, set EVENTS_REDIS_URL
+(pip install redis): writes are published to a Redis channel and each process
+serving streams relays that channel to its own subscribers.
+"""
+import asyncio
+import json
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+
+from .models import Enrollment
+
+CHANNEL = 'cas:attendance'
+
+
+class Subscription:
+    """One open stream: a filter plus the merged changes not yet sent."""
+
+    def __init__(self, loop, classroom_id=None, student_id=None, date=None):
+        self.loop = loop
+        self.classroom_id = classroom_id
+        self.student_id = student_id
+        self.date = date
+        self.ready = asyncio.Event()
+        self.lock = threading.Lock()
+        self.pending = None
+
+    def offer(self, change):
+        """Merge `change` into the pending batch if it matches; safe to call from any thread."""
+        dates = set(change['dates'])
+        if self.date is not None:
+            dates &= {self.date}
+        classrooms, students = set(), set()
+        for student_id, classroom_ids in change['students'].items():
+            student_id = int(student_id)
+            if self.student_id is not None and student_id != self.student_id:
+                continue
+            if self.classroom_id is not None:
+                if self.classroom_id not in classroom_ids:
+                    continue
+                classroom_ids = [self.classroom_id]
+            students.add(student_id)
+            classrooms.update(classroom_ids)
+        if not dates or not students:
+            return
+
+        with self.lock:
+            first = self.pending is None
+            if first:
+                self.pending = {'dates': set(), 'students': set(), 'classrooms': set()}
+            self.pending['dates'] |= dates
+            self.pending['students'] |= students
+            self.pending['classrooms'] |= classrooms
+        if not first:
+            # A wake-up is already scheduled for this batch
+            return
+        try:
+            self.loop.call_soon_threadsafe(self.ready.set)
+        except RuntimeError:
+            # The stream's event loop has shut down
+            pass
+
+    async def next_batch(self, window, timeout):
+        """Wait up to `timeout` for a change, then `window` more for others to merge in. None on timeout."""
+        while True:
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+            await asyncio.sleep(window)
+            with self.lock:
+                batch, self.pending = self.pending, None
+                self.ready.clear()
+            # A wake-up scheduled before the previous batch was taken finds nothing pending
+            if batch is not None:
+                return {key: sorted(values) for key, values in batch.items()}
+
+
+class Broker:
+    """Fans changes out to the subscriptions in this process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = set()
+        self.relays = {}
+
+    @property
+    def active(self):
+        return bool(self.subscriptions)
+
+    def subscribe(self, subscription):
+        with self.lock:
+            self.subscriptions.add(subscription)
+        if _redis_url():
+            self._ensure_relay(subscription.loop)
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+    def dispatch(self, change):
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            subscription.offer(change)
+
+    def _ensure_relay(self, loop):
+        # One Redis listener per event loop (one per ASGI worker process)
+        with self.lock:
+            task = self.relays.get(loop)
+            if task is None or task.done():
+                self.relays[loop] = loop.create_task(self._relay())
+
+    async def _relay(self):
+        client = _redis_module().asyncio.from_url(_redis_url())
+        pubsub = client.pubsub()
+        await pubsub.subscribe(CHANNEL)
+        try:
+            async for message in pubsub.listen():
+                if message['type'] == 'message':
+                    self.dispatch(json.loads(message['data']))
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
+
+
+broker = Broker()
+
+
+def _redis_url():
+    return getattr(settings, 'EVENTS_REDIS_URL', None)
+
+
+def _redis_module():
+    try:
+        import redis
+    except ImportError:
+        raise ImproperlyConfigured('EVENTS_REDIS_URL requires the redis package (pip install redis)')
+    return redis
+
+
+_publisher = None
+
+
+def _publish(student_ids, dates):
+    global _publisher
+    url = _redis_url()
+    # With no Redis and nobody listening in this process, skip the classroom lookup
+    if not url and not broker.active:
+        return
+    classrooms = {student_id: [] for student_id in student_ids}
+    for student_id, classroom_id in Enrollment.objects.filter(student_id__in=student_ids).values_list(
+        'student_id', 'classroom_id'
+    ):
+        classrooms[student_id].append(classroom_id)
+    change = {'dates': [d.isoformat() for d in dates], 'students': classrooms}
+    if url:
+        if _publisher is None:
+            _publisher = _redis_module().Redis.from_url(url)
+        _publisher.publish(CHANNEL, json.dumps(change))
+    else:
+        broker.dispatch(change)
+
+
+def publish_changes(student_ids, dates):
+    """Announce changed (student, date) slots to open streams once the transaction commits."""
+    student_ids = {int(student_id) for student_id in student_ids}
+    dates = set(dates)
+    if student_ids and dates:
+        # robust: a broker outage must not fail a write that already committed
+        transaction.on_commit(lambda: _publish(student_ids, dates), robust=True)
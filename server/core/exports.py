@@ -0,0 +1,96 @@
+"""
+Streaming attendance export.
+
+Rows are read with .iterator(chunk_size=...) (a server-side cursor on Postgres) and
+written out chunk by chunk, so memory use does not depend on the number of rows.
+CSV is streamed directly; Parquet needs pyarrow and is written one row group per
+chunk into a file, since its footer can only be written at the end.
+"""
+import csv
+
+from .models import AttendanceRecord
+
+EXPORT_COLUMNS = [
+    ('date', 'date'),
+    ('student_id', 'student_id'),
+    ('username', 'student__username'),
+    ('first_name', 'student__first_name'),
+    ('last_name', 'student__last_name'),
+    ('status', 'status'),
+    ('absence_reason', 'absence_reason'),
+    ('marked_by_id', 'marked_by_id'),
+]
+
+CHUNK_SIZE = 5000
+
+
+class ExportError(Exception):
+    pass
+
+
+def export_rows(start, end, classroom_id=None, chunk_size=CHUNK_SIZE):
+    """Yield attendance tuples (in EXPORT_COLUMNS order) for [start, end], both inclusive."""
+    records = AttendanceRecord.objects.filter(date__gte=start, date__lte=end)
+    if classroom_id is not None:
+        records = records.filter(student__enrollments__classroom_id=classroom_id)
+    columns = [column for _, column in EXPORT_COLUMNS]
+    return records.order_by('date', 'student_id').values_list(*columns).iterator(chunk_size=chunk_size)
+
+
+class _Echo:
+    """File-like object whose write() hands the line back, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows, rows_per_chunk=1000):
+    """Yield CSV text, header first, a few hundred rows per chunk to keep per-yield overhead low."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    buffer = []
+    for row in rows:
+        buffer.append(writer.writerow(row))
+        if len(buffer) >= rows_per_chunk:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def write_parquet(rows, destination, chunk_size=CHUNK_SIZE):
+    """Write rows to `destination` (path or binary file) as Parquet, one row group per chunk."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportError('Parquet export requires pyarrow (pip install pyarrow)')
+
+    schema = pa.schema([
+        ('date', pa.date32()),
+        ('student_id', pa.int64()),
+        ('username', pa.string()),
+        ('first_name', pa.string()),
+        ('last_name', pa.string()),
+        ('status', pa.string()),
+        ('absence_reason', pa.string()),
+        ('marked_by_id', pa.int64()),
+    ])
+    count = 0
+    with pq.ParquetWriter(destination, schema, compression='zstd') as writer:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                writer.write_table(_table(pa, schema, batch))
+                count += len(batch)
+                batch = []
+        if batch:
+            writer.write_table(_table(pa, schema, batch))
+            count += len(batch)
+    return count
+
+
+def _table(pa, schema, batch):
+    columns = list(zip(*batch))
+    return pa.Table.from_arrays([pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema)
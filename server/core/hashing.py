@@ -0,0 +1,29 @@
+"""
+Worker side of the login process pool (core.backends).
+
+Workers are spawned, not forked, and unpickle these functions by importing this
+module before Django is set up, so it must not import models at module level.
+"""
+import os
+
+
+def init_worker(settings_module, password_hashers):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    from django.conf import settings
+    django.setup()
+    # The pool's hashers are the ones configured when it started, as with the rest of its settings
+    settings.PASSWORD_HASHERS = password_hashers
+
+
+def verify(password, encoded):
+    """(matches, rehashed password or None)."""
+    from django.contrib.auth.hashers import check_password, get_hasher, identify_hasher, make_password
+
+    if not check_password(password, encoded):
+        return False, None
+    hasher = identify_hasher(encoded)
+    preferred = get_hasher('default')
+    if hasher.algorithm != preferred.algorithm or preferred.must_update(encoded):
+        return True, make_password(password)
+    return True, None
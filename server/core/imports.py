@@ -0,0 +1,275 @@
+"""
+CSV import of rosters and historical attendance.
+
+Rows are streamed from the file and handled in batches: each batch is validated
+in Python, resolves its usernames (and classroom names) with one query, and is
+written in a single transaction. Both importers are generators that yield one
+progress dict per batch, including the per-row errors and the last row number
+written, so callers can stream progress and resume from a checkpoint.
+
+Roster CSV columns: username (required), first_name, last_name, email, role
+(STUDENT/TEACHER, default STUDENT), classroom (name; created if missing).
+Existing users are only updated when they are students, and never change role.
+Attendance CSV columns: username, date (YYYY-MM-DD), status (PRESENT/ABSENT)
+and optionally absence_reason.
+"""
+import csv
+from datetime import date as date_cls
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import User, Classroom, Enrollment, AttendanceRecord
+from .attendance import VALID_STATUSES, enrollments_changed
+from .authentication import invalidate_cached_users
+from .rollups import rebuild_rollups
+
+ROSTER_COLUMNS = {'username'}
+ATTENDANCE_COLUMNS = {'username', 'date', 'status'}
+VALID_ROLES = {choice for choice, _ in User.Role.choices}
+BATCH_SIZE = 10000
+
+
+class ImportFormatError(Exception):
+    """Raised when the file itself is unusable (e.g. missing required columns)."""
+
+
+def read_csv(fileobj, required, start_row=0):
+    """
+    Yield (row_number, row) from a text file, numbering data rows from 1.
+    Rows up to and including `start_row` are skipped, for resuming.
+    """
+    reader = csv.reader(fileobj)
+    header = [name.strip() for name in next(reader, [])]
+    missing = required - set(header)
+    if missing:
+        raise ImportFormatError(f'Missing required columns: {", ".join(sorted(missing))}')
+    # csv.DictReader does the same with per-row bookkeeping we don't need
+    for row_number, values in enumerate(reader, start=1):
+        if row_number > start_row and values:
+            yield row_number, dict(zip(header, values))
+
+
+def _batches(rows, batch_size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _clean(value):
+    return (value or '').strip()
+
+
+def import_roster(rows, batch_size=BATCH_SIZE, password=None, password_hash=None):
+    """
+    Create users from (row_number, row) pairs, or update existing students, and enroll
+    them in their classroom. Rows that would touch a non-student account or change a
+    role are reported as errors. New users get `password` (hashed once for the whole import), an already hashed
+    `password_hash` (background jobs never store the raw password) or an unusable password.
+    """
+    hashed = password_hash or make_password(password)
+    totals = {'processed': 0, 'created': 0, 'updated': 0, 'enrolled': 0, 'errors': 0}
+
+    for batch in _batches(rows, batch_size):
+        errors = []
+        users = {}
+        for row_number, row in batch:
+            username = _clean(row.get('username'))
+            # Blank role: STUDENT for new users; existing ones keep theirs
+            role = _clean(row.get('role')).upper()
+            if not username:
+                errors.append({'row': row_number, 'error': 'username is required'})
+            elif role and role not in VALID_ROLES:
+                errors.append({'row': row_number, 'error': f'Invalid role: {role}'})
+            else:
+                # The last row wins for repeated usernames
+                users[username] = {
+                    'row': row_number,
+                    'first_name': _clean(row.get('first_name')),
+                    'last_name': _clean(row.get('last_name')),
+                    'email': _clean(row.get('email')),
+                    'role': role,
+                    'classroom': _clean(row.get('classroom')),
+                }
+
+        with transaction.atomic():
+            existing = {user.username: user for user in User.objects.filter(username__in=users)}
+            to_update = []
+            for username, user in existing.items():
+                fields = users[username]
+                # Uploads come from any teacher: they must not edit staff accounts or grant roles
+                if user.role != User.Role.STUDENT:
+                    errors.append({'row': fields['row'], 'error': f'{username} is not a student and cannot be updated'})
+                elif fields['role'] not in ('', user.role):
+                    errors.append({'row': fields['row'], 'error': f'Cannot change the role of {username}'})
+                else:
+                    for field in ('first_name', 'last_name', 'email'):
+                        if fields[field]:
+                            setattr(user, field, fields[field])
+                    to_update.append(user)
+                    continue
+                del users[username]
+            errors.sort(key=lambda error: error['row'])
+            User.objects.bulk_update(to_update, ['first_name', 'last_name', 'email'])
+            # bulk_update sends no post_save, so drop cached auth rows here
+            invalidate_cached_users([user.id for user in to_update])
+            User.objects.bulk_create([
+                User(username=username, password=hashed, first_name=fields['first_name'],
+                     last_name=fields['last_name'], email=fields['email'], role=fields['role'] or User.Role.STUDENT)
+                for username, fields in users.items() if username not in existing
+            ])
+            students = dict(User.objects.filter(
+                username__in=users, role=User.Role.STUDENT
+            ).values_list('username', 'id'))
+
+            names = {fields['classroom'] for fields in users.values() if fields['classroom']}
+            classrooms = {}
+            # Names are not unique; reuse the oldest classroom with the name
+            for classroom_id, name in Classroom.objects.filter(name__in=names).order_by('-id').values_list('id', 'name'):
+                classrooms[name] = classroom_id
+            for classroom in Classroom.objects.bulk_create([Classroom(name=n) for n in names - classrooms.keys()]):
+                classrooms[classroom.name] = classroom.id
+            enrollments = [
+                Enrollment(student_id=students[username], classroom_id=classrooms[fields['classroom']])
+                for username, fields in users.items() if fields['classroom'] and username in students
+            ]
+            enrolled = set(Enrollment.objects.filter(
+                student_id__in=[e.student_id for e in enrollments]
+            ).values_list('student_id', 'classroom_id'))
+            Enrollment.objects.bulk_create(enrollments, ignore_conflicts=True)
+            # Students with records moving into a class count towards its rollups from now on
+            joined = {e.student_id for e in enrollments if (e.student_id, e.classroom_id) not in enrolled}
+            if joined:
+                enrollments_changed(joined)
+
+        counts = {
+            'processed': len(batch),
+            'created': len(users) - len(to_update),
+            'updated': len(to_update),
+            'enrolled': len(enrollments),
+        }
+        for key, value in counts.items():
+            totals[key] += value
+        totals['errors'] += len(errors)
+        yield {'row': batch[-1][0], **counts, 'errors': errors}
+
+    yield {'done': True, **totals}
+
+
+def _write_records(cursor, inserts, updates):
+    """
+    Plain executemany INSERT/UPDATE statements (SQLite and PostgreSQL).
+    bulk_create compiles per-field params for every row, which dominates at import volume,
+    and splitting by a prior existence check is faster than ON CONFLICT DO UPDATE on SQLite.
+    """
+    table = AttendanceRecord._meta.db_table
+    if inserts:
+        # DO NOTHING only guards against a concurrent writer; the existence check already ran
+        cursor.executemany(
+            f'INSERT INTO {table} (date, student_id, status, absence_reason, marked_by_id, marked_at, updated_at) '
+            'VALUES (%s, %s, %s, %s, %s, %s, %s) ON CONFLICT (date, student_id) DO NOTHING',
+            inserts
+        )
+    if updates:
+        cursor.executemany(
+            f'UPDATE {table} SET status = %s, absence_reason = %s, marked_by_id = %s, updated_at = %s '
+            'WHERE date = %s AND student_id = %s',
+            updates
+        )
+
+
+def import_attendance(rows, marked_by, batch_size=BATCH_SIZE, first_date=None, last_date=None):
+    """
+    Upsert attendance from (row_number, row) pairs; existing (student, date) rows are overwritten.
+
+    Rollups are rebuilt once at the end for the months touched, rather than per batch.
+    When resuming, pass the `first_date`/`last_date` from the last checkpoint so months
+    written before the interruption are rebuilt too.
+    """
+    marked_by_id = marked_by.id if marked_by else None
+    # Raw date string -> (date, adapted value); a school year has a few hundred distinct dates
+    days = {}
+    totals = {'processed': 0, 'created': 0, 'updated': 0, 'errors': 0}
+
+    for batch in _batches(rows, batch_size):
+        errors = []
+        parsed = []
+        for row_number, row in batch:
+            raw_date = row.get('date') or ''
+            day = days.get(raw_date)
+            if day is None:
+                try:
+                    value = date_cls.fromisoformat(raw_date.strip())
+                except ValueError:
+                    errors.append({'row': row_number, 'error': 'Invalid date format. Use YYYY-MM-DD'})
+                    continue
+                day = days[raw_date] = (value, connection.ops.adapt_datefield_value(value))
+            status_val = row.get('status') or ''
+            if status_val not in VALID_STATUSES:
+                status_val = status_val.strip().upper()
+                if status_val not in VALID_STATUSES:
+                    errors.append({'row': row_number, 'error': f'Invalid status: {status_val}'})
+                    continue
+            reason = row.get('absence_reason')
+            parsed.append((row_number, _clean(row.get('username')), day, status_val,
+                           reason.strip() or None if reason else None))
+
+        # One lookup per batch
+        ids = dict(User.objects.filter(
+            username__in={p[1] for p in parsed}, role=User.Role.STUDENT
+        ).values_list('username', 'id'))
+
+        records = {}
+        for row_number, username, (day, adapted), status_val, reason in parsed:
+            student_id = ids.get(username)
+            if student_id is None:
+                errors.append({'row': row_number, 'error': f'Unknown student: {username}'})
+                continue
+            # The last row wins for repeated (student, date) pairs
+            records[(student_id, day)] = (adapted, status_val, reason)
+
+        created = updated = 0
+        if records:
+            written_days = {day for _, day in records}
+            low, high = min(written_days), max(written_days)
+            with transaction.atomic(), connection.cursor() as cursor:
+                # Stamped per batch: the change feed (core.sync) only waits SYNC_SETTLE_SECONDS
+                # for late commits, so an import-wide stamp would fall behind clients' cursors
+                stamp = connection.ops.adapt_datetimefield_value(timezone.now())
+                # Range predicate rather than a list of pairs; filter to the batch's pairs in Python
+                existing = {
+                    pair for pair in AttendanceRecord.objects.filter(
+                        student_id__in={student_id for student_id, _ in records}, date__gte=low, date__lte=high
+                    ).values_list('student_id', 'date')
+                    if pair in records
+                }
+                inserts, updates = [], []
+                for pair, (adapted, status_val, reason) in records.items():
+                    student_id = pair[0]
+                    if pair in existing:
+                        updates.append((status_val, reason, marked_by_id, stamp, adapted, student_id))
+                    else:
+                        inserts.append((adapted, student_id, status_val, reason, marked_by_id, stamp, stamp))
+                _write_records(cursor, inserts, updates)
+            created, updated = len(inserts), len(updates)
+            first_date = min(first_date, low) if first_date else low
+            last_date = max(last_date, high) if last_date else high
+
+        errors.sort(key=lambda error: error['row'])
+        totals['processed'] += len(batch)
+        totals['created'] += created
+        totals['updated'] += updated
+        totals['errors'] += len(errors)
+        yield {
+            'row': batch[-1][0], 'processed': len(batch), 'created': created, 'updated': updated, 'errors': errors,
+            'first_date': first_date, 'last_date': last_date,
+        }
+
+    if first_date:
+        rebuild_rollups(first_date, last_date)
+    yield {'done': True, **totals}
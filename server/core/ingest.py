@@ -0,0 +1,180 @@
+"""
+Batched, idempotent ingest of roll calls queued by offline clients.
+
+A client marking attendance without a connection queues each roll call under a
+key it generates, then posts the whole queue when it is back online, retrying
+until it gets an answer. For each roll call:
+
+- a key this user already sent is answered from its IngestReceipt, so a retried
+  batch never writes twice;
+- records already holding the requested status are skipped, so a replay does
+  not bump updated_at or show up in the change feed (core.sync);
+- with `if_unmodified_since` (or the If-Unmodified-Since header, for the whole
+  batch), records changed after that time are not overwritten but reported as
+  conflicts, with their current status and updated_at.
+
+The existing rows for the whole batch are read in one query and the real changes
+written in one transaction, together with the receipts.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.http import parse_http_date
+
+from .attendance import (
+    AttendanceValidationError, known_students, parse_date, records_changed, validate_roll_call, write_statuses,
+)
+from .models import AttendanceRecord, IngestReceipt
+
+MAX_INGEST_RECORDS = 5000
+
+
+def parse_since(value):
+    """An If-Unmodified-Since value: ISO 8601 (e.g. an updated_at sent back) or an HTTP date."""
+    if value in (None, ''):
+        return None
+    if not isinstance(value, str):
+        raise AttendanceValidationError([{'if_unmodified_since': 'Expected a timestamp'}])
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        try:
+            seconds = parse_http_date(value)
+        except ValueError:
+            raise AttendanceValidationError([{'if_unmodified_since': f'Invalid timestamp: {value}'}])
+        # HTTP dates have whole-second precision: anything within that second is not newer
+        return datetime.fromtimestamp(seconds, tz=dt_timezone.utc) + timedelta(microseconds=999999)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _student_ids(items):
+    """Every parseable student_id in the batch, for a single known_students() lookup."""
+    ids = set()
+    for item in items:
+        records = item.get('records') if isinstance(item, dict) else None
+        for record in records if isinstance(records, list) else ():
+            try:
+                ids.add(int(record.get('student_id')))
+            except (AttributeError, TypeError, ValueError):
+                pass
+    return ids
+
+
+def _parse_item(item, known, classroom_id, since):
+    """(key, date, statuses, since) for one queued roll call."""
+    if not isinstance(item, dict):
+        raise AttendanceValidationError([{'error': 'Expected an object'}])
+    key = item.get('key')
+    if not isinstance(key, str) or not key or len(key) > 255:
+        raise AttendanceValidationError([{'key': 'A key of 1-255 characters is required'}])
+    if not item.get('date'):
+        raise AttendanceValidationError([{'date': 'Date is required'}])
+    date = parse_date(item['date'])
+    statuses = validate_roll_call(item.get('records', []), classroom_id=classroom_id, known=known)
+    if 'if_unmodified_since' in item:
+        since = parse_since(item['if_unmodified_since'])
+    return key, date, statuses, since
+
+
+def _ingest(items, marked_by, classroom_id, since):
+    results = [None] * len(items)
+    parsed = {}
+    known = known_students(_student_ids(items), classroom_id)
+    for index, item in enumerate(items):
+        try:
+            key, date, statuses, item_since = _parse_item(item, known, classroom_id, since)
+        except AttendanceValidationError as e:
+            results[index] = {'index': index, 'key': item.get('key') if isinstance(item, dict) else None,
+                              'status': 'rejected', 'details': e.errors}
+            continue
+        if key in parsed:
+            # Queued twice in the same batch: the first copy answers for both
+            results[index] = {'index': index, 'key': key, 'status': 'duplicate', 'duplicate_of': parsed[key][0]}
+            continue
+        parsed[key] = (index, date, statuses, item_since)
+
+    receipts = dict(
+        IngestReceipt.objects.filter(created_by=marked_by, key__in=parsed).values_list('key', 'result')
+    )
+    pending = {key: value for key, value in parsed.items() if key not in receipts}
+
+    applied = {}
+    if pending:
+        with transaction.atomic():
+            # One read covers every slot in the batch; locked so the version checks hold until commit
+            students = {student_id for _, _, statuses, _ in pending.values() for student_id in statuses}
+            dates = {date for _, date, _, _ in pending.values()}
+            existing = {
+                (row['student_id'], row['date']): row
+                for row in AttendanceRecord.objects.select_for_update().filter(
+                    student_id__in=students, date__in=dates
+                ).values('student_id', 'date', 'status', 'updated_at')
+            }
+
+            # Later roll calls in the batch win over earlier ones for the same slot
+            planned = {}
+            for key, (index, date, statuses, item_since) in pending.items():
+                result = {'key': key, 'date': date.isoformat(), 'status': 'applied',
+                          'created': 0, 'updated': 0, 'unchanged': 0, 'conflicts': []}
+                for student_id, status_val in statuses.items():
+                    slot = (student_id, date)
+                    row = existing.get(slot)
+                    if planned.get(slot, row and row['status']) == status_val:
+                        result['unchanged'] += 1
+                    elif row is not None and item_since is not None and row['updated_at'] > item_since:
+                        result['conflicts'].append({
+                            'student_id': student_id, 'status': row['status'],
+                            'updated_at': row['updated_at'].isoformat(),
+                        })
+                    else:
+                        planned[slot] = status_val
+                        result['updated' if row is not None else 'created'] += 1
+                applied[key] = result
+
+            # A slot changed and then changed back within the batch needs no write
+            changes = {slot: status_val for slot, status_val in planned.items()
+                       if status_val != (existing[slot]['status'] if slot in existing else None)}
+            write_statuses(changes, marked_by)
+            # A concurrent batch with one of these keys makes this raise and roll back
+            IngestReceipt.objects.bulk_create([
+                IngestReceipt(key=key, created_by=marked_by, result=result) for key, result in applied.items()
+            ])
+            if changes:
+                records_changed({student_id for student_id, _ in changes}, {date for _, date in changes})
+
+    for key, (index, *_) in parsed.items():
+        if key in applied:
+            results[index] = {'index': index, **applied[key]}
+        else:
+            results[index] = {'index': index, **receipts[key], 'status': 'duplicate'}
+    for index, result in enumerate(results):
+        if result['status'] == 'duplicate' and 'duplicate_of' in result:
+            first = results[result.pop('duplicate_of')]
+            results[index] = {**first, 'index': index, 'status': 'duplicate'}
+    return results
+
+
+def ingest_roll_calls(items, marked_by, classroom_id=None, since=None):
+    """
+    Apply a batch of queued roll calls ([{key, date, records, if_unmodified_since}])
+    for `marked_by`. `since` is the batch-wide If-Unmodified-Since, which an item's
+    own if_unmodified_since overrides. Returns one result per item, in order, with
+    status "applied", "duplicate" (already applied; the original result) or "rejected".
+    """
+    if not isinstance(items, list):
+        raise AttendanceValidationError([{'roll_calls': 'Expected a list'}])
+    total = sum(len(item['records']) for item in items
+                if isinstance(item, dict) and isinstance(item.get('records'), list))
+    if total > MAX_INGEST_RECORDS:
+        raise AttendanceValidationError([{'roll_calls': f'At most {MAX_INGEST_RECORDS} records per batch'}])
+    try:
+        return _ingest(items, marked_by, classroom_id, since)
+    except IntegrityError:
+        # A concurrent retry of this batch stored a receipt first; it now answers for that key
+        return _ingest(items, marked_by, classroom_id, since)
@@ -0,0 +1,301 @@
+"""
+Database-backed background jobs.
+
+Views validate a request as usual and, with ?background=1, store the work as a
+Job row instead of doing it in the request (see views.BackgroundJobMixin).
+`manage.py run_workers` runs worker processes that claim the oldest queued job,
+run its handler and record progress, the result or the error on the row, which
+teachers poll at /api/teacher/jobs/<id>/.
+
+Handlers are generators like the synchronous code paths they reuse: every dict
+they yield is saved as the job's progress (at most every JOBS_PROGRESS_SECONDS),
+and the final one, with "done": true, becomes its result. Per-row "errors" lists
+from the progress dicts are collected into the result's "error_rows", up to
+MAX_RESULT_ERRORS.
+
+Claiming is a conditional UPDATE (plus SKIP LOCKED on PostgreSQL), so any number
+of workers can share the table. While a job runs, a side thread refreshes its
+heartbeat every JOBS_HEARTBEAT_SECONDS, however long the handler goes between
+progress events. A job whose worker stops heartbeating for JOBS_STALE_SECONDS is
+re-queued, up to JOBS_MAX_ATTEMPTS; import jobs resume after the last row they
+recorded. Uploads and exports older than JOBS_FILE_RETENTION_SECONDS are deleted
+by purge_files(), which run_workers calls alongside requeue_stale().
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date as date_cls, timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .attendance import iter_backfill, mark_student_dates
+from .exports import export_rows, iter_csv, write_parquet
+from .imports import ATTENDANCE_COLUMNS, ROSTER_COLUMNS, import_attendance, import_roster, read_csv
+from .models import Job
+
+logger = logging.getLogger('core.jobs')
+
+MAX_RESULT_ERRORS = 1000
+
+
+class JobError(Exception):
+    """A job failed for a reason worth showing to its owner as is."""
+
+
+def jobs_dir(*parts):
+    path = os.path.join(settings.JOBS_DIR, *parts)
+    os.makedirs(os.path.dirname(path) if parts else path, exist_ok=True)
+    return path
+
+
+def save_upload(upload):
+    """Copy an uploaded file where workers can read it; returns the path."""
+    path = jobs_dir('uploads', f'{uuid.uuid4().hex}.csv')
+    with open(path, 'wb') as f:
+        for chunk in upload.chunks():
+            f.write(chunk)
+    return path
+
+
+def enqueue(kind, params, user, idempotency_key=None):
+    """Create a queued job, or return the one `user` already created with `idempotency_key`. Returns (job, created)."""
+    if kind not in HANDLERS:
+        raise ValueError(f'Unknown job kind: {kind}')
+    if idempotency_key:
+        existing = Job.objects.filter(created_by=user, idempotency_key=idempotency_key).first()
+        if existing:
+            return existing, False
+    try:
+        with transaction.atomic():
+            job = Job.objects.create(kind=kind, params=params, created_by=user, idempotency_key=idempotency_key or None)
+    except IntegrityError:
+        # A concurrent request with the same key won
+        return Job.objects.get(created_by=user, idempotency_key=idempotency_key), False
+    return job, True
+
+
+# Handlers: job -> iterator of progress dicts, the last one with "done": true
+
+def _dates(values):
+    return [date_cls.fromisoformat(value) for value in values]
+
+
+def run_bulk_attendance(job):
+    params = job.params
+    created = mark_student_dates(int(params['student_id']), _dates(params['dates']), params['status'],
+                                 job.created_by, params['overwrite'])
+    yield {'done': True, 'count': created}
+
+
+def run_backfill(job):
+    params = job.params
+    yield from iter_backfill(params['student_ids'], _dates(params['dates']), params['status'], job.created_by,
+                             overwrite=params['overwrite'])
+
+
+def _run_import(job, columns, start):
+    params = job.params
+    # A retried job carries on after the last batch the previous attempt recorded
+    start_row = job.progress.get('row', params.get('start_row', 0))
+    try:
+        with open(params['path'], newline='', encoding='utf-8-sig') as f:
+            yield from start(read_csv(f, columns, start_row))
+    except FileNotFoundError:
+        raise JobError('The uploaded file is no longer available')
+    os.remove(params['path'])
+
+
+def run_roster_import(job):
+    yield from _run_import(
+        job, ROSTER_COLUMNS, lambda rows: import_roster(rows, password_hash=job.params.get('password_hash'))
+    )
+
+
+def run_attendance_import(job):
+    progress = job.progress
+    first_date, last_date = progress.get('first_date'), progress.get('last_date')
+    yield from _run_import(job, ATTENDANCE_COLUMNS, lambda rows: import_attendance(
+        rows, job.created_by,
+        first_date=date_cls.fromisoformat(first_date) if first_date else None,
+        last_date=date_cls.fromisoformat(last_date) if last_date else None,
+    ))
+
+
+def run_export(job):
+    params = job.params
+    output = params['output']
+    rows = export_rows(date_cls.fromisoformat(params['start']), date_cls.fromisoformat(params['end']),
+                       params.get('classroom_id'))
+    path = jobs_dir('exports', f'job-{job.pk}.{output}')
+    if output == 'parquet':
+        count = write_parquet(rows, path)
+    else:
+        count = 0
+
+        def counted():
+            nonlocal count
+            for row in rows:
+                count += 1
+                yield row
+
+        with open(path, 'w', newline='') as f:
+            for chunk in iter_csv(counted()):
+                f.write(chunk)
+                yield {'rows': count}
+    filename = f"attendance_{params['start']}_{params['end']}.{output}"
+    yield {'done': True, 'rows': count, 'file': path, 'filename': filename}
+
+
+HANDLERS = {
+    'bulk_attendance': run_bulk_attendance,
+    'backfill': run_backfill,
+    'import_roster': run_roster_import,
+    'import_attendance': run_attendance_import,
+    'export': run_export,
+}
+
+
+# Worker side
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim_next(worker):
+    """Mark the oldest queued job RUNNING for `worker` and return it, or None if the queue is empty."""
+    while True:
+        with transaction.atomic():
+            queued = Job.objects.filter(status=Job.Status.QUEUED).order_by('id')
+            if connection.features.has_select_for_update_skip_locked:
+                queued = queued.select_for_update(skip_locked=True)
+            job = queued.only('id').first()
+            if job is None:
+                return None
+            now = timezone.now()
+            claimed = Job.objects.filter(pk=job.pk, status=Job.Status.QUEUED).update(
+                status=Job.Status.RUNNING, worker=worker, attempts=F('attempts') + 1,
+                started_at=now, heartbeat_at=now,
+            )
+        if claimed:
+            return Job.objects.select_related('created_by').get(pk=job.pk)
+        # Another worker claimed it between the read and the update; try the next one
+
+
+@contextmanager
+def heartbeat(job):
+    """Refresh `job`'s heartbeat_at from a side thread until the block exits."""
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(settings.JOBS_HEARTBEAT_SECONDS):
+                try:
+                    Job.objects.filter(pk=job.pk, status=Job.Status.RUNNING, worker=job.worker).update(
+                        heartbeat_at=timezone.now()
+                    )
+                except DatabaseError:
+                    # A missed beat only matters if they keep failing for JOBS_STALE_SECONDS
+                    logger.warning('Heartbeat for job %s failed', job.pk, exc_info=True)
+        finally:
+            # This thread's own connection
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f'job-{job.pk}-heartbeat', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_job(job):
+    """Run a claimed job to completion, recording progress and the outcome on the row."""
+    interval = settings.JOBS_PROGRESS_SECONDS
+    errors = []
+    result = None
+    saved = 0.0
+    try:
+        with heartbeat(job):
+            for event in HANDLERS[job.kind](job):
+                if isinstance(event.get('errors'), list):
+                    errors.extend(event['errors'][:MAX_RESULT_ERRORS - len(errors)])
+                if event.get('done'):
+                    result = event
+                elif time.monotonic() - saved >= interval:
+                    Job.objects.filter(pk=job.pk).update(progress=event, heartbeat_at=timezone.now())
+                    saved = time.monotonic()
+    except Exception as e:
+        logger.exception('Job %s (%s) failed', job.pk, job.kind)
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.Status.FAILED, error=str(e) or e.__class__.__name__, finished_at=timezone.now()
+        )
+        return
+    if errors:
+        result = {**(result or {}), 'error_rows': errors}
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.Status.SUCCEEDED, result=result, finished_at=timezone.now(), heartbeat_at=timezone.now()
+    )
+
+
+def work(poll=1.0, once=False, stop=None):
+    """Claim and run jobs until `stop` is set (or, with `once`, until the queue is empty)."""
+    worker = worker_name()
+    while stop is None or not stop.is_set():
+        job = claim_next(worker)
+        if job is None:
+            if once:
+                return
+            time.sleep(poll)
+            continue
+        run_job(job)
+
+
+def requeue_stale(timeout=None):
+    """Re-queue RUNNING jobs whose worker stopped heartbeating; fail those out of attempts."""
+    cutoff = timezone.now() - timedelta(seconds=timeout if timeout is not None else settings.JOBS_STALE_SECONDS)
+    stale = Job.objects.filter(status=Job.Status.RUNNING, heartbeat_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=settings.JOBS_MAX_ATTEMPTS).update(
+        status=Job.Status.FAILED, error='The worker running this job stopped responding', finished_at=timezone.now()
+    )
+    requeued = stale.update(status=Job.Status.QUEUED, worker='')
+    return requeued, failed
+
+
+def purge_files(retention=None):
+    """
+    Delete uploads and exports under JOBS_DIR last written more than `retention` seconds
+    ago (default JOBS_FILE_RETENTION_SECONDS; 0 keeps them), except uploads of jobs
+    still to run. Downloads of a purged export answer 410. Returns the number deleted.
+    """
+    retention = settings.JOBS_FILE_RETENTION_SECONDS if retention is None else retention
+    if not retention:
+        return 0
+    cutoff = time.time() - retention
+    pending = {
+        job.params.get('path')
+        for job in Job.objects.filter(status__in=[Job.Status.QUEUED, Job.Status.RUNNING]).only('params')
+    }
+    removed = 0
+    for folder in ('uploads', 'exports'):
+        try:
+            entries = list(os.scandir(os.path.join(settings.JOBS_DIR, folder)))
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            if entry.path in pending or not entry.is_file() or entry.stat().st_mtime >= cutoff:
+                continue
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            removed += 1
+    return removed
+
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from core.archive import BATCH_SIZE, ArchiveError, archive_year, restore_year
+from core.partitions import PartitionError
+from core.utils import academic_year_bounds
+
+class Command(BaseCommand):
+    help = 'Moves a closed academic year into compressed archive storage (or back with --restore)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('year', type=int, help='Academic year, named after the calendar year it starts in')
+        parser.add_argument('--restore', action='store_true', help='Move the archived year back into the live table')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Students per transaction')
+
+    def handle(self, *args, **options):
+        year = options['year']
+        start, end = academic_year_bounds(year)
+        last = end - timedelta(days=1)
+        try:
+            if options['restore']:
+                restored = restore_year(year, batch_size=options['batch_size'])
+                self.stdout.write(self.style.SUCCESS(f'Restored {restored} records from {start} to {last}'))
+                return
+            students, records = archive_year(year, batch_size=options['batch_size'])
+        except (ArchiveError, PartitionError) as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {records} records for {students} students from {start} to {last}'
+        ))
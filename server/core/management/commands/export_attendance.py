@@ -0,0 +1,44 @@
+import sys
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from core.exports import ExportError, export_rows, iter_csv, write_parquet
+
+class Command(BaseCommand):
+    help = 'Streams attendance for a date range to CSV or Parquet with flat memory use'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', required=True, help='First day (YYYY-MM-DD)')
+        parser.add_argument('--end', required=True, help='Last day (YYYY-MM-DD), inclusive')
+        parser.add_argument('--classroom', type=int, help='Only students enrolled in this classroom')
+        parser.add_argument('--output-format', choices=['csv', 'parquet'], default='csv')
+        parser.add_argument('--output', help='Output file; CSV defaults to stdout')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows fetched per server-side cursor round-trip')
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options['start'])
+            end = date.fromisoformat(options['end'])
+        except ValueError:
+            raise CommandError('Dates must be in YYYY-MM-DD format')
+
+        rows = export_rows(start, end, options['classroom'], chunk_size=options['chunk_size'])
+
+        if options['output_format'] == 'parquet':
+            if not options['output']:
+                raise CommandError('--output is required for Parquet')
+            try:
+                count = write_parquet(rows, options['output'], chunk_size=options['chunk_size'])
+            except ExportError as e:
+                raise CommandError(str(e))
+            self.stderr.write(self.style.SUCCESS(f'Exported {count} rows to {options["output"]}'))
+            return
+
+        if options['output']:
+            with open(options['output'], 'w', newline='') as f:
+                for chunk in iter_csv(rows):
+                    f.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f'Exported to {options["output"]}'))
+        else:
+            for chunk in iter_csv(rows):
+                sys.stdout.write(chunk)
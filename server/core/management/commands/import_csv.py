@@ -0,0 +1,93 @@
+import csv
+import json
+import os
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from core.imports import (
+    ATTENDANCE_COLUMNS, BATCH_SIZE, ROSTER_COLUMNS, ImportFormatError, import_attendance, import_roster, read_csv
+)
+from core.models import User
+
+class Command(BaseCommand):
+    help = 'Imports a roster or historical attendance from CSV in validated, chunked batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=['roster', 'attendance'])
+        parser.add_argument('path', help='CSV file with a header row')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Rows validated and written per transaction')
+        parser.add_argument('--checkpoint', help='JSON file recording progress; an existing one resumes the import')
+        parser.add_argument('--errors', help='Write rejected rows (row number, error) to this CSV')
+        parser.add_argument('--password', help='Roster only: initial password for new users (default: unusable)')
+        parser.add_argument('--marked-by', help='Attendance only: username recorded as marked_by')
+
+    def handle(self, *args, **options):
+        state = self.load_checkpoint(options['checkpoint'])
+        start_row = state.get('row', 0)
+        if start_row:
+            self.stdout.write(f'Resuming after row {start_row}')
+
+        errors_file = open(options['errors'], 'a', newline='') if options['errors'] else None
+        error_writer = csv.writer(errors_file) if errors_file else None
+        started = time.monotonic()
+        try:
+            with open(options['path'], newline='', encoding='utf-8-sig') as f:
+                progress = self.start(options, f, start_row, state)
+                shown = 0
+                for event in progress:
+                    if event.get('done'):
+                        break
+                    for error in event['errors']:
+                        if error_writer:
+                            error_writer.writerow([error['row'], error['error']])
+                        elif shown < 20:
+                            self.stderr.write(f"  row {error['row']}: {error['error']}")
+                            shown += 1
+                    state = {key: event[key] for key in ('row', 'first_date', 'last_date') if key in event}
+                    self.save_checkpoint(options['checkpoint'], state)
+                    rate = (event['row'] - start_row) / max(time.monotonic() - started, 1e-9)
+                    self.stdout.write(f"  {event['row']} rows ({rate:,.0f} rows/s)")
+        except ImportFormatError as e:
+            raise CommandError(str(e))
+        finally:
+            if errors_file:
+                errors_file.close()
+
+        if options['checkpoint'] and os.path.exists(options['checkpoint']):
+            os.remove(options['checkpoint'])
+        summary = ', '.join(f'{key} {value}' for key, value in event.items() if key != 'done')
+        self.stdout.write(self.style.SUCCESS(f'Imported {options["kind"]}: {summary} in {time.monotonic() - started:.1f}s'))
+
+    def start(self, options, f, start_row, state):
+        batch_size = options['batch_size']
+        if options['kind'] == 'roster':
+            rows = read_csv(f, ROSTER_COLUMNS, start_row)
+            return import_roster(rows, batch_size=batch_size, password=options['password'])
+
+        marked_by = None
+        if options['marked_by']:
+            marked_by = User.objects.filter(username=options['marked_by']).first()
+            if marked_by is None:
+                raise CommandError(f'Unknown user: {options["marked_by"]}')
+        rows = read_csv(f, ATTENDANCE_COLUMNS, start_row)
+        first_date, last_date = state.get('first_date'), state.get('last_date')
+        return import_attendance(
+            rows, marked_by, batch_size=batch_size,
+            first_date=date.fromisoformat(first_date) if first_date else None,
+            last_date=date.fromisoformat(last_date) if last_date else None,
+        )
+
+    def load_checkpoint(self, path):
+        if not path or not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def save_checkpoint(self, path, state):
+        if not path:
+            return
+        # Write-then-rename so an interrupted write never leaves a corrupt checkpoint
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump(state, f, default=str)
+        os.replace(f'{path}.tmp', path)
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.partitions import PartitionError, partition_attendance
+
+class Command(BaseCommand):
+    help = 'Range-partitions AttendanceRecord by academic year on PostgreSQL and adds upcoming years'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ahead', type=int, default=1, help='Academic years after the current one to create partitions for')
+
+    def handle(self, *args, **options):
+        if options['ahead'] < 0:
+            raise CommandError('--ahead must not be negative')
+        try:
+            created = partition_attendance(ahead=options['ahead'])
+        except PartitionError as e:
+            raise CommandError(str(e))
+        if created:
+            self.stdout.write(self.style.SUCCESS(f'Created partitions: {", ".join(created)}'))
+        else:
+            self.stdout.write('Partitions are up to date')
@@ -0,0 +1,22 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from core.rollups import rebuild_rollups
+
+class Command(BaseCommand):
+    help = 'Recomputes the daily/monthly attendance rollups from AttendanceRecord to repair drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day to rebuild (YYYY-MM-DD); widened to the start of its month')
+        parser.add_argument('--end', help='Last day to rebuild (YYYY-MM-DD); widened to the end of its month')
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options['start']) if options['start'] else None
+            end = date.fromisoformat(options['end']) if options['end'] else None
+        except ValueError:
+            raise CommandError('Dates must be in YYYY-MM-DD format')
+
+        self.stdout.write('Rebuilding rollups...')
+        daily, monthly = rebuild_rollups(start, end)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {daily} daily and {monthly} monthly rollups'))
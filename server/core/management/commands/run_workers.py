@@ -0,0 +1,81 @@
+import multiprocessing
+import os
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+# How often the supervisor looks for jobs abandoned by crashed workers and expired files
+STALE_CHECK_SECONDS = 60
+
+
+def _worker_main(settings_module, poll):
+    # Spawned workers start without Django configured
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+    from core.jobs import work
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    # The supervisor handles Ctrl-C for the whole group
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    work(poll=poll, stop=stop)
+
+
+class Command(BaseCommand):
+    help = 'Runs background job workers (bulk marks, imports, exports) until interrupted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=2, help='Worker processes (1 runs in this process)')
+        parser.add_argument('--poll', type=float, default=1.0, help='Seconds between checks of an empty queue')
+        parser.add_argument('--once', action='store_true', help='Run queued jobs in this process, then exit')
+
+    def handle(self, *args, **options):
+        # Imported here: spawned workers import this module before Django is set up
+        from core.jobs import purge_files, requeue_stale, work
+
+        requeued, failed = requeue_stale()
+        if requeued or failed:
+            self.stdout.write(f'Re-queued {requeued} and failed {failed} abandoned jobs')
+        purged = purge_files()
+        if purged:
+            self.stdout.write(f'Deleted {purged} expired job files')
+
+        if options['once'] or options['processes'] <= 1:
+            work(poll=options['poll'], once=options['once'])
+            return
+
+        # Workers open their own connections
+        connections.close_all()
+        context = multiprocessing.get_context('spawn')
+        settings_module = os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+        def start():
+            process = context.Process(target=_worker_main, args=(settings_module, options['poll']), daemon=True)
+            process.start()
+            return process
+
+        workers = [start() for _ in range(options['processes'])]
+        self.stdout.write(f'Started {len(workers)} workers')
+
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *args: stop.set())
+        signal.signal(signal.SIGINT, lambda *args: stop.set())
+        try:
+            while not stop.wait(STALE_CHECK_SECONDS):
+                # Replace crashed workers; their jobs are re-queued once stale
+                for i, process in enumerate(workers):
+                    if not process.is_alive():
+                        self.stderr.write(f'Worker {process.pid} exited with {process.exitcode}; restarting')
+                        workers[i] = start()
+                requeue_stale()
+                purge_files()
+        finally:
+            # Workers finish the job in hand before exiting
+            for process in workers:
+                process.terminate()
+            for process in workers:
+                process.join()
+        self.stdout.write('Workers stopped')
@@ -1,10 +1,39 @@
+import io
+import random
+import time
+from datetime import date, timedelta
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand
-from core.models import User, Classroom, Enrollment
+from django.db import connection, transaction
+from django.utils import timezone
+from core.models import User, Classroom, Enrollment, AttendanceRecord
+from core.rollups import rebuild_rollups
 
 class Command(BaseCommand):
     help = 'Seeds initial data for CAS'
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        # Synthetic school mode, used by the benchmark suite. Without these options
+        # the command seeds the small demo dataset below.
+        parser.add_argument('--classrooms', type=int, help='Number of classrooms to generate')
+        parser.add_argument('--students', type=int, default=30, help='Students per classroom')
+        parser.add_argument('--days', type=int, default=20, help='School days (weekdays up to today) of attendance')
+        parser.add_argument('--absence-rate', type=float, default=0.1, help='Probability that a generated day is ABSENT')
+        parser.add_argument('--batch-size', type=int, default=10000, help='Rows per INSERT/COPY chunk')
+        parser.add_argument('--copy', action='store_true', help='Load attendance with COPY (PostgreSQL only)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, for reproducible datasets')
+
+    def handle(self, *args, **options):
+        if options['classrooms']:
+            self.seed_school(
+                options['classrooms'], options['students'], options['days'],
+                absence_rate=options['absence_rate'], batch_size=options['batch_size'],
+                use_copy=options['copy'], seed=options['seed'],
+            )
+            return
+
         self.stdout.write('Seeding data...')
 
         # Create Classroom
@@ -48,3 +77,158 @@ class Command(BaseCommand):
             Enrollment.objects.get_or_create(student=student, classroom=classroom)
 
         self.stdout.write(self.style.SUCCESS('Successfully seeded data'))
+
+    def seed_school(self, num_classrooms, students_per_classroom, num_days,
+                    absence_rate=0.1, batch_size=10000, use_copy=False, seed=0):
+        """
+        Generate a synthetic school: `teacher` plus student1..studentN (all with password
+        'password123'), spread over Class 1..num_classrooms, with `num_days` weekdays of
+        attendance. Existing rows with the same names are reused, so re-running is safe.
+
+        Attendance rows are generated lazily and written in `batch_size` chunks, so memory
+        stays flat at millions of rows; with `use_copy` on Postgres they are streamed
+        through COPY instead of INSERT.
+        """
+        started = time.monotonic()
+        self.stdout.write(
+            f'Seeding school: {num_classrooms} classrooms x {students_per_classroom} students x {num_days} days...'
+        )
+        # Hashing is deliberately slow; do it once and share the hash across every user
+        password = make_password('password123')
+
+        teacher, _ = User.objects.get_or_create(
+            username='teacher',
+            defaults={'role': User.Role.TEACHER, 'password': password, 'first_name': 'John', 'last_name': 'Doe'}
+        )
+
+        names = [f'Class {c}' for c in range(1, num_classrooms + 1)]
+        existing = set(Classroom.objects.filter(name__in=names).values_list('name', flat=True))
+        Classroom.objects.bulk_create([Classroom(name=name) for name in names if name not in existing])
+        by_name = dict(Classroom.objects.filter(name__in=names).values_list('name', 'id'))
+        classroom_ids = [by_name[name] for name in names]
+
+        total_students = num_classrooms * students_per_classroom
+        User.objects.bulk_create(
+            (User(username=f'student{n}', role=User.Role.STUDENT, password=password,
+                  first_name='Student', last_name=str(n))
+             for n in range(1, total_students + 1)),
+            batch_size=batch_size, ignore_conflicts=True
+        )
+        # One scan instead of a huge IN list; synthetic usernames are student<n>
+        student_ids = [None] * total_students
+        for username, user_id in User.objects.filter(
+            role=User.Role.STUDENT, username__startswith='student'
+        ).values_list('username', 'id').iterator(chunk_size=batch_size):
+            suffix = username[len('student'):]
+            if suffix.isdigit() and 1 <= int(suffix) <= total_students:
+                student_ids[int(suffix) - 1] = user_id
+
+        Enrollment.objects.bulk_create(
+            (Enrollment(student_id=student_id, classroom_id=classroom_ids[n // students_per_classroom])
+             for n, student_id in enumerate(student_ids)),
+            batch_size=batch_size, ignore_conflicts=True
+        )
+        self.stdout.write(f'  {len(classroom_ids)} classrooms, {total_students} students ready')
+
+        days = []
+        day = date.today()
+        while len(days) < num_days:
+            if day.weekday() < 5:
+                days.append(day)
+            day -= timedelta(days=1)
+
+        rng = random.Random(seed)
+        now = timezone.now()
+        rows = (
+            (d, student_id,
+             AttendanceRecord.Status.ABSENT if rng.random() < absence_rate else AttendanceRecord.Status.PRESENT)
+            for d in days
+            for student_id in student_ids
+        )
+
+        total_rows = len(days) * total_students
+        if use_copy and connection.vendor == 'postgresql':
+            written = self.copy_records(rows, teacher.id, now, batch_size, total_rows)
+        else:
+            if use_copy:
+                self.stdout.write(self.style.WARNING('  --copy needs PostgreSQL; falling back to batched INSERTs'))
+            written = self.insert_records(rows, teacher.id, now, batch_size, total_rows)
+
+        rebuild_rollups()
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(classroom_ids)} classrooms, {total_students} students, '
+            f'{written} attendance rows generated in {elapsed:.1f}s'
+        ))
+
+    def report_progress(self, written, total_rows, started):
+        rate = written / max(time.monotonic() - started, 1e-9)
+        self.stdout.write(f'  {written}/{total_rows} rows ({rate:,.0f} rows/s)')
+
+    def insert_records(self, rows, teacher_id, now, batch_size, total_rows):
+        """
+        Chunked multi-row INSERT ... ON CONFLICT DO NOTHING through executemany.
+        bulk_create spends most of its time compiling per-field SQL params at this volume,
+        so values are adapted once per distinct date/timestamp instead of once per row.
+        """
+        table = AttendanceRecord._meta.db_table
+        sql = (
+            f'INSERT INTO {table} (date, student_id, status, marked_by_id, marked_at, updated_at) '
+            'VALUES (%s, %s, %s, %s, %s, %s) ON CONFLICT (date, student_id) DO NOTHING'
+        )
+        stamp = connection.ops.adapt_datetimefield_value(now)
+        adapted_dates = {}
+        started = time.monotonic()
+        written = 0
+        with connection.cursor() as cursor:
+            while True:
+                batch = []
+                for d, student_id, status_val in islice(rows, batch_size):
+                    if d not in adapted_dates:
+                        adapted_dates[d] = connection.ops.adapt_datefield_value(d)
+                    batch.append((adapted_dates[d], student_id, status_val, teacher_id, stamp, stamp))
+                if not batch:
+                    return written
+                with transaction.atomic():
+                    cursor.executemany(sql, batch)
+                written += len(batch)
+                if written % (batch_size * 10) < batch_size:
+                    self.report_progress(written, total_rows, started)
+
+    def copy_records(self, rows, teacher_id, now, batch_size, total_rows):
+        """
+        Stream rows through COPY into a temp table, then merge with ON CONFLICT DO NOTHING
+        so re-runs over existing data don't fail on the (date, student) unique index.
+        """
+        table = AttendanceRecord._meta.db_table
+        columns = 'date, student_id, status, marked_by_id, marked_at, updated_at'
+        started = time.monotonic()
+        written = 0
+        stamp = now.isoformat()
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMP TABLE seed_attendance ON COMMIT DROP AS SELECT {columns} FROM {table} WITH NO DATA'
+            )
+            raw = cursor.cursor
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                lines = ''.join(
+                    f'{d.isoformat()}\t{student_id}\t{status_val}\t{teacher_id}\t{stamp}\t{stamp}\n'
+                    for d, student_id, status_val in batch
+                )
+                copy_sql = f'COPY seed_attendance ({columns}) FROM STDIN'
+                if hasattr(raw, 'copy'):  # psycopg 3
+                    with raw.copy(copy_sql) as copy:
+                        copy.write(lines)
+                else:  # psycopg2
+                    raw.copy_expert(copy_sql, io.StringIO(lines))
+                written += len(batch)
+                if written % (batch_size * 10) < batch_size:
+                    self.report_progress(written, total_rows, started)
+            cursor.execute(
+                f'INSERT INTO {table} ({columns}) SELECT {columns} FROM seed_attendance '
+                'ON CONFLICT (date, student_id) DO NOTHING'
+            )
+        return written
@@ -0,0 +1,232 @@
+"""
+Request instrumentation: per-view latency histograms, DB query counts and time,
+render time and response size, exposed in Prometheus text format.
+
+MetricsMiddleware records into a process-local registry guarded by one lock; the
+per-request work is a few perf_counter() calls and a context-variable lookup per
+query, so it is cheap enough to leave on under load. With a multi-process
+server each worker reports its own series (scrape every worker, or aggregate
+them in Prometheus).
+"""
+import contextvars
+import logging
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger('core.metrics')
+
+# Upper bounds in seconds, Prometheus style (+Inf is implicit)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Series:
+    __slots__ = ('count', 'buckets', 'duration', 'queries', 'query_time', 'render_time', 'bytes', 'errors')
+
+    def __init__(self):
+        self.count = 0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.duration = 0.0
+        self.queries = 0
+        self.query_time = 0.0
+        self.render_time = 0.0
+        self.bytes = 0
+        self.errors = 0
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.series = {}
+
+    def observe(self, view, method, duration, queries, query_time, render_time, size, status_code):
+        key = (view, method)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = Series()
+            series.count += 1
+            series.duration += duration
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if duration <= bound:
+                    series.buckets[i] += 1
+            series.queries += queries
+            series.query_time += query_time
+            series.render_time += render_time
+            series.bytes += size
+            if status_code >= 500:
+                series.errors += 1
+
+    def reset(self):
+        with self.lock:
+            self.series = {}
+
+    def render(self):
+        with self.lock:
+            snapshot = sorted(self.series.items())
+            snapshot = [(key, _copy(series)) for key, series in snapshot]
+
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        family('cas_request_duration_seconds', 'histogram', 'Request latency per view.')
+        for (view, method), s in snapshot:
+            labels = f'view="{view}",method="{method}"'
+            for bound, count in zip(LATENCY_BUCKETS, s.buckets):
+                lines.append(f'cas_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'cas_request_duration_seconds_bucket{{{labels},le="+Inf"}} {s.count}')
+            lines.append(f'cas_request_duration_seconds_sum{{{labels}}} {s.duration:.6f}')
+            lines.append(f'cas_request_duration_seconds_count{{{labels}}} {s.count}')
+
+        counters = [
+            ('cas_db_queries_total', 'DB queries issued per view.', 'queries', '{}'),
+            ('cas_db_query_seconds_total', 'Time spent in DB queries per view.', 'query_time', '{:.6f}'),
+            ('cas_render_seconds_total', 'Time spent rendering (serializing) responses per view.', 'render_time', '{:.6f}'),
+            ('cas_response_bytes_total', 'Response body bytes per view.', 'bytes', '{}'),
+            ('cas_request_errors_total', 'Responses with a 5xx status per view.', 'errors', '{}'),
+        ]
+        for name, help_text, attr, fmt in counters:
+            family(name, 'counter', help_text)
+            for (view, method), s in snapshot:
+                value = fmt.format(getattr(s, attr))
+                lines.append(f'{name}{{view="{view}",method="{method}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _copy(series):
+    clone = Series()
+    for attr in Series.__slots__:
+        value = getattr(series, attr)
+        setattr(clone, attr, list(value) if isinstance(value, list) else value)
+    return clone
+
+
+registry = Registry()
+
+
+class QueryRecorder:
+    """connection.execute_wrapper that counts and times queries; keeps SQL only when asked."""
+
+    def __init__(self, keep_sql):
+        self.count = 0
+        self.time = 0.0
+        self.keep_sql = keep_sql
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.time += elapsed
+            if self.keep_sql:
+                self.statements.append((elapsed, sql))
+
+
+# The recorder for the current request. A context variable rather than a per-connection
+# wrapper, so queries are counted on whichever thread runs them: under ASGI the ORM
+# runs in sync_to_async threads, which inherit the request's context.
+_recorder = contextvars.ContextVar('cas_metrics_recorder', default=None)
+
+
+def _dispatch(execute, sql, params, many, context):
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_wrapper(connection, **kwargs):
+    if _dispatch not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_dispatch)
+
+
+connection_created.connect(install_wrapper)
+
+
+class MetricsMiddleware:
+    """
+    Records every request into `registry`, labelled by URL name.
+    Settings: METRICS_ENABLED (default True), METRICS_SLOW_REQUEST_MS (log requests
+    slower than this, with their SQL; 0 disables). Works under WSGI and ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'METRICS_ENABLED', True)
+        self.slow_ms = getattr(settings, 'METRICS_SLOW_REQUEST_MS', 0)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        # Connections opened before this module was imported missed connection_created
+        install_wrapper(connection)
+        recorder = QueryRecorder(keep_sql=bool(self.slow_ms))
+        token = _recorder.set(recorder)
+        request._metrics_render_time = 0.0
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        self.record(request, response, time.perf_counter() - start, recorder)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        recorder = QueryRecorder(keep_sql=bool(self.slow_ms))
+        token = _recorder.set(recorder)
+        request._metrics_render_time = 0.0
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        self.record(request, response, time.perf_counter() - start, recorder)
+        return response
+
+    def record(self, request, response, duration, recorder):
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name if match else None) or 'unmatched'
+        size = 0 if response.streaming else len(response.content)
+        registry.observe(view, request.method, duration, recorder.count, recorder.time,
+                         request._metrics_render_time, size, response.status_code)
+
+        if self.slow_ms and duration * 1000 >= self.slow_ms:
+            slowest = sorted(recorder.statements, reverse=True)[:10]
+            logger.warning(
+                'Slow request %s %s (%s) %.1fms, %d queries in %.1fms\n%s',
+                request.method, request.path, view, duration * 1000, recorder.count, recorder.time * 1000,
+                '\n'.join(f'  {elapsed * 1000:.1f}ms {sql}' for elapsed, sql in slowest)
+            )
+
+    def process_template_response(self, request, response):
+        if not self.enabled:
+            return response
+        # DRF responses render after the view returns; time it via a post-render callback
+        started = time.perf_counter()
+
+        def record(rendered):
+            request._metrics_render_time += time.perf_counter() - started
+
+        response.add_post_render_callback(record)
+        return response
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_enrollment_classroom_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('record_id', models.BigIntegerField()),
+                ('student_id', models.BigIntegerField()),
+                ('date', models.DateField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='attendancerecord',
+            index=models.Index(fields=['updated_at', 'id'], include=('student', 'date'), name='attendance_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendancetombstone',
+            index=models.Index(fields=['deleted_at', 'id'], name='tombstone_deleted_idx'),
+        ),
+    ]
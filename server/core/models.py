@@ -1,3 +1,4 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 
@@ -23,6 +24,10 @@ class Enrollment(models.Model):
 
     class Meta:
         unique_together = ('student', 'classroom')
+        indexes = [
+            # The unique index leads with student; classroom-scoped views need the reverse
+            models.Index(fields=['classroom', 'student'], name='enrollment_classroom_idx'),
+        ]
 
 class AttendanceRecord(models.Model):
     class Status(models.TextChoices):
@@ -40,6 +45,147 @@ class AttendanceRecord(models.Model):
     class Meta:
         unique_together = ('date', 'student')
         ordering = ['-date']
+        indexes = [
+            # Per-student month scans (calendar, student analytics)
+            models.Index(fields=['student', 'date'], include=['status'], name='attendance_student_date_idx'),
+            # Class-wide month scans grouped by day and status
+            models.Index(fields=['date', 'status'], include=['student'], name='attendance_date_status_idx'),
+            # Change feed keyset scans (core.sync)
+            models.Index(fields=['updated_at', 'id'], include=['student', 'date'], name='attendance_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.date} - {self.student.username} - {self.status}"
+
+class AttendanceTombstone(models.Model):
+    """
+    A deleted AttendanceRecord, kept so the change feed (core.sync) can report deletions.
+    Plain columns rather than foreign keys, so tombstones outlive the student row.
+    """
+    record_id = models.BigIntegerField()
+    student_id = models.BigIntegerField()
+    date = models.DateField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['deleted_at', 'id'], name='tombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} - student {self.student_id} - record {self.record_id} deleted"
+
+class AttendanceArchive(models.Model):
+    """
+    One student's AttendanceRecords for an archived academic year, stored as
+    zlib-compressed column-oriented JSON. See core.archive.
+    """
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='attendance_archives')
+    # The academic year, named after the calendar year it starts in (core.utils.academic_year)
+    year = models.PositiveSmallIntegerField()
+    records = models.BinaryField()
+    count = models.PositiveIntegerField(default=0)
+    archived_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # Leads with year: archive_year and the rollup guard look years up on their own
+            models.UniqueConstraint(fields=['year', 'student'], name='unique_attendance_archive'),
+        ]
+
+    def __str__(self):
+        return f"{self.year} - student {self.student_id} - {self.count} records"
+
+class DailyAttendanceRollup(models.Model):
+    """
+    Per-day attendance counts for a classroom, maintained by core.rollups.
+    A null classroom holds the school-wide totals for the day.
+    """
+    classroom = models.ForeignKey(Classroom, on_delete=models.CASCADE, null=True, blank=True, related_name='daily_rollups')
+    date = models.DateField()
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['classroom', 'date'], name='unique_classroom_daily_rollup'),
+            models.UniqueConstraint(fields=['date'], condition=models.Q(classroom__isnull=True), name='unique_school_daily_rollup'),
+        ]
+        ordering = ['date']
+
+    def __str__(self):
+        return f"{self.date} - {self.classroom or 'school'} - {self.present}/{self.total}"
+
+class MonthlyStudentRollup(models.Model):
+    """Per-student attendance counts for a month (keyed by its first day), maintained by core.rollups."""
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='monthly_rollups')
+    month = models.DateField()
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('student', 'month')
+        ordering = ['month']
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} - {self.student.username} - {self.present}/{self.total}"
+
+class Job(models.Model):
+    """
+    A unit of background work (bulk marks, imports, exports) run by `manage.py run_workers`.
+    See core.jobs for the kinds and the worker loop.
+    """
+    class Status(models.TextChoices):
+        QUEUED = 'QUEUED', 'Queued'
+        RUNNING = 'RUNNING', 'Running'
+        SUCCEEDED = 'SUCCEEDED', 'Succeeded'
+        FAILED = 'FAILED', 'Failed'
+
+    kind = models.CharField(max_length=30)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    params = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    progress = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True, default='')
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='jobs')
+    # Retried requests with the same key get the job created by the first one
+    idempotency_key = models.CharField(max_length=255, null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['created_by', 'idempotency_key'], name='unique_job_idempotency_key'),
+        ]
+        indexes = [
+            # Workers claim the oldest queued job
+            models.Index(fields=['status', 'id'], name='job_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
+class IngestReceipt(models.Model):
+    """
+    The outcome of a roll call applied through the ingest endpoint (core.ingest),
+    kept so a client retrying with the same key gets it back instead of a second write.
+    """
+    key = models.CharField(max_length=255)
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='ingest_receipts')
+    result = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['created_by', 'key'], name='unique_ingest_receipt_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.created_by_id})"
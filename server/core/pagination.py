@@ -0,0 +1,109 @@
+"""
+Keyset (cursor) pagination for the list endpoints.
+
+Pages are located with a WHERE clause on the view's `keyset_ordering` columns
+('-' for descending, as in order_by()) rather than OFFSET, so page N costs the
+same as page 1 and rows inserted meanwhile never shift the window. Pagination is opt-in: a request without
+`cursor` or `page_size` gets the full, unpaginated list as before.
+"""
+import base64
+import json
+from datetime import date
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def _encode(values):
+    raw = json.dumps([v.isoformat() if isinstance(v, date) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode(cursor):
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, UnicodeError):
+        raise ValidationError({'cursor': 'Invalid cursor'})
+
+
+def _column(field):
+    return field.lstrip('-')
+
+
+def keyset_after(fields, values):
+    """Q matching rows strictly after `values` in `fields` order (a leading '-' sorts that field descending)."""
+    condition = Q()
+    for i, field in enumerate(fields):
+        equal = {_column(fields[j]): values[j] for j in range(i)}
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= Q(**equal, **{f'{_column(field)}__{lookup}': values[i]})
+    return condition
+
+
+class KeysetPagination(BasePagination):
+    page_size = api_settings.PAGE_SIZE or 100
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering = ('id',)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            raise ValidationError({'page_size': 'Must be an integer'})
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        self.request = request
+        self.fields = tuple(getattr(view, 'keyset_ordering', self.ordering))
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.fields)
+
+        cursor = params.get(self.cursor_query_param)
+        if cursor:
+            values = _decode(cursor)
+            if not isinstance(values, list) or len(values) != len(self.fields):
+                raise ValidationError({'cursor': 'Invalid cursor'})
+            try:
+                queryset = queryset.filter(keyset_after(self.fields, values))
+            except (TypeError, ValueError, DjangoValidationError):
+                raise ValidationError({'cursor': 'Invalid cursor'})
+
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.last = rows[-1] if rows else None
+        return rows
+
+    def _position(self, row):
+        if isinstance(row, dict):
+            return [row[_column(field)] for field in self.fields]
+        return [getattr(row, _column(field)) for field in self.fields]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, _encode(self._position(self.last)))
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,181 @@
+"""
+Range partitioning of AttendanceRecord by academic year (PostgreSQL only).
+
+`manage.py partition_attendance` converts core_attendancerecord in place into a
+table partitioned by RANGE (date): one partition per academic year, named after
+the calendar year it starts in (core_attendancerecord_y2024), plus a default
+partition for dates outside them. Date-filtered queries only scan the partitions
+they need, each with its own small indexes, and archive_year (core.archive) drops
+a closed year's partition once its rows are archived. Run the command again
+before each new year to add its partition ahead of time.
+
+PostgreSQL requires a partitioned table's primary key to include the partition
+column, so the converted table's key is (id, date). ids still come from a single
+sequence and stay unique, and Django keeps treating `id` as the primary key.
+Nothing references attendance rows by foreign key (tombstones keep plain ids).
+
+SQLite has no partitioning; there, archive_year moving closed years out of the
+live table is what keeps it small.
+"""
+from datetime import date
+
+from django.db import connection, transaction
+
+from .models import AttendanceRecord
+from .utils import academic_year, academic_year_bounds
+
+TABLE = AttendanceRecord._meta.db_table
+DEFAULT_PARTITION = f'{TABLE}_default'
+
+
+class PartitionError(Exception):
+    """Partitioning is unavailable or the table is in an unexpected state."""
+
+
+def partition_name(year):
+    return f'{TABLE}_y{year}'
+
+
+def _qn(name):
+    return connection.ops.quote_name(name)
+
+
+def _bounds_sql(year):
+    start, end = academic_year_bounds(year)
+    return f"FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+
+
+def _start_ddl(cursor):
+    # Deferred foreign-key checks still pending in this transaction would make ALTER TABLE fail
+    cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+
+def is_partitioned(cursor):
+    cursor.execute('SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass', [TABLE])
+    return cursor.fetchone() is not None
+
+
+def year_partitions(cursor):
+    """{academic year: partition name} for the existing year partitions."""
+    cursor.execute(
+        'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = %s::regclass',
+        [TABLE],
+    )
+    prefix = f'{TABLE}_y'
+    return {int(name[len(prefix):]): name for (name,) in cursor.fetchall() if name.startswith(prefix)}
+
+
+def _convert(cursor, years):
+    """Rebuild TABLE as a partitioned table with a partition per year in `years`, keeping every row."""
+    old = f'{TABLE}_unpartitioned'
+    cursor.execute(f'LOCK TABLE {_qn(TABLE)} IN ACCESS EXCLUSIVE MODE')
+
+    # Recreated under the same names once the old table is gone, so later migrations still find them
+    cursor.execute(
+        'SELECT pg_get_indexdef(indexrelid) FROM pg_index WHERE indrelid = %s::regclass AND indexrelid NOT IN '
+        '(SELECT conindid FROM pg_constraint WHERE conrelid = %s::regclass)',
+        [TABLE, TABLE],
+    )
+    indexes = [definition for (definition,) in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'f') ORDER BY contype DESC",
+        [TABLE],
+    )
+    constraints = cursor.fetchall()
+
+    cursor.execute(f'ALTER TABLE {_qn(TABLE)} RENAME TO {_qn(old)}')
+    # Columns and NOT NULLs only: the id default belonged to the old table's sequence
+    cursor.execute(f'CREATE TABLE {_qn(TABLE)} (LIKE {_qn(old)}) PARTITION BY RANGE ("date")')
+    for year in years:
+        cursor.execute(f'CREATE TABLE {_qn(partition_name(year))} PARTITION OF {_qn(TABLE)} FOR VALUES {_bounds_sql(year)}')
+    cursor.execute(f'CREATE TABLE {_qn(DEFAULT_PARTITION)} PARTITION OF {_qn(TABLE)} DEFAULT')
+    cursor.execute(f'INSERT INTO {_qn(TABLE)} SELECT * FROM {_qn(old)}')
+    cursor.execute(f'SELECT COALESCE(MAX(id), 0) FROM {_qn(old)}')
+    last_id = cursor.fetchone()[0]
+    cursor.execute(f'DROP TABLE {_qn(old)}')
+
+    sequence = f'{TABLE}_id_seq'
+    cursor.execute(f'CREATE SEQUENCE {_qn(sequence)} OWNED BY {_qn(TABLE)}.id')
+    cursor.execute('SELECT setval(%s, %s, %s)', [sequence, max(last_id, 1), last_id > 0])
+    cursor.execute(f"ALTER TABLE {_qn(TABLE)} ALTER COLUMN id SET DEFAULT nextval('{sequence}')")
+
+    for name, kind, definition in constraints:
+        if kind == 'p':
+            definition = 'PRIMARY KEY (id, "date")'
+        cursor.execute(f'ALTER TABLE {_qn(TABLE)} ADD CONSTRAINT {_qn(name)} {definition}')
+    for definition in indexes:
+        cursor.execute(definition)
+
+
+def _add_partition(cursor, year):
+    """Create the partition for `year`, moving any of its rows out of the default partition."""
+    start, end = academic_year_bounds(year)
+    name = partition_name(year)
+    cursor.execute(
+        f'SELECT EXISTS (SELECT 1 FROM {_qn(DEFAULT_PARTITION)} WHERE "date" >= %s AND "date" < %s)', [start, end]
+    )
+    if not cursor.fetchone()[0]:
+        cursor.execute(f'CREATE TABLE {_qn(name)} PARTITION OF {_qn(TABLE)} FOR VALUES {_bounds_sql(year)}')
+        return
+    # PostgreSQL refuses a new partition while the default one holds rows in its range
+    cursor.execute(f'ALTER TABLE {_qn(TABLE)} DETACH PARTITION {_qn(DEFAULT_PARTITION)}')
+    cursor.execute(f'CREATE TABLE {_qn(name)} PARTITION OF {_qn(TABLE)} FOR VALUES {_bounds_sql(year)}')
+    cursor.execute(
+        f'INSERT INTO {_qn(TABLE)} SELECT * FROM {_qn(DEFAULT_PARTITION)} WHERE "date" >= %s AND "date" < %s', [start, end]
+    )
+    cursor.execute(f'DELETE FROM {_qn(DEFAULT_PARTITION)} WHERE "date" >= %s AND "date" < %s', [start, end])
+    cursor.execute(f'ALTER TABLE {_qn(TABLE)} ATTACH PARTITION {_qn(DEFAULT_PARTITION)} DEFAULT')
+
+
+def partition_attendance(ahead=1, today=None):
+    """
+    Partition AttendanceRecord by academic year, converting the table the first time,
+    and create partitions through `ahead` years after the current one.
+    Returns the names of the partitions created.
+    """
+    if connection.vendor != 'postgresql':
+        raise PartitionError('Partitioning needs PostgreSQL; on other databases use archive_year to keep the table small')
+    current = academic_year(today or date.today())
+    with transaction.atomic(), connection.cursor() as cursor:
+        _start_ddl(cursor)
+        if not is_partitioned(cursor):
+            cursor.execute(f'SELECT MIN("date") FROM {_qn(TABLE)}')
+            first = cursor.fetchone()[0]
+            years = range(min(academic_year(first), current) if first else current, current + ahead + 1)
+            _convert(cursor, years)
+            return [partition_name(year) for year in years]
+
+        existing = year_partitions(cursor)
+        missing = [year for year in range(current, current + ahead + 1) if year not in existing]
+        for year in missing:
+            _add_partition(cursor, year)
+        return [partition_name(year) for year in missing]
+
+
+def restore_year_partition(year):
+    """Recreate the partition for a year whose archived rows are moving back (no-op when unpartitioned)."""
+    if connection.vendor != 'postgresql':
+        return
+    with transaction.atomic(), connection.cursor() as cursor:
+        if is_partitioned(cursor) and year not in year_partitions(cursor):
+            _start_ddl(cursor)
+            _add_partition(cursor, year)
+
+
+def drop_year_partition(year):
+    """Drop the emptied partition of an archived year; True if there was one to drop."""
+    if connection.vendor != 'postgresql':
+        return False
+    with transaction.atomic(), connection.cursor() as cursor:
+        if not is_partitioned(cursor):
+            return False
+        name = year_partitions(cursor).get(year)
+        if name is None:
+            return False
+        cursor.execute(f'SELECT EXISTS (SELECT 1 FROM {_qn(name)})')
+        if cursor.fetchone()[0]:
+            raise PartitionError(f'Partition {name} still holds records')
+        _start_ddl(cursor)
+        cursor.execute(f'DROP TABLE {_qn(name)}')
+        return True
@@ -0,0 +1,34 @@
+"""
+Optional MessagePack rendering (pip install msgpack).
+
+Views opt in by adding `optional_renderers()` to their renderer classes; clients
+then ask for it with `Accept: application/msgpack` or `?format=msgpack`. Without
+msgpack installed the renderer is simply not offered, and such requests get 406.
+"""
+from rest_framework.renderers import BaseRenderer
+from rest_framework.settings import api_settings
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, use_bin_type=True)
+
+
+def optional_renderers():
+    """The default renderers, plus MessagePack when msgpack is installed."""
+    renderers = list(api_settings.DEFAULT_RENDERER_CLASSES)
+    if msgpack is not None:
+        renderers.append(MessagePackRenderer)
+    return renderers
@@ -0,0 +1,137 @@
+"""
+Materialized attendance rollups.
+
+DailyAttendanceRollup and MonthlyStudentRollup are derived from AttendanceRecord.
+Every write path calls refresh_rollups() with the students and dates it touched,
+which recomputes only the affected rollup rows. rebuild_rollups() recomputes
+whole months and backs the `rebuild_rollups` management command. Neither touches
+academic years archived by core.archive, whose records are no longer live.
+"""
+import calendar
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+
+from .models import AttendanceArchive, AttendanceRecord, DailyAttendanceRollup, Enrollment, MonthlyStudentRollup
+from .utils import academic_year, academic_year_bounds, month_bounds
+from .cache import invalidate_all_analytics
+
+COUNTS = {
+    'present': Count('id', filter=Q(status=AttendanceRecord.Status.PRESENT)),
+    'absent': Count('id', filter=Q(status=AttendanceRecord.Status.ABSENT)),
+    'total': Count('id'),
+}
+
+BATCH_SIZE = 5000
+
+
+def _school_daily(records):
+    for day in records.values('date').annotate(**COUNTS).order_by().iterator():
+        yield DailyAttendanceRollup(classroom=None, **day)
+
+
+def _classroom_daily(records):
+    # A student enrolled in several classrooms counts towards each of them
+    grouped = records.values('student__enrollments__classroom_id', 'date').annotate(**COUNTS).order_by()
+    for day in grouped.iterator():
+        classroom_id = day.pop('student__enrollments__classroom_id')
+        yield DailyAttendanceRollup(classroom_id=classroom_id, **day)
+
+
+def _student_monthly(records):
+    grouped = records.annotate(month=TruncMonth('date')).values('student_id', 'month').annotate(**COUNTS).order_by()
+    for row in grouped.iterator():
+        yield MonthlyStudentRollup(**row)
+
+
+def _refresh(student_ids, dates):
+    months = {d.replace(day=1) for d in dates}
+    month_start = min(months)
+    month_end = month_bounds(max(months).year, max(months).month)[1]
+    classroom_ids = set(
+        Enrollment.objects.filter(student_id__in=student_ids).values_list('classroom_id', flat=True)
+    )
+
+    daily = list(_school_daily(AttendanceRecord.objects.filter(date__in=dates)))
+    if classroom_ids:
+        daily.extend(_classroom_daily(AttendanceRecord.objects.filter(
+            date__in=dates, student__enrollments__classroom_id__in=classroom_ids
+        )))
+    monthly = [
+        row for row in _student_monthly(AttendanceRecord.objects.filter(
+            student_id__in=student_ids, date__gte=month_start, date__lt=month_end
+        ))
+        if row.month in months
+    ]
+
+    DailyAttendanceRollup.objects.filter(
+        Q(classroom__isnull=True) | Q(classroom_id__in=classroom_ids), date__in=dates
+    ).delete()
+    MonthlyStudentRollup.objects.filter(student_id__in=student_ids, month__in=months).delete()
+    DailyAttendanceRollup.objects.bulk_create(daily, batch_size=BATCH_SIZE)
+    MonthlyStudentRollup.objects.bulk_create(monthly, batch_size=BATCH_SIZE)
+
+
+def archived_years(years=None):
+    """The academic years (of `years`, if given) archived by core.archive."""
+    archives = AttendanceArchive.objects.all()
+    if years is not None:
+        archives = archives.filter(year__in=years)
+    return set(archives.values_list('year', flat=True).distinct())
+
+
+def refresh_rollups(student_ids, dates):
+    """Recompute the rollup rows affected by writes to `student_ids` on `dates`."""
+    student_ids, dates = set(student_ids), set(dates)
+    if not student_ids or not dates:
+        return
+    # Archived years keep the rollups of their archived records until restored
+    archived = archived_years({academic_year(d) for d in dates})
+    dates = {d for d in dates if academic_year(d) not in archived}
+    if not dates:
+        return
+    try:
+        with transaction.atomic():
+            _refresh(student_ids, dates)
+    except IntegrityError:
+        # A concurrent writer inserted the same keys between our delete and insert;
+        # recomputing again picks up both writes.
+        with transaction.atomic():
+            _refresh(student_ids, dates)
+
+
+def rebuild_rollups(start=None, end=None):
+    """
+    Recompute every rollup for the months overlapping [start, end] (both optional, inclusive).
+    Archived academic years are left as they are. Returns the number of (daily, monthly) rows written.
+    """
+    records = AttendanceRecord.objects.all()
+    daily_rollups = DailyAttendanceRollup.objects.all()
+    monthly_rollups = MonthlyStudentRollup.objects.all()
+    for year in archived_years():
+        year_start, year_end = academic_year_bounds(year)
+        records = records.exclude(date__gte=year_start, date__lt=year_end)
+        daily_rollups = daily_rollups.exclude(date__gte=year_start, date__lt=year_end)
+        monthly_rollups = monthly_rollups.exclude(month__gte=year_start, month__lt=year_end)
+    if start:
+        start = start.replace(day=1)
+        records = records.filter(date__gte=start)
+        daily_rollups = daily_rollups.filter(date__gte=start)
+        monthly_rollups = monthly_rollups.filter(month__gte=start)
+    if end:
+        end = end.replace(day=calendar.monthrange(end.year, end.month)[1])
+        records = records.filter(date__lte=end)
+        daily_rollups = daily_rollups.filter(date__lte=end)
+        monthly_rollups = monthly_rollups.filter(month__lte=end)
+
+    with transaction.atomic():
+        daily_rollups.delete()
+        monthly_rollups.delete()
+        daily = DailyAttendanceRollup.objects.bulk_create(list(_school_daily(records)), batch_size=BATCH_SIZE)
+        classroom_daily = DailyAttendanceRollup.objects.bulk_create(
+            list(_classroom_daily(records.filter(student__enrollments__isnull=False))), batch_size=BATCH_SIZE
+        )
+        monthly = MonthlyStudentRollup.objects.bulk_create(list(_student_monthly(records)), batch_size=BATCH_SIZE)
+    invalidate_all_analytics()
+    return len(daily) + len(classroom_daily), len(monthly)
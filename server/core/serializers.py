@@ -1,6 +1,16 @@
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from .models import User, AttendanceRecord
+from django.urls import reverse
+from .models import User, AttendanceRecord, Classroom, Job
+
+class DynamicFieldsMixin:
+    """Accepts a `fields` kwarg limiting which declared fields are serialized."""
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -23,12 +33,19 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         data['user_id'] = self.user.id
         return data
 
-class StudentSerializer(serializers.ModelSerializer):
+class StudentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'first_name', 'last_name', 'email']
 
-class AttendanceRecordSerializer(serializers.ModelSerializer):
+class ClassroomSerializer(serializers.ModelSerializer):
+    student_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Classroom
+        fields = ['id', 'name', 'student_count']
+
+class AttendanceRecordSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     student_name = serializers.ReadOnlyField(source='student.first_name')
     student_username = serializers.ReadOnlyField(source='student.username')
 
@@ -36,3 +53,56 @@ class AttendanceRecordSerializer(serializers.ModelSerializer):
         model = AttendanceRecord 
         fields = ['id', 'date', 'student', 'student_name', 'student_username', 'status', 'absence_reason', 'marked_by']
         read_only_fields = ['marked_by']
+
+class JobSerializer(serializers.ModelSerializer):
+    download = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = ['id', 'kind', 'status', 'progress', 'result', 'error', 'attempts',
+                  'created_at', 'started_at', 'finished_at', 'download']
+
+    def get_download(self, job):
+        if job.status != Job.Status.SUCCEEDED or not (job.result or {}).get('file'):
+            return None
+        return reverse('job_download', args=[job.pk])
+
+    def to_representation(self, job):
+        data = super().to_representation(job)
+        if data['result']:
+            # Worker-side file paths are not for clients
+            data['result'] = {key: value for key, value in data['result'].items() if key != 'file'}
+        return data
+
+# Fast read path: AttendanceRecordSerializer field -> .values() column (joined student columns included)
+RECORD_VALUE_COLUMNS = {
+    'id': 'id',
+    'date': 'date',
+    'student': 'student_id',
+    'student_name': 'student__first_name',
+    'student_username': 'student__username',
+    'status': 'status',
+    'absence_reason': 'absence_reason',
+    'marked_by': 'marked_by_id',
+}
+
+def record_values(queryset, fields=None, extra=()):
+    """`queryset.values()` with the columns needed to render `fields` (plus `extra`) in one joined query."""
+    fields = fields or AttendanceRecordSerializer.Meta.fields
+    columns = {RECORD_VALUE_COLUMNS[name] for name in fields} | set(extra)
+    return queryset.values(*columns)
+
+def serialize_record_rows(rows, fields=None):
+    """
+    Render `record_values()` rows exactly like AttendanceRecordSerializer would,
+    without instantiating models or running per-field DRF serialization.
+    """
+    fields = fields or AttendanceRecordSerializer.Meta.fields
+    pairs = [(name, RECORD_VALUE_COLUMNS[name]) for name in fields]
+    data = []
+    for row in rows:
+        item = {name: row[column] for name, column in pairs}
+        if 'date' in item:
+            item['date'] = item['date'].isoformat()
+        data.append(item)
+    return data
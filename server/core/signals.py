@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .authentication import invalidate_cached_users
+from .models import User, AttendanceRecord, AttendanceTombstone
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def drop_cached_user(sender, instance, **kwargs):
+    invalidate_cached_users([instance.pk])
+
+
+@receiver(pre_delete, sender=User)
+def tombstone_attendance(sender, instance, **kwargs):
+    # The student's records go with them by cascade; leave tombstones for the change feed
+    AttendanceTombstone.objects.bulk_create([
+        AttendanceTombstone(record_id=record_id, student_id=instance.pk, date=day)
+        for record_id, day in AttendanceRecord.objects.filter(student_id=instance.pk).values_list('id', 'date')
+    ])
@@ -0,0 +1,83 @@
+"""
+Change feed for attendance, so clients can keep a local copy and poll for deltas.
+
+Each poll passes back the opaque cursor from the previous response and gets only
+what happened since: records created or updated, ordered by (updated_at, id), and
+records deleted, read from AttendanceTombstone ordered by (deleted_at, id). Both
+are keyset scans over their indexes, so an idle poll costs two index probes.
+Archiving a closed year (core.archive) writes no tombstones, so it never shows up
+as deletions here.
+
+Timestamps are taken when a write starts, so a transaction that commits late can
+land behind a cursor that has already moved on. The cursor therefore does not
+advance past rows younger than SYNC_SETTLE_SECONDS; such rows are sent again on
+the next poll, which is harmless because clients apply changes by id.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .pagination import _decode, _encode, keyset_after
+from .serializers import record_values, serialize_record_rows
+
+SYNC_LIMIT = 1000
+MAX_SYNC_LIMIT = 5000
+
+
+def _positions(cursor):
+    """[updated_at, id, deleted_at, id] from a cursor; None for a stream not read yet."""
+    if not cursor:
+        return None, None
+    values = _decode(cursor)
+    if not isinstance(values, list) or len(values) != 4:
+        raise ValidationError({'cursor': 'Invalid cursor'})
+    changed, deleted = values[:2], values[2:]
+    return (changed if changed[0] is not None else None), (deleted if deleted[0] is not None else None)
+
+
+def _scan(queryset, time_field, position, limit, horizon):
+    """One page of `queryset` after `position`; returns (rows, next position, has_more)."""
+    fields = (time_field, 'id')
+    if position is not None:
+        try:
+            queryset = queryset.filter(keyset_after(fields, position))
+        except (TypeError, ValueError, DjangoValidationError):
+            raise ValidationError({'cursor': 'Invalid cursor'})
+    rows = list(queryset.order_by(*fields)[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    # A full page always moves on, or a burst of recent writes would never drain
+    settled = rows if has_more else [row for row in rows if row[time_field] <= horizon]
+    if settled:
+        position = [settled[-1][time_field], settled[-1]['id']]
+    return rows, position, has_more
+
+
+def changes_since(records, tombstones, cursor=None, limit=SYNC_LIMIT):
+    """
+    Changes to `records` (an AttendanceRecord queryset) and `tombstones` (the matching
+    AttendanceTombstone queryset) after `cursor`. Without a cursor, everything matching.
+    Clients apply `deleted` before `changed`.
+    """
+    changed_at, deleted_at = _positions(cursor)
+    horizon = timezone.now() - timedelta(seconds=getattr(settings, 'SYNC_SETTLE_SECONDS', 5))
+
+    rows, changed_at, more_changed = _scan(
+        record_values(records, extra=('updated_at',)), 'updated_at', changed_at, limit, horizon
+    )
+    deleted, deleted_at, more_deleted = _scan(
+        tombstones.values('id', 'record_id', 'student_id', 'date', 'deleted_at'), 'deleted_at', deleted_at, limit, horizon
+    )
+    return {
+        'changed': serialize_record_rows(rows),
+        'deleted': [
+            {'id': row['record_id'], 'student': row['student_id'], 'date': row['date'].isoformat()}
+            for row in deleted
+        ],
+        'cursor': _encode([*(changed_at or [None, None]), *(deleted_at or [None, None])]),
+        'has_more': more_changed or more_deleted,
+    }
@@ -0,0 +1,52 @@
+from django.test import TestCase
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from .models import User, AttendanceRecord
+from .rollups import rebuild_rollups
+from datetime import date, timedelta
+
+class AnalyticsQueryCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='teacher', password='pwd', role=User.Role.TEACHER)
+        self.students = [
+            User.objects.create_user(username=f'student{i}', role=User.Role.STUDENT)
+            for i in range(5)
+        ]
+        first = date(2025, 3, 1)
+        for offset in range(20):
+            for i, student in enumerate(self.students):
+                absent = (i + offset) % 4 == 0
+                AttendanceRecord.objects.create(
+                    student=student, date=first + timedelta(days=offset),
+                    status='ABSENT' if absent else 'PRESENT',
+                    absence_reason='Sick' if absent else None
+                )
+        # Outside the month, must not be counted
+        AttendanceRecord.objects.create(student=self.students[0], date=date(2025, 4, 1), status='ABSENT')
+        rebuild_rollups()
+        self.client.force_authenticate(user=self.teacher)
+
+    def test_class_summary_single_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('class_analytics'), {'month': '2025-03'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        overview = response.data['overview']
+        self.assertEqual(overview['total_records'], 100)
+        self.assertEqual(overview['absent'], 25)
+        self.assertEqual(overview['present'], 75)
+        self.assertEqual(overview['attendance_rate'], 75.0)
+        self.assertEqual(len(response.data['daily']), 20)
+        self.assertEqual(sum(day['absent'] for day in response.data['daily']), 25)
+
+    def test_student_summary_two_queries(self):
+        student = self.students[0]
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('student_analytics'), {'month': '2025-03', 'student_id': student.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['stats'], {'total': 20, 'present': 15, 'absent': 5, 'rate': 75.0})
+        self.assertEqual(len(response.data['absences']), 5)
+        self.assertEqual(response.data['absences'][0]['absence_reason'], 'Sick')
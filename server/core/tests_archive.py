@@ -0,0 +1,174 @@
+from datetime import date
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .archive import ArchiveError, archive_year, restore_year
+from .attendance import upsert_roll_call
+from .partitions import PartitionError, partition_attendance, partition_name, year_partitions
+from .models import (
+    AttendanceArchive, AttendanceRecord, AttendanceTombstone, Classroom, DailyAttendanceRollup, Enrollment, User,
+)
+from .rollups import rebuild_rollups
+from .tests_rollups import snapshot
+from .utils import academic_year, academic_year_bounds
+
+
+class AcademicYearTests(TestCase):
+    def test_years_start_in_the_configured_month(self):
+        self.assertEqual(academic_year(date(2024, 8, 1)), 2024)
+        self.assertEqual(academic_year(date(2025, 7, 31)), 2024)
+        self.assertEqual(academic_year_bounds(2024), (date(2024, 8, 1), date(2025, 8, 1)))
+        with self.settings(ACADEMIC_YEAR_START_MONTH=1):
+            self.assertEqual(academic_year(date(2025, 7, 31)), 2025)
+            self.assertEqual(academic_year_bounds(2025), (date(2025, 1, 1), date(2026, 1, 1)))
+
+
+@override_settings(ACADEMIC_YEAR_START_MONTH=8)
+class ArchiveYearTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='teacher', password='pwd', role=User.Role.TEACHER)
+        self.classroom = Classroom.objects.create(name='10-A')
+        self.students = [User.objects.create_user(username=f'student{i}', role=User.Role.STUDENT) for i in range(3)]
+        for student in self.students:
+            Enrollment.objects.create(student=student, classroom=self.classroom)
+        # Two days in the 2023 academic year and one in 2024
+        for day in (date(2024, 3, 4), date(2024, 3, 5), date(2024, 9, 2)):
+            for i, student in enumerate(self.students):
+                AttendanceRecord.objects.create(
+                    student=student, date=day, status='ABSENT' if i == 0 else 'PRESENT',
+                    absence_reason='Sick' if i == 0 else None, marked_by=self.teacher,
+                )
+        rebuild_rollups()
+        self.client.force_authenticate(user=self.teacher)
+
+    def analytics(self):
+        cache.clear()
+        return (
+            self.client.get(reverse('class_analytics'), {'month': '2024-03'}).data,
+            self.client.get(reverse('student_analytics'), {'month': '2024-03', 'student_id': self.students[0].id}).data,
+        )
+
+    def test_moves_closed_year_into_compressed_archives(self):
+        ids = set(AttendanceRecord.objects.filter(date__year=2024, date__month=3).values_list('id', flat=True))
+        self.assertEqual(archive_year(2023, today=date(2025, 1, 1)), (3, 6))
+
+        self.assertEqual(list(AttendanceRecord.objects.values_list('date', flat=True).distinct()), [date(2024, 9, 2)])
+        archives = AttendanceArchive.objects.filter(year=2023)
+        self.assertEqual(sorted(archives.values_list('count', flat=True)), [2, 2, 2])
+        self.assertEqual(AttendanceArchive.objects.filter(year=2024).count(), 0)
+        # Archiving is not a deletion: no tombstones for the change feed
+        self.assertFalse(AttendanceRecord.objects.filter(id__in=ids).exists())
+        self.assertFalse(AttendanceTombstone.objects.exists())
+
+    def test_analytics_are_unchanged_after_archiving(self):
+        before = self.analytics()
+        rollups = snapshot()
+        archive_year(2023, today=date(2025, 1, 1))
+        after = self.analytics()
+
+        self.assertEqual(after, before)
+        self.assertEqual(after[1]['stats']['absent'], 2)
+        self.assertEqual([a['absence_reason'] for a in after[1]['absences']], ['Sick', 'Sick'])
+        self.assertEqual(snapshot(), rollups)
+
+    def test_archived_years_survive_rollup_maintenance(self):
+        rollups = snapshot()
+        archive_year(2023, today=date(2025, 1, 1))
+        rebuild_rollups()
+        self.assertEqual(snapshot(), rollups)
+
+        # A write into the archived year leaves its frozen rollups alone
+        upsert_roll_call(date(2024, 3, 4), {self.students[1].id: 'ABSENT'}, self.teacher)
+        self.assertEqual(snapshot(), rollups)
+
+    def test_refuses_a_year_that_has_not_ended(self):
+        with self.assertRaises(ArchiveError):
+            archive_year(2024, today=date(2025, 7, 31))
+        self.assertEqual(AttendanceRecord.objects.count(), 9)
+
+    def test_rerun_merges_records_written_since(self):
+        archive_year(2023, today=date(2025, 1, 1))
+        AttendanceRecord.objects.create(student=self.students[0], date=date(2024, 3, 6), status='PRESENT')
+        self.assertEqual(archive_year(2023, today=date(2025, 1, 1)), (1, 1))
+        self.assertEqual(AttendanceArchive.objects.get(year=2023, student=self.students[0]).count, 3)
+        self.assertEqual(AttendanceArchive.objects.filter(year=2023).count(), 3)
+
+    def test_records_written_during_a_batch_stay_live(self):
+        from .archive import pack
+
+        def pack_then_write(rows):
+            if not AttendanceRecord.objects.filter(date=date(2024, 3, 6)).exists():
+                AttendanceRecord.objects.create(student=self.students[0], date=date(2024, 3, 6), status='PRESENT')
+            return pack(rows)
+
+        with mock.patch('core.archive.pack', side_effect=pack_then_write):
+            self.assertEqual(archive_year(2023, today=date(2025, 1, 1)), (3, 6))
+        self.assertTrue(AttendanceRecord.objects.filter(date=date(2024, 3, 6)).exists())
+        self.assertEqual(archive_year(2023, today=date(2025, 1, 1)), (1, 1))
+
+    def test_restore_brings_records_back(self):
+        original = set(AttendanceRecord.objects.values_list('id', 'student_id', 'date', 'status', 'absence_reason'))
+        archive_year(2023, today=date(2025, 1, 1))
+        upsert_roll_call(date(2024, 3, 4), {self.students[0].id: 'PRESENT'}, self.teacher)
+
+        self.assertEqual(restore_year(2023), 6)
+        self.assertFalse(AttendanceArchive.objects.exists())
+        restored = set(AttendanceRecord.objects.values_list('id', 'student_id', 'date', 'status', 'absence_reason'))
+        # The live record written while archived wins over the archived one
+        self.assertEqual(len(restored), 9)
+        self.assertEqual(AttendanceRecord.objects.get(student=self.students[0], date=date(2024, 3, 4)).status, 'PRESENT')
+        self.assertEqual(len(original - restored), 1)
+        # Rollups are rebuilt to include that write
+        school = DailyAttendanceRollup.objects.get(classroom=None, date=date(2024, 3, 4))
+        self.assertEqual((school.present, school.absent), (3, 0))
+
+        with self.assertRaises(ArchiveError):
+            restore_year(2023)
+
+    def test_commands(self):
+        out = StringIO()
+        call_command('archive_year', '2023', stdout=out)
+        self.assertIn('Archived 6 records for 3 students from 2023-08-01 to 2024-07-31', out.getvalue())
+        call_command('archive_year', '2023', '--restore', stdout=out)
+        self.assertEqual(AttendanceRecord.objects.count(), 9)
+        with self.assertRaises(CommandError):
+            call_command('archive_year', '2999', stdout=out)
+        with mock.patch('core.archive.drop_year_partition', side_effect=PartitionError('still holds records')):
+            with self.assertRaisesMessage(CommandError, 'still holds records'):
+                call_command('archive_year', '2023', stdout=out)
+
+    @skipUnless(connection.vendor != 'postgresql', 'Partitioning works on PostgreSQL')
+    def test_partitioning_needs_postgresql(self):
+        with self.assertRaises(CommandError):
+            call_command('partition_attendance', stdout=StringIO())
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL only')
+    def test_partitions_by_academic_year(self):
+        ids = set(AttendanceRecord.objects.values_list('id', flat=True))
+        created = partition_attendance(ahead=1, today=date(2025, 1, 1))
+        self.assertEqual(created, [partition_name(2023), partition_name(2024), partition_name(2025)])
+        self.assertEqual(set(AttendanceRecord.objects.values_list('id', flat=True)), ids)
+        self.assertEqual(partition_attendance(ahead=1, today=date(2025, 1, 1)), [])
+
+        # New rows still get ids, and upserts still find the (date, student) constraint
+        upsert_roll_call(date(2025, 9, 1), {self.students[0].id: 'PRESENT'}, self.teacher)
+        upsert_roll_call(date(2024, 9, 2), {self.students[0].id: 'PRESENT'}, self.teacher)
+        self.assertEqual(AttendanceRecord.objects.count(), 10)
+        self.assertNotIn(AttendanceRecord.objects.get(date=date(2025, 9, 1)).id, ids)
+
+        archive_year(2023, today=date(2025, 1, 1))
+        with connection.cursor() as cursor:
+            self.assertNotIn(2023, year_partitions(cursor))
+        restore_year(2023)
+        with connection.cursor() as cursor:
+            self.assertIn(2023, year_partitions(cursor))
+        self.assertEqual(AttendanceRecord.objects.count(), 10)
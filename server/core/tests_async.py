@@ -0,0 +1,85 @@
+from django.core.cache import cache
+from django.test import AsyncClient, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from .models import User, AttendanceRecord, Classroom, Enrollment
+from .rollups import rebuild_rollups
+from datetime import date
+
+class AsyncReadViewTests(TestCase):
+    """The async views must return exactly what their DRF counterparts return."""
+
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user(username='teacher', role=User.Role.TEACHER)
+        self.classroom = Classroom.objects.create(name='10-A')
+        self.students = [
+            User.objects.create_user(username=f'student{i}', first_name=f'S{i}', role=User.Role.STUDENT)
+            for i in range(3)
+        ]
+        for student in self.students[:2]:
+            Enrollment.objects.create(student=student, classroom=self.classroom)
+        for day in (date(2025, 3, 3), date(2025, 3, 4)):
+            for i, student in enumerate(self.students):
+                AttendanceRecord.objects.create(student=student, date=day, status='ABSENT' if i == 0 else 'PRESENT',
+                                                absence_reason='Sick' if i == 0 else None)
+        rebuild_rollups()
+        self.tokens = {user.username: str(AccessToken.for_user(user)) for user in [self.teacher, *self.students]}
+
+    def sync_get(self, name, username, args=(), **params):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.tokens[username]}')
+        return client.get(reverse(name, args=args), params)
+
+    async def async_get(self, name, username=None, args=(), **params):
+        headers = {'Authorization': f'Bearer {self.tokens[username]}'} if username else {}
+        return await AsyncClient().get(reverse(name, args=args), params, headers=headers)
+
+    async def assert_same(self, name, username, args=(), **params):
+        from asgiref.sync import sync_to_async
+        expected = await sync_to_async(self.sync_get)(name, username, args, **params)
+        response = await self.async_get(f'async_{name}', username, args, **params)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.json(), expected.json())
+        return response
+
+    async def test_student_attendance_matches(self):
+        await self.assert_same('student_attendance_list', 'student0', month='2025-03')
+        await self.assert_same('student_attendance_list', 'student0', month='2025-03', fields='date,status')
+
+    async def test_attendance_list_matches(self):
+        await self.assert_same('attendance_list', 'teacher', date='2025-03-03')
+        await self.assert_same('classroom_attendance_list', 'teacher', args=[self.classroom.id], date='2025-03-03')
+
+    async def test_analytics_match(self):
+        await self.assert_same('class_analytics', 'teacher', month='2025-03')
+        await self.assert_same('classroom_analytics', 'teacher', args=[self.classroom.id], month='2025-03')
+        await self.assert_same('student_analytics', 'teacher', month='2025-03', student_id=self.students[0].id)
+        await self.assert_same('class_analytics', 'student0', month='2025-03')
+        await self.assert_same('class_analytics', 'teacher', month='March')
+
+    async def test_analytics_etag(self):
+        first = await self.async_get('async_class_analytics', 'teacher', month='2025-03')
+        headers = {'Authorization': f"Bearer {self.tokens['teacher']}", 'If-None-Match': first['ETag']}
+        second = await AsyncClient().get(reverse('async_class_analytics'), {'month': '2025-03'}, headers=headers)
+        self.assertEqual(second.status_code, 304)
+
+    async def test_authentication_required(self):
+        response = await self.async_get('async_student_attendance_list', month='2025-03')
+        self.assertEqual(response.status_code, 401)
+        response = await AsyncClient().get(reverse('async_student_attendance_list'), headers={'Authorization': 'Bearer junk'})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['code'], 'token_not_valid')
+
+    async def test_unknown_classroom_is_404(self):
+        response = await self.async_get('async_classroom_attendance_list', 'teacher', args=[999], date='2025-03-03')
+        self.assertEqual(response.status_code, 404)
+
+    async def test_metrics_count_async_queries(self):
+        from .metrics import registry
+        registry.reset()
+        await self.async_get('async_student_analytics', 'teacher', month='2025-03', student_id=self.students[0].id)
+        series = registry.series[('async_student_analytics', 'GET')]
+        # User lookup, two cache-miss analytics queries
+        self.assertEqual(series.queries, 3)
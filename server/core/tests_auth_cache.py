@@ -0,0 +1,60 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from .models import User
+from .authentication import user_key
+from .imports import import_roster
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.student = User.objects.create_user(username='student', password='pwd', role=User.Role.STUDENT)
+        response = self.client.post(reverse('token_obtain_pair'), {'username': 'student', 'password': 'pwd'})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def test_user_row_is_loaded_once(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(reverse('user_me')).status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('user_me'))
+        self.assertEqual(response.data['username'], 'student')
+
+    def test_password_hash_is_not_cached(self):
+        self.client.get(reverse('user_me'))
+        entry = cache.get(user_key(self.student.id))
+        self.assertNotIn('password', entry)
+        self.assertNotIn(self.student.password, entry.values())
+        response = self.client.get(reverse('user_me'))
+        self.assertEqual((response.data['username'], response.data['role']), ('student', User.Role.STUDENT))
+
+    def test_save_invalidates(self):
+        self.client.get(reverse('user_me'))
+        self.student.first_name = 'Renamed'
+        self.student.save()
+        self.assertIsNone(cache.get(user_key(self.student.id)))
+        self.assertEqual(self.client.get(reverse('user_me')).data['first_name'], 'Renamed')
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get(reverse('user_me'))
+        self.student.is_active = False
+        self.student.save()
+        self.assertEqual(self.client.get(reverse('user_me')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_is_rejected(self):
+        self.client.get(reverse('user_me'))
+        self.student.delete()
+        self.assertEqual(self.client.get(reverse('user_me')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_roster_import_invalidates(self):
+        self.client.get(reverse('user_me'))
+        list(import_roster(iter([(1, {'username': 'student', 'first_name': 'Renamed'})])))
+        self.assertEqual(self.client.get(reverse('user_me')).data['first_name'], 'Renamed')
+
+    @override_settings(AUTH_USER_CACHE_TTL=0)
+    def test_ttl_zero_disables_cache(self):
+        self.client.get(reverse('user_me'))
+        with self.assertNumQueries(1):
+            self.client.get(reverse('user_me'))
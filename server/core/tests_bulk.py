@@ -6,6 +6,7 @@ from django.utils import timezone
 from .models import User, AttendanceRecord
 from datetime import date, timedelta
 import calendar
+from unittest import mock
 
 class BulkAttendanceRefinementTests(TestCase):
     def setUp(self):
@@ -74,6 +75,16 @@ class BulkAttendanceRefinementTests(TestCase):
         self.assertEqual(record.status, 'ABSENT')
         self.assertEqual(record.absence_reason, 'Sick')
         
+    def test_repeated_bulk_mark_without_overwrite_is_a_no_op(self):
+        """A second overwrite=False request writes nothing and reports no changes."""
+        self.client.force_authenticate(user=self.teacher)
+        payload = {'student_id': self.student.id, 'month': '2025-03', 'status': 'PRESENT', 'overwrite': False}
+        self.client.post(self.url, payload, format='json')
+        with mock.patch('core.attendance.records_changed') as changed:
+            response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        changed.assert_not_called()
+
     def test_overwrite_true_replaces_records(self):
         """Test that overwrite=True replaces existing records."""
         self.client.force_authenticate(user=self.teacher)
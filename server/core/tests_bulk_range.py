@@ -0,0 +1,102 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from .models import User, AttendanceRecord, Classroom, Enrollment
+from datetime import date
+import json
+
+class BulkRangeAttendanceTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='teacher', password='pwd', role=User.Role.TEACHER)
+        self.classroom = Classroom.objects.create(name='10-A')
+        self.students = [
+            User.objects.create_user(username=f'student{i}', role=User.Role.STUDENT)
+            for i in range(4)
+        ]
+        for student in self.students[:3]:
+            Enrollment.objects.create(student=student, classroom=self.classroom)
+        self.url = reverse('bulk_attendance_range')
+        self.client.force_authenticate(user=self.teacher)
+
+    def post(self, **payload):
+        response = self.client.post(self.url, payload, format='json')
+        if response.status_code != status.HTTP_200_OK:
+            return response, []
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        return response, [json.loads(line) for line in lines]
+
+    def test_classroom_range_with_exclusions(self):
+        # 2025-03-03 is a Monday; two full weeks, weekends and one holiday excluded
+        response, events = self.post(
+            classroom_id=self.classroom.id,
+            start_date='2025-03-03',
+            end_date='2025-03-16',
+            status='PRESENT',
+            exclude_weekdays=[5, 6],
+            holidays=['2025-03-14'],
+        )
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertTrue(events[-1]['done'])
+        self.assertEqual(events[-1]['created'], 3 * 9)
+        self.assertEqual(AttendanceRecord.objects.count(), 27)
+        self.assertFalse(AttendanceRecord.objects.filter(student=self.students[3]).exists())
+        self.assertFalse(AttendanceRecord.objects.filter(date=date(2025, 3, 14)).exists())
+        self.assertFalse(AttendanceRecord.objects.filter(date=date(2025, 3, 8)).exists())
+
+    def test_overwrite_flag(self):
+        AttendanceRecord.objects.create(student=self.students[0], date=date(2025, 3, 3),
+                                        status='ABSENT', absence_reason='Sick')
+        payload = dict(student_ids=[self.students[0].id, self.students[1].id],
+                       start_date='2025-03-03', end_date='2025-03-04', status='PRESENT')
+
+        _, events = self.post(overwrite=False, **payload)
+        self.assertEqual(events[-1]['skipped'], 1)
+        self.assertEqual(events[-1]['created'], 3)
+        record = AttendanceRecord.objects.get(student=self.students[0], date=date(2025, 3, 3))
+        self.assertEqual(record.status, 'ABSENT')
+
+        _, events = self.post(overwrite=True, **payload)
+        self.assertEqual(events[-1]['updated'], 4)
+        record.refresh_from_db()
+        self.assertEqual(record.status, 'PRESENT')
+        self.assertIsNone(record.absence_reason)
+
+    def test_validation(self):
+        response, _ = self.post(student_ids=[999999], start_date='2025-03-03',
+                                end_date='2025-03-04', status='PRESENT')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response, _ = self.post(classroom_id=self.classroom.id, start_date='2025-03-04',
+                                end_date='2025-03-03', status='PRESENT')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bad_student_ids_are_reported_per_entry(self):
+        ids = [self.students[0].id, {'id': 1}, [2], 'x']
+        response, _ = self.post(student_ids=ids, start_date='2025-03-03', end_date='2025-03-04', status='PRESENT')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([e['index'] for e in response.data['details']], [1, 2, 3])
+        # The same student as an int and a string is one student
+        response, events = self.post(student_ids=[self.students[0].id, str(self.students[0].id)],
+                                     start_date='2025-03-03', end_date='2025-03-04', status='PRESENT')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(events[-1]['created'], 2)
+
+    def test_chunked_progress(self):
+        from .attendance import iter_backfill
+        dates = [date(2025, 3, 3), date(2025, 3, 4)]
+        ids = [s.id for s in self.students]
+        events = list(iter_backfill(ids, dates, 'PRESENT', self.teacher, chunk_size=2))
+        # One student per chunk (2 dates each), plus the summary line
+        self.assertEqual(len(events), 5)
+        self.assertEqual([e['processed'] for e in events[:-1]], [2, 4, 6, 8])
+        self.assertEqual(events[-1]['created'], 8)
+
+    def test_rollups_refreshed_once_per_backfill(self):
+        from unittest import mock
+        from .attendance import iter_backfill
+        dates = [date(2025, 3, 3), date(2025, 3, 4)]
+        ids = [s.id for s in self.students]
+        with mock.patch('core.attendance.records_changed') as changed:
+            list(iter_backfill(ids, dates, 'PRESENT', self.teacher, chunk_size=2))
+        changed.assert_called_once_with(ids, dates)
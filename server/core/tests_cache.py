@@ -0,0 +1,58 @@
+from django.test import TestCase
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from .models import User
+
+class AnalyticsCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='teacher', password='pwd', role=User.Role.TEACHER)
+        self.student = User.objects.create_user(username='student', role=User.Role.STUDENT)
+        self.client.force_authenticate(user=self.teacher)
+
+    def mark(self, status_val):
+        self.client.post(reverse('attendance_mark'), {
+            'date': '2025-03-03',
+            'records': [{'student_id': self.student.id, 'status': status_val}]
+        }, format='json')
+
+    def test_cached_with_etag(self):
+        self.mark('PRESENT')
+        url = reverse('class_analytics')
+        first = self.client.get(url, {'month': '2025-03'})
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', first)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(url, {'month': '2025-03'})
+        self.assertEqual(second.data, first.data)
+
+        not_modified = self.client.get(url, {'month': '2025-03'}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_payload_carries_the_normalized_month(self):
+        url = reverse('class_analytics')
+        self.assertEqual(self.client.get(url, {'month': '2025-3'}).data['month'], '2025-03')
+        # Served from the entry the first request cached
+        self.assertEqual(self.client.get(url, {'month': '2025-03'}).data['month'], '2025-03')
+        student_url = reverse('student_analytics')
+        self.client.get(student_url, {'month': '2025-3', 'student_id': self.student.id})
+        response = self.client.get(student_url, {'month': '2025-03', 'student_id': self.student.id})
+        self.assertEqual(response.data['month'], '2025-03')
+
+    def test_writes_invalidate(self):
+        self.mark('PRESENT')
+        class_url = reverse('class_analytics')
+        student_url = reverse('student_analytics')
+        params = {'month': '2025-03', 'student_id': self.student.id}
+        before = self.client.get(class_url, params)
+        self.assertEqual(self.client.get(student_url, params).data['stats']['absent'], 0)
+
+        self.mark('ABSENT')
+        after = self.client.get(class_url, params)
+        self.assertEqual(after.data['overview']['absent'], 1)
+        self.assertNotEqual(after['ETag'], before['ETag'])
+        self.assertEqual(self.client.get(student_url, params).data['stats']['absent'], 1)
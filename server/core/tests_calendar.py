@@ -0,0 +1,52 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from .models import User, AttendanceRecord
+from .calendars import run_length
+from datetime import date
+
+class StudentCalendarTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='teacher', role=User.Role.TEACHER)
+        self.student = User.objects.create_user(username='student', role=User.Role.STUDENT)
+        other = User.objects.create_user(username='other', role=User.Role.STUDENT)
+        AttendanceRecord.objects.create(student=self.student, date=date(2025, 3, 1), status='PRESENT')
+        AttendanceRecord.objects.create(student=self.student, date=date(2025, 3, 2), status='PRESENT')
+        self.absent = AttendanceRecord.objects.create(student=self.student, date=date(2025, 3, 4), status='ABSENT',
+                                                      absence_reason='Sick')
+        AttendanceRecord.objects.create(student=self.student, date=date(2025, 3, 31), status='ABSENT')
+        AttendanceRecord.objects.create(student=self.student, date=date(2025, 4, 1), status='ABSENT')
+        AttendanceRecord.objects.create(student=other, date=date(2025, 3, 3), status='ABSENT')
+        self.url = reverse('student_attendance_calendar')
+
+    def test_student_calendar_in_one_query(self):
+        self.client.force_authenticate(user=self.student)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'month': '2025-03'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['days'], 31)
+        self.assertEqual(data['present'], 0b11)
+        self.assertEqual(data['absent'], (1 << 3) | (1 << 30))
+        self.assertEqual(data['reasons'], {'4': 'Sick'})
+        self.assertEqual(data['absent_ids']['4'], self.absent.id)
+        self.assertEqual(set(data['absent_ids']), {'4', '31'})
+
+    def test_run_length_encoding(self):
+        self.client.force_authenticate(user=self.student)
+        data = self.client.get(self.url, {'month': '2025-03', 'encoding': 'rle'}).json()
+        self.assertEqual(data['runs'], 'P2U1A1U26A1')
+        self.assertNotIn('present', data)
+        self.assertEqual(run_length(0, 0, 28), 'U28')
+
+    def test_teacher_needs_student_id(self):
+        self.client.force_authenticate(user=self.teacher)
+        self.assertEqual(self.client.get(self.url, {'month': '2025-03'}).status_code, status.HTTP_400_BAD_REQUEST)
+        data = self.client.get(self.url, {'month': '2025-02', 'student_id': self.student.id}).json()
+        self.assertEqual((data['days'], data['present'], data['absent']), (28, 0, 0))
+
+    def test_invalid_month(self):
+        self.client.force_authenticate(user=self.student)
+        self.assertEqual(self.client.get(self.url, {'month': 'March'}).status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,68 @@
+from django.test import TestCase
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from .models import User, AttendanceRecord, Classroom, Enrollment
+from datetime import date
+
+class ClassroomScopedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='teacher', password='pwd', role=User.Role.TEACHER)
+        self.class_a = Classroom.objects.create(name='10-A')
+        self.class_b = Classroom.objects.create(name='10-B')
+        self.a_students = [User.objects.create_user(username=f'a{i}', role=User.Role.STUDENT) for i in range(3)]
+        self.b_students = [User.objects.create_user(username=f'b{i}', role=User.Role.STUDENT) for i in range(2)]
+        for student in self.a_students:
+            Enrollment.objects.create(student=student, classroom=self.class_a)
+        for student in self.b_students:
+            Enrollment.objects.create(student=student, classroom=self.class_b)
+        self.client.force_authenticate(user=self.teacher)
+
+    def test_classroom_list(self):
+        response = self.client.get(reverse('classroom_list'))
+        self.assertEqual([(c['name'], c['student_count']) for c in response.data], [('10-A', 3), ('10-B', 2)])
+
+    def test_students_and_attendance_are_scoped(self):
+        response = self.client.get(reverse('classroom_student_list', args=[self.class_b.id]))
+        self.assertEqual({s['username'] for s in response.data}, {'b0', 'b1'})
+
+        for student in self.a_students + self.b_students:
+            AttendanceRecord.objects.create(student=student, date=date(2025, 3, 3), status='PRESENT')
+        response = self.client.get(reverse('classroom_attendance_list', args=[self.class_a.id]), {'date': '2025-03-03'})
+        self.assertEqual(len(response.data), 3)
+
+        response = self.client.get(reverse('classroom_student_list', args=[999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_mark_rejects_students_outside_classroom(self):
+        url = reverse('classroom_attendance_mark', args=[self.class_a.id])
+        response = self.client.post(url, {
+            'date': '2025-03-03',
+            'records': [{'student_id': self.b_students[0].id, 'status': 'PRESENT'}]
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(url, {
+            'date': '2025-03-03',
+            'records': [{'student_id': s.id, 'status': 'ABSENT'} for s in self.a_students]
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_bulk_and_analytics_are_scoped(self):
+        response = self.client.post(reverse('classroom_bulk_attendance', args=[self.class_b.id]), {
+            'start_date': '2025-03-03', 'end_date': '2025-03-07', 'status': 'PRESENT',
+        }, format='json')
+        b''.join(response.streaming_content)
+        self.client.post(reverse('attendance_mark'), {
+            'date': '2025-03-03',
+            'records': [{'student_id': self.a_students[0].id, 'status': 'ABSENT'}]
+        }, format='json')
+
+        response = self.client.get(reverse('classroom_analytics', args=[self.class_b.id]), {'month': '2025-03'})
+        self.assertEqual(response.data['overview']['total_records'], 10)
+        self.assertEqual(response.data['overview']['absent'], 0)
+        response = self.client.get(reverse('class_analytics'), {'month': '2025-03'})
+        self.assertEqual(response.data['overview']['total_records'], 11)
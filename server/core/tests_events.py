@@ -0,0 +1,87 @@
+import asyncio
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from .models import User, Classroom, Enrollment
+from .attendance import upsert_roll_call
+from .events import Subscription, broker
+from datetime import date
+
+def change(dates, students):
+    return {'dates': dates, 'students': students}
+
+class SubscriptionTests(TestCase):
+    async def test_changes_coalesce_into_one_batch(self):
+        subscription = Subscription(asyncio.get_running_loop(), classroom_id=1)
+        subscription.offer(change(['2025-03-03'], {5: [1]}))
+        subscription.offer(change(['2025-03-04'], {6: [1, 2]}))
+        subscription.offer(change(['2025-03-05'], {7: [2]}))
+        batch = await subscription.next_batch(0, 1)
+        self.assertEqual(batch, {'dates': ['2025-03-03', '2025-03-04'], 'students': [5, 6], 'classrooms': [1]})
+        self.assertIsNone(await subscription.next_batch(0, 0.01))
+
+    async def test_student_and_date_filters(self):
+        subscription = Subscription(asyncio.get_running_loop(), student_id=5, date='2025-03-04')
+        subscription.offer(change(['2025-03-03'], {5: []}))
+        subscription.offer(change(['2025-03-04'], {6: []}))
+        self.assertIsNone(await subscription.next_batch(0, 0.01))
+        subscription.offer(change(['2025-03-03', '2025-03-04'], {'5': [], '6': []}))
+        self.assertEqual(await subscription.next_batch(0, 1), {'dates': ['2025-03-04'], 'students': [5], 'classrooms': []})
+
+    def test_writes_are_published_on_commit(self):
+        teacher = User.objects.create_user(username='teacher', role=User.Role.TEACHER)
+        student = User.objects.create_user(username='student', role=User.Role.STUDENT)
+        classroom = Classroom.objects.create(name='10A')
+        Enrollment.objects.create(student=student, classroom=classroom)
+        loop = asyncio.new_event_loop()
+        subscription = Subscription(loop, classroom_id=classroom.id)
+        broker.subscribe(subscription)
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                upsert_roll_call(date(2025, 3, 3), {student.id: 'ABSENT'}, teacher)
+            batch = loop.run_until_complete(subscription.next_batch(0, 1))
+        finally:
+            broker.unsubscribe(subscription)
+            loop.close()
+        self.assertEqual(batch, {'dates': ['2025-03-03'], 'students': [student.id], 'classrooms': [classroom.id]})
+
+@override_settings(EVENTS_BATCH_SECONDS=0)
+class AttendanceEventStreamTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user(username='teacher', role=User.Role.TEACHER)
+        self.student = User.objects.create_user(username='student', role=User.Role.STUDENT)
+        self.classroom = Classroom.objects.create(name='10A')
+
+    async def test_stream_with_query_token(self):
+        token = str(AccessToken.for_user(self.teacher))
+        url = reverse('async_classroom_attendance_events', args=[self.classroom.id])
+        response = await AsyncClient().get(url, {'token': token})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = response.streaming_content.__aiter__()
+        try:
+            self.assertEqual(await anext(stream), b'retry: 5000\n\n')
+            # Subscribed once the stream is read
+            broker.dispatch(change(['2025-03-03'], {self.student.id: [self.classroom.id]}))
+            broker.dispatch(change(['2025-03-03'], {self.student.id + 1: [self.classroom.id + 1]}))
+            message = await anext(stream)
+            # A client disconnect cancels the pending read, which unsubscribes
+            pending = asyncio.ensure_future(anext(stream))
+            await asyncio.sleep(0)
+            pending.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await pending
+        finally:
+            await stream.aclose()
+        self.assertEqual(message.decode(), 'event: attendance\ndata: {"dates": ["2025-03-03"], "students": [%d], '
+                                           '"classrooms": [%d]}\n\n' % (self.student.id, self.classroom.id))
+        self.assertFalse(broker.active)
+
+    async def test_requires_authentication(self):
+        response = await AsyncClient().get(reverse('async_attendance_events'), {'token': 'bogus'})
+        self.assertEqual(response.status_code, 401)
+        response = await AsyncClient().get(reverse('async_attendance_events'))
+        self.assertEqual(response.status_code, 401)
+        missing = reverse('async_classroom_attendance_events', args=[9999])
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(self.teacher)}'}
+        self.assertEqual((await AsyncClient().get(missing, headers=headers)).status_code, 404)
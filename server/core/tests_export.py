@@ -0,0 +1,81 @@
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from .models import User, AttendanceRecord, Classroom, Enrollment
+from .exports import export_rows, iter_csv
+from datetime import date
+from io import StringIO
+import csv
+import os
+import tempfile
+
+class AttendanceExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='teacher', password='pwd', role=User.Role.TEACHER)
+        self.classroom = Classroom.objects.create(name='10-A')
+        self.students = [
+            User.objects.create_user(username=f'student{i}', first_name=f'First{i}', role=User.Role.STUDENT)
+            for i in range(3)
+        ]
+        for student in self.students[:2]:
+            Enrollment.objects.create(student=student, classroom=self.classroom)
+        for day in (date(2025, 3, 3), date(2025, 3, 4), date(2025, 4, 1)):
+            for student in self.students:
+                AttendanceRecord.objects.create(student=student, date=day, status='PRESENT')
+        record = AttendanceRecord.objects.get(student=self.students[0], date=date(2025, 3, 4))
+        record.status = 'ABSENT'
+        record.absence_reason = 'Sick, fever'
+        record.save()
+        self.client.force_authenticate(user=self.teacher)
+
+    def read(self, response):
+        body = b''.join(response.streaming_content).decode()
+        return list(csv.DictReader(StringIO(body)))
+
+    def test_csv_export_range_is_inclusive(self):
+        response = self.client.get(reverse('attendance_export'), {'start': '2025-03-03', 'end': '2025-03-04'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = self.read(response)
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]['date'], '2025-03-03')
+        absent = [r for r in rows if r['status'] == 'ABSENT']
+        self.assertEqual(absent[0]['username'], 'student0')
+        self.assertEqual(absent[0]['first_name'], 'First0')
+        self.assertEqual(absent[0]['absence_reason'], 'Sick, fever')
+
+    def test_classroom_scoped_export(self):
+        url = reverse('classroom_attendance_export', args=[self.classroom.id])
+        rows = self.read(self.client.get(url, {'start': '2025-03-01', 'end': '2025-04-30'}))
+        self.assertEqual(len(rows), 6)
+        self.assertNotIn('student2', {r['username'] for r in rows})
+
+    def test_rejects_bad_parameters(self):
+        url = reverse('attendance_export')
+        self.assertEqual(self.client.get(url, {'start': '2025-03-01'}).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(url, {'start': '2025-03-05', 'end': '2025-03-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(url, {'start': '2025-03-01', 'end': '2025-03-05', 'output': 'xlsx'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_students_cannot_export(self):
+        self.client.force_authenticate(user=self.students[0])
+        response = self.client.get(reverse('attendance_export'), {'start': '2025-03-01', 'end': '2025-03-05'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_csv_chunks_are_batched(self):
+        chunks = list(iter_csv(export_rows(date(2025, 1, 1), date(2025, 12, 31), chunk_size=2), rows_per_chunk=4))
+        # Header, then 9 rows in chunks of 4, 4 and 1
+        self.assertEqual(len(chunks), 4)
+
+    def test_management_command_writes_csv(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'out.csv')
+            call_command('export_attendance', start='2025-03-01', end='2025-03-31',
+                         classroom=self.classroom.id, output=path, stderr=StringIO())
+            with open(path, newline='') as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 4)
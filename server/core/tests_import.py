@@ -0,0 +1,152 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from .models import User, AttendanceRecord, Classroom, DailyAttendanceRollup, Enrollment, MonthlyStudentRollup
+from .imports import import_attendance, import_roster, read_csv
+from datetime import date, datetime, timezone as dt_timezone
+from unittest import mock
+from io import StringIO
+import json
+import os
+import tempfile
+
+class ImportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='teacher', password='pwd', role=User.Role.TEACHER)
+        self.client.force_authenticate(user=self.teacher)
+
+    def upload(self, name, content, **data):
+        upload = SimpleUploadedFile('data.csv', content.encode(), content_type='text/csv')
+        response = self.client.post(reverse(name), {'file': upload, **data}, format='multipart')
+        if response.status_code != status.HTTP_200_OK:
+            return response, []
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        return response, [json.loads(line) for line in lines]
+
+    def test_roster_import_creates_users_and_enrollments(self):
+        User.objects.create_user(username='existing', role=User.Role.STUDENT, first_name='Old')
+        content = (
+            'username,first_name,last_name,role,classroom\n'
+            'amy,Amy,Pond,,10-A\n'
+            'existing,New,,,10-A\n'
+            ',Nobody,,,10-A\n'
+            'rory,Rory,Williams,WIZARD,10-B\n'
+            'river,River,Song,TEACHER,10-B\n'
+        )
+        response, events = self.upload('roster_import', content)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual([e['row'] for e in events[0]['errors']], [3, 4])
+        self.assertEqual(events[-1], {'done': True, 'processed': 5, 'created': 2, 'updated': 1, 'enrolled': 2, 'errors': 2})
+
+        self.assertEqual(User.objects.get(username='existing').first_name, 'New')
+        self.assertEqual(User.objects.get(username='river').role, User.Role.TEACHER)
+        classroom = Classroom.objects.get(name='10-A')
+        enrolled = set(Enrollment.objects.filter(classroom=classroom).values_list('student__username', flat=True))
+        self.assertEqual(enrolled, {'amy', 'existing'})
+        # Teachers are not enrolled, and the empty 10-B classroom is still created once
+        self.assertEqual(Classroom.objects.filter(name='10-B').count(), 1)
+
+    def test_roster_cannot_change_roles_or_staff_accounts(self):
+        User.objects.create_user(username='amy', role=User.Role.STUDENT)
+        content = (
+            'username,first_name,email,role\n'
+            'amy,Amy,,TEACHER\n'
+            'teacher,,mine@example.com,\n'
+        )
+        _, events = self.upload('roster_import', content)
+        self.assertEqual([e['row'] for e in events[0]['errors']], [1, 2])
+        self.assertEqual(events[-1]['updated'], 0)
+        self.assertEqual(User.objects.get(username='amy').role, User.Role.STUDENT)
+        self.teacher.refresh_from_db()
+        self.assertEqual(self.teacher.email, '')
+
+    def test_roster_enrollment_refreshes_classroom_rollups(self):
+        student = User.objects.create_user(username='amy', role=User.Role.STUDENT)
+        AttendanceRecord.objects.create(student=student, date=date(2025, 3, 3), status='PRESENT')
+        list(import_roster(iter([(1, {'username': 'amy', 'classroom': '10-A'})])))
+        classroom = Classroom.objects.get(name='10-A')
+        rollup = DailyAttendanceRollup.objects.get(classroom=classroom, date=date(2025, 3, 3))
+        self.assertEqual((rollup.present, rollup.total), (1, 1))
+
+    def test_attendance_import_upserts_and_reports_errors(self):
+        student = User.objects.create_user(username='amy', role=User.Role.STUDENT)
+        AttendanceRecord.objects.create(student=student, date=date(2025, 3, 3), status='PRESENT')
+        content = (
+            'username,date,status,absence_reason\n'
+            'amy,2025-03-03,absent,Sick\n'
+            'amy,2025-03-04,PRESENT,\n'
+            'ghost,2025-03-04,PRESENT,\n'
+            'amy,03/05/2025,PRESENT,\n'
+            'teacher,2025-03-04,PRESENT,\n'
+        )
+        _, events = self.upload('attendance_import', content)
+        self.assertEqual([e['row'] for e in events[0]['errors']], [3, 4, 5])
+        self.assertEqual(events[-1], {'done': True, 'processed': 5, 'created': 1, 'updated': 1, 'errors': 3})
+
+        record = AttendanceRecord.objects.get(student=student, date=date(2025, 3, 3))
+        self.assertEqual((record.status, record.absence_reason), ('ABSENT', 'Sick'))
+        self.assertEqual(AttendanceRecord.objects.get(student=student, date=date(2025, 3, 4)).marked_by, self.teacher)
+        # Rollups are rebuilt for the imported months
+        rollup = MonthlyStudentRollup.objects.get(student=student, month=date(2025, 3, 1))
+        self.assertEqual((rollup.present, rollup.absent), (1, 1))
+
+    def test_missing_columns_is_a_400(self):
+        response, _ = self.upload('attendance_import', 'username,status\namy,PRESENT\n')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('date', response.data['error'])
+
+    def test_students_cannot_import(self):
+        self.client.force_authenticate(user=User.objects.create_user(username='amy', role=User.Role.STUDENT))
+        response, _ = self.upload('roster_import', 'username\nbob\n')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_one_lookup_per_batch(self):
+        students = [User.objects.create_user(username=f's{i}', role=User.Role.STUDENT) for i in range(20)]
+        rows = [(n, {'username': s.username, 'date': '2025-03-03', 'status': 'PRESENT'})
+                for n, s in enumerate(students, start=1)]
+        progress = import_attendance(iter(rows), self.teacher, batch_size=10)
+        for _ in range(2):
+            with CaptureQueriesContext(connection) as queries:
+                next(progress)
+            # Per batch: username lookup, existence check and one INSERT (savepoints aside)
+            statements = [q['sql'] for q in queries if 'SAVEPOINT' not in q['sql']]
+            self.assertEqual(len(statements), 3)
+        self.assertEqual(AttendanceRecord.objects.count(), 20)
+
+    def test_each_batch_is_stamped_when_written(self):
+        students = [User.objects.create_user(username=f's{i}', role=User.Role.STUDENT) for i in range(4)]
+        rows = [(n, {'username': s.username, 'date': '2025-03-03', 'status': 'PRESENT'})
+                for n, s in enumerate(students, start=1)]
+        stamps = [datetime(2025, 3, 3, 8, minute, tzinfo=dt_timezone.utc) for minute in (0, 5)]
+        with mock.patch('core.imports.timezone.now', side_effect=stamps):
+            list(import_attendance(iter(rows), self.teacher, batch_size=2))
+        updated = AttendanceRecord.objects.order_by('student__username').values_list('updated_at', flat=True)
+        self.assertEqual(list(updated), [stamps[0]] * 2 + [stamps[1]] * 2)
+
+    def test_command_resumes_from_checkpoint(self):
+        for i in range(4):
+            User.objects.create_user(username=f's{i}', role=User.Role.STUDENT)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'attendance.csv')
+            checkpoint = os.path.join(tmp, 'checkpoint.json')
+            with open(path, 'w') as f:
+                f.write('username,date,status\n')
+                for i in range(4):
+                    f.write(f's{i},2025-03-03,PRESENT\n')
+            with open(checkpoint, 'w') as f:
+                json.dump({'row': 2, 'first_date': '2025-02-10', 'last_date': '2025-03-03'}, f)
+
+            call_command('import_csv', 'attendance', path, checkpoint=checkpoint, batch_size=1, stdout=StringIO())
+            self.assertFalse(os.path.exists(checkpoint))
+        written = set(AttendanceRecord.objects.values_list('student__username', flat=True))
+        self.assertEqual(written, {'s2', 's3'})
+
+    def test_read_csv_skips_to_start_row(self):
+        rows = list(read_csv(StringIO('username\na\nb\nc\n'), {'username'}, start_row=2))
+        self.assertEqual(rows, [(3, {'username': 'c'})])
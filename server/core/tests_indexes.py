@@ -0,0 +1,50 @@
+from django.test import TestCase
+from django.db import connection
+from .models import User, AttendanceRecord
+from .utils import month_bounds
+from datetime import date, timedelta
+import os
+
+# Rows seeded for the planner tests. Set CAS_EXPLAIN_ROWS=1000000 to check plans at
+# production scale (the default keeps the suite fast while still beating a table scan).
+EXPLAIN_ROWS = int(os.environ.get('CAS_EXPLAIN_ROWS', 40000))
+EXPLAIN_DAYS = 1000 if EXPLAIN_ROWS >= 1000000 else 365
+
+class AttendanceIndexPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        num_students = max(1, EXPLAIN_ROWS // EXPLAIN_DAYS)
+        User.objects.bulk_create([
+            User(username=f'explain{i}', role=User.Role.STUDENT) for i in range(num_students)
+        ], batch_size=5000)
+        student_ids = list(User.objects.values_list('id', flat=True))
+        cls.student_id = student_ids[0]
+
+        first_day = date(2024, 1, 1)
+        batch = []
+        for offset in range(EXPLAIN_DAYS):
+            day = first_day + timedelta(days=offset)
+            for i, student_id in enumerate(student_ids):
+                status_val = 'ABSENT' if (i + offset) % 7 == 0 else 'PRESENT'
+                batch.append(AttendanceRecord(date=day, student_id=student_id, status=status_val))
+            if len(batch) >= 20000:
+                AttendanceRecord.objects.bulk_create(batch)
+                batch = []
+        AttendanceRecord.objects.bulk_create(batch)
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def test_student_month_uses_student_date_index(self):
+        start, end = month_bounds(2024, 6)
+        plan = AttendanceRecord.objects.filter(
+            student_id=self.student_id, date__gte=start, date__lt=end
+        ).values('status').explain()
+        self.assertIn('attendance_student_date_idx', plan)
+
+    def test_class_month_uses_date_status_index(self):
+        start, end = month_bounds(2024, 6)
+        plan = AttendanceRecord.objects.filter(
+            date__gte=start, date__lt=end
+        ).values('date', 'status').order_by().explain()
+        self.assertIn('attendance_date_status_idx', plan)
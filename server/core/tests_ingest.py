@@ -0,0 +1,131 @@
+from datetime import date, timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .attendance import upsert_roll_call
+from .models import AttendanceRecord, Classroom, Enrollment, IngestReceipt, User
+
+
+class AttendanceIngestTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='teacher', password='pwd', role=User.Role.TEACHER)
+        self.students = [User.objects.create_user(username=f'student{i}', role=User.Role.STUDENT) for i in range(4)]
+        self.url = reverse('attendance_ingest')
+        self.client.force_authenticate(user=self.teacher)
+
+    def roll_call(self, key, day, status_val='PRESENT', students=None, **extra):
+        records = [{'student_id': s.id, 'status': status_val} for s in students or self.students]
+        return {'key': key, 'date': day.isoformat(), 'records': records, **extra}
+
+    def post(self, *roll_calls, **headers):
+        return self.client.post(self.url, {'roll_calls': list(roll_calls)}, format='json', **headers)
+
+    def test_applies_many_dates_in_one_request(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post(*(self.roll_call(f'k{i}', date(2025, 3, 3 + i)) for i in range(5)))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['status'] for r in response.data['results']], ['applied'] * 5)
+        self.assertEqual(response.data['results'][0]['created'], 4)
+        self.assertEqual(AttendanceRecord.objects.count(), 20)
+        self.assertEqual(AttendanceRecord.objects.filter(marked_by=self.teacher).count(), 20)
+        # One write for the records, whatever the number of roll calls
+        self.assertEqual(len([q for q in queries if 'INSERT INTO "core_attendancerecord"' in q['sql']]), 1)
+
+    def test_retried_key_returns_first_result_without_writing(self):
+        first = self.post(self.roll_call('k1', date(2025, 3, 3)))
+        before = dict(AttendanceRecord.objects.values_list('id', 'updated_at'))
+        # The retry carries a different payload; the key alone decides
+        retry = self.post(self.roll_call('k1', date(2025, 3, 3), status_val='ABSENT'))
+        self.assertEqual(retry.data['results'][0]['status'], 'duplicate')
+        self.assertEqual(retry.data['results'][0]['created'], first.data['results'][0]['created'])
+        self.assertEqual(dict(AttendanceRecord.objects.values_list('id', 'updated_at')), before)
+        self.assertEqual(IngestReceipt.objects.count(), 1)
+
+    def test_key_repeated_within_batch_is_applied_once(self):
+        response = self.post(self.roll_call('k1', date(2025, 3, 3)),
+                             self.roll_call('k1', date(2025, 3, 4)))
+        results = response.data['results']
+        self.assertEqual([r['status'] for r in results], ['applied', 'duplicate'])
+        self.assertEqual(results[1]['date'], '2025-03-03')
+        self.assertFalse(AttendanceRecord.objects.filter(date=date(2025, 3, 4)).exists())
+
+    def test_unchanged_records_are_not_rewritten(self):
+        day = date(2025, 3, 3)
+        upsert_roll_call(day, {self.students[0].id: 'PRESENT', self.students[1].id: 'ABSENT'}, self.teacher)
+        before = dict(AttendanceRecord.objects.values_list('student_id', 'updated_at'))
+        response = self.post(self.roll_call('k1', day))
+        result = response.data['results'][0]
+        self.assertEqual((result['created'], result['updated'], result['unchanged']), (2, 1, 1))
+        after = dict(AttendanceRecord.objects.values_list('student_id', 'updated_at'))
+        self.assertEqual(after[self.students[0].id], before[self.students[0].id])
+        self.assertGreater(after[self.students[1].id], before[self.students[1].id])
+
+    def test_records_changed_since_the_client_copy_are_conflicts(self):
+        day = date(2025, 3, 3)
+        since = timezone.now()
+        upsert_roll_call(day, {self.students[0].id: 'ABSENT'}, self.teacher)
+        response = self.post(self.roll_call('k1', day, if_unmodified_since=since.isoformat()))
+        result = response.data['results'][0]
+        self.assertEqual(result['status'], 'applied')
+        self.assertEqual(result['created'], 3)
+        self.assertEqual([c['student_id'] for c in result['conflicts']], [self.students[0].id])
+        self.assertEqual(result['conflicts'][0]['status'], 'ABSENT')
+        self.assertEqual(AttendanceRecord.objects.get(student=self.students[0]).status, 'ABSENT')
+
+        # Sending back the reported updated_at overwrites it
+        response = self.post(self.roll_call('k2', day, students=self.students[:1],
+                                            if_unmodified_since=result['conflicts'][0]['updated_at']))
+        self.assertEqual(response.data['results'][0]['updated'], 1)
+        self.assertEqual(AttendanceRecord.objects.get(student=self.students[0]).status, 'PRESENT')
+
+    def test_if_unmodified_since_header_applies_to_the_batch(self):
+        day = date(2025, 3, 3)
+        upsert_roll_call(day, {self.students[0].id: 'ABSENT'}, self.teacher)
+        stale = http_date((timezone.now() - timedelta(hours=1)).timestamp())
+        response = self.post(self.roll_call('k1', day), HTTP_IF_UNMODIFIED_SINCE=stale)
+        self.assertEqual(len(response.data['results'][0]['conflicts']), 1)
+
+        fresh = http_date((timezone.now() + timedelta(seconds=1)).timestamp())
+        response = self.post(self.roll_call('k2', day), HTTP_IF_UNMODIFIED_SINCE=fresh)
+        self.assertEqual(response.data['results'][0]['conflicts'], [])
+        self.assertFalse(AttendanceRecord.objects.exclude(status='PRESENT').exists())
+
+    def test_invalid_roll_calls_are_rejected_individually(self):
+        response = self.post(
+            self.roll_call('k1', date(2025, 3, 3)),
+            {'date': '2025-03-04', 'records': []},
+            {'key': 'k3', 'date': '2025-03-05', 'records': [{'student_id': 999999, 'status': 'PRESENT'}]},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['status'] for r in response.data['results']], ['applied', 'rejected', 'rejected'])
+        self.assertEqual(AttendanceRecord.objects.count(), 4)
+        # A rejected key leaves no receipt, so a corrected copy can still be sent
+        self.assertEqual(list(IngestReceipt.objects.values_list('key', flat=True)), ['k1'])
+
+    def test_invalid_batch(self):
+        self.assertEqual(self.client.post(self.url, {'roll_calls': 'nope'}, format='json').status_code, 400)
+        response = self.post(self.roll_call('k1', date(2025, 3, 3)), HTTP_IF_UNMODIFIED_SINCE='yesterday')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(AttendanceRecord.objects.exists())
+
+    def test_classroom_scope_and_role(self):
+        classroom = Classroom.objects.create(name='A')
+        Enrollment.objects.create(classroom=classroom, student=self.students[0])
+        url = reverse('classroom_attendance_ingest', args=[classroom.id])
+        response = self.client.post(url, {'roll_calls': [self.roll_call('k1', date(2025, 3, 3))]}, format='json')
+        self.assertEqual(response.data['results'][0]['status'], 'rejected')
+        response = self.client.post(url, {'roll_calls': [
+            self.roll_call('k2', date(2025, 3, 3), students=self.students[:1])
+        ]}, format='json')
+        self.assertEqual(response.data['results'][0]['status'], 'applied')
+
+        self.client.force_authenticate(user=self.students[0])
+        self.assertEqual(self.post(self.roll_call('k3', date(2025, 3, 3))).status_code, status.HTTP_403_FORBIDDEN)
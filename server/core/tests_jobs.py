@@ -0,0 +1,190 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from .models import User, AttendanceRecord, Job
+from .jobs import HANDLERS, claim_next, jobs_dir, purge_files, requeue_stale, run_job
+from datetime import date, timedelta
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+class JobTests(TestCase):
+    def setUp(self):
+        self.jobs_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.jobs_dir, ignore_errors=True)
+        override = override_settings(JOBS_DIR=self.jobs_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='teacher', role=User.Role.TEACHER)
+        self.student = User.objects.create_user(username='student', role=User.Role.STUDENT)
+        self.client.force_authenticate(user=self.teacher)
+
+    def job(self, response):
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED, response.content)
+        self.assertEqual(response['Location'], reverse('job_detail', args=[response.data['id']]))
+        return response.data['id']
+
+    def status_of(self, job_id):
+        return self.client.get(reverse('job_detail', args=[job_id])).json()
+
+    def test_bulk_mark_in_background(self):
+        url = reverse('bulk_attendance') + '?background=1'
+        payload = {'student_id': self.student.id, 'month': '2025-02', 'status': 'ABSENT'}
+        job_id = self.job(self.client.post(url, payload, format='json'))
+        self.assertFalse(AttendanceRecord.objects.exists())
+        self.assertEqual(self.status_of(job_id)['status'], 'QUEUED')
+
+        call_command('run_workers', once=True)
+        job = self.status_of(job_id)
+        self.assertEqual((job['status'], job['result'], job['attempts']), ('SUCCEEDED', {'done': True, 'count': 28}, 1))
+        self.assertEqual(AttendanceRecord.objects.filter(student=self.student, status='ABSENT').count(), 28)
+
+    def test_idempotency_key_returns_the_same_job(self):
+        url = reverse('bulk_attendance_range') + '?background=1'
+        payload = {'student_ids': [self.student.id], 'start_date': '2025-03-03', 'end_date': '2025-03-07', 'status': 'PRESENT'}
+        job_id = self.job(self.client.post(url, payload, format='json', HTTP_IDEMPOTENCY_KEY='abc'))
+        again = self.client.post(url, payload, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertEqual((again.status_code, again.data['id']), (status.HTTP_200_OK, job_id))
+        self.assertEqual(Job.objects.count(), 1)
+
+        call_command('run_workers', once=True)
+        self.assertEqual(self.status_of(job_id)['result']['created'], 5)
+        # Validation still happens in the request
+        bad = self.client.post(url, {**payload, 'status': 'LATE'}, format='json')
+        self.assertEqual(bad.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_import_in_background_collects_errors(self):
+        content = 'username,date,status\nstudent,2025-03-03,PRESENT\nghost,2025-03-03,PRESENT\n'
+        upload = SimpleUploadedFile('data.csv', content.encode(), content_type='text/csv')
+        response = self.client.post(reverse('attendance_import') + '?background=1', {'file': upload}, format='multipart')
+        job_id = self.job(response)
+        path = Job.objects.get(pk=job_id).params['path']
+        self.assertTrue(os.path.exists(path))
+
+        call_command('run_workers', once=True)
+        job = self.status_of(job_id)
+        self.assertEqual(job['status'], 'SUCCEEDED')
+        self.assertEqual(job['result']['created'], 1)
+        self.assertEqual(job['result']['errors'], 1)
+        self.assertEqual(job['result']['error_rows'], [{'row': 2, 'error': 'Unknown student: ghost'}])
+        self.assertFalse(os.path.exists(path))
+
+        bad = SimpleUploadedFile('data.csv', b'username\nstudent\n', content_type='text/csv')
+        response = self.client.post(reverse('attendance_import') + '?background=1', {'file': bad}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(os.listdir(os.path.join(self.jobs_dir, 'uploads')), [])
+
+    def test_roster_job_stores_a_password_hash(self):
+        upload = SimpleUploadedFile('data.csv', b'username\namy\n', content_type='text/csv')
+        response = self.client.post(reverse('roster_import') + '?background=1',
+                                    {'file': upload, 'password': 'secret-pw'}, format='multipart')
+        params = Job.objects.get(pk=self.job(response)).params
+        self.assertNotIn('secret-pw', str(params))
+        call_command('run_workers', once=True)
+        self.assertTrue(User.objects.get(username='amy').check_password('secret-pw'))
+
+    def test_export_job_and_download(self):
+        AttendanceRecord.objects.create(student=self.student, date=date(2025, 3, 3), status='PRESENT')
+        url = reverse('attendance_export') + '?start=2025-03-01&end=2025-03-31'
+        job_id = self.job(self.client.post(url))
+        download = reverse('job_download', args=[job_id])
+        self.assertEqual(self.client.get(download).status_code, status.HTTP_409_CONFLICT)
+
+        call_command('run_workers', once=True)
+        job = self.status_of(job_id)
+        self.assertEqual(job['result']['rows'], 1)
+        self.assertNotIn('file', job['result'])
+        self.assertEqual(job['download'], download)
+        response = self.client.get(download)
+        self.assertIn('attendance_2025-03-01_2025-03-31.csv', response['Content-Disposition'])
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+
+        # Jobs are private to their creator
+        other = User.objects.create_user(username='other', role=User.Role.TEACHER)
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(download).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(reverse('job_list')).json(), [])
+
+    def test_job_list_pages_newest_first(self):
+        ids = [Job.objects.create(kind='export_attendance', params={}, created_by=self.teacher).id for _ in range(5)]
+        self.assertEqual([job['id'] for job in self.client.get(reverse('job_list')).json()], ids[::-1])
+        response = self.client.get(reverse('job_list'), {'page_size': 2})
+        seen = []
+        while True:
+            seen.extend(job['id'] for job in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(seen, ids[::-1])
+
+    def test_failed_job_records_the_error(self):
+        job = Job.objects.create(kind='import_attendance', params={'path': '/nonexistent.csv'}, created_by=self.teacher)
+        run_job(claim_next('test'))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (Job.Status.FAILED, 'The uploaded file is no longer available'))
+
+    @override_settings(JOBS_MAX_ATTEMPTS=2)
+    def test_stale_jobs_are_requeued_then_failed(self):
+        job = Job.objects.create(kind='backfill', params={}, created_by=self.teacher)
+        self.assertEqual(claim_next('crashed').pk, job.pk)
+        self.assertIsNone(claim_next('other'))
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(requeue_stale(), (1, 0))
+        claim_next('crashed-again')
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(requeue_stale(), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Status.FAILED, 2))
+
+
+    def test_expired_job_files_are_purged(self):
+        def write(path, age):
+            with open(path, 'w') as f:
+                f.write('x')
+            stamp = time.time() - age
+            os.utime(path, (stamp, stamp))
+            return path
+
+        old_export = write(jobs_dir('exports', 'job-1.csv'), 7200)
+        new_export = write(jobs_dir('exports', 'job-2.csv'), 0)
+        orphan = write(jobs_dir('uploads', 'orphan.csv'), 7200)
+        waiting = write(jobs_dir('uploads', 'waiting.csv'), 7200)
+        Job.objects.create(kind='import_attendance', params={'path': waiting}, created_by=self.teacher)
+        job = Job.objects.create(kind='export', status=Job.Status.SUCCEEDED, created_by=self.teacher,
+                                 result={'done': True, 'file': old_export, 'filename': 'a.csv'})
+
+        self.assertEqual(purge_files(retention=3600), 2)
+        self.assertEqual([os.path.exists(p) for p in (old_export, new_export, orphan, waiting)],
+                         [False, True, False, True])
+        response = self.client.get(reverse('job_download', args=[job.pk]))
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+        self.assertEqual(purge_files(retention=0), 0)
+
+class JobHeartbeatTests(TransactionTestCase):
+    @override_settings(JOBS_HEARTBEAT_SECONDS=0.05)
+    def test_job_running_past_the_stale_timeout_is_not_reclaimed(self):
+        teacher = User.objects.create_user(username='teacher', role=User.Role.TEACHER)
+        seen = []
+
+        def slow(job):
+            # No progress events for longer than the stale timeout below
+            time.sleep(0.5)
+            seen.append((requeue_stale(timeout=0.2), claim_next('other-worker')))
+            yield {'done': True}
+
+        with mock.patch.dict(HANDLERS, {'slow': slow}):
+            Job.objects.create(kind='slow', created_by=teacher)
+            run_job(claim_next('worker'))
+
+        self.assertEqual(seen, [((0, 0), None)])
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts, job.worker), (Job.Status.SUCCEEDED, 1, 'worker'))
@@ -0,0 +1,46 @@
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from .models import User
+from .backends import shutdown_pool
+
+class FastPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = 1
+
+HASHERS = ['core.tests_login.FastPBKDF2PasswordHasher', 'django.contrib.auth.hashers.MD5PasswordHasher']
+
+@override_settings(PASSWORD_HASHERS=HASHERS)
+class LoginRehashTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        # Stored with the legacy hasher, as if created before the preferred hasher changed
+        with override_settings(PASSWORD_HASHERS=HASHERS[::-1]):
+            self.user = User.objects.create_user(username='student', password='pwd', role=User.Role.STUDENT)
+        self.assertTrue(self.user.password.startswith('md5$'))
+
+    def login(self, password='pwd'):
+        return self.client.post(reverse('token_obtain_pair'), {'username': 'student', 'password': password})
+
+    def test_login_rehashes_with_preferred_hasher(self):
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1$'))
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+
+    def test_wrong_password_does_not_rehash(self):
+        self.assertEqual(self.login('nope').status_code, status.HTTP_401_UNAUTHORIZED)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('md5$'))
+
+@override_settings(PASSWORD_HASHERS=HASHERS, AUTHENTICATION_BACKENDS=['core.backends.ProcessPoolModelBackend'])
+class ProcessPoolBackendTests(LoginRehashTests):
+    def tearDown(self):
+        shutdown_pool()
+
+    def test_unknown_and_inactive_users_fail(self):
+        response = self.client.post(reverse('token_obtain_pair'), {'username': 'ghost', 'password': 'pwd'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.login().status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,68 @@
+from unittest import skipIf, skipUnless
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from .models import User, Classroom, Enrollment, AttendanceRecord
+from .calendars import class_matrix
+from .renderers import msgpack
+from datetime import date
+
+class ClassMatrixTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='teacher', role=User.Role.TEACHER)
+        self.classroom = Classroom.objects.create(name='10A')
+        other_classroom = Classroom.objects.create(name='10B')
+        self.alice = User.objects.create_user(username='alice', first_name='Alice', role=User.Role.STUDENT)
+        self.bob = User.objects.create_user(username='bob', first_name='Bob', role=User.Role.STUDENT)
+        outsider = User.objects.create_user(username='carol', role=User.Role.STUDENT)
+        Enrollment.objects.create(student=self.alice, classroom=self.classroom)
+        Enrollment.objects.create(student=self.bob, classroom=self.classroom)
+        Enrollment.objects.create(student=outsider, classroom=other_classroom)
+        AttendanceRecord.objects.create(student=self.alice, date=date(2025, 2, 1), status='PRESENT')
+        AttendanceRecord.objects.create(student=self.alice, date=date(2025, 2, 3), status='ABSENT')
+        AttendanceRecord.objects.create(student=self.alice, date=date(2025, 2, 28), status='PRESENT')
+        AttendanceRecord.objects.create(student=self.alice, date=date(2025, 3, 1), status='ABSENT')
+        AttendanceRecord.objects.create(student=outsider, date=date(2025, 2, 1), status='ABSENT')
+        self.url = reverse('classroom_attendance_matrix', args=[self.classroom.id])
+
+    def test_matrix_in_one_query(self):
+        with self.assertNumQueries(1):
+            data = class_matrix(self.classroom.id, date(2025, 2, 1), date(2025, 3, 1))
+        self.assertEqual(data['days'], 28)
+        self.assertEqual(data['student_id'], [self.alice.id, self.bob.id])
+        self.assertEqual(data['first_name'], ['Alice', 'Bob'])
+        # Students without records in the month still get an all-unmarked row
+        self.assertEqual(data['status'], ['PUA' + 'U' * 24 + 'P', 'U' * 28])
+
+    def test_endpoint(self):
+        self.client.force_authenticate(user=self.teacher)
+        response = self.client.get(self.url, {'month': '2025-02'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['month'], '2025-02')
+        self.assertEqual(data['username'], ['alice', 'bob'])
+        self.assertEqual(data['status'][0][:3], 'PUA')
+
+    def test_validation(self):
+        self.client.force_authenticate(user=self.teacher)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'month': 'Feb'}).status_code, status.HTTP_400_BAD_REQUEST)
+        missing = reverse('classroom_attendance_matrix', args=[9999])
+        self.assertEqual(self.client.get(missing, {'month': '2025-02'}).status_code, status.HTTP_404_NOT_FOUND)
+        self.client.force_authenticate(user=self.alice)
+        self.assertEqual(self.client.get(self.url, {'month': '2025-02'}).status_code, status.HTTP_403_FORBIDDEN)
+
+    @skipUnless(msgpack, 'msgpack is not installed')
+    def test_msgpack(self):
+        self.client.force_authenticate(user=self.teacher)
+        response = self.client.get(self.url, {'month': '2025-02'}, HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content), self.client.get(self.url, {'month': '2025-02'}).json())
+
+    @skipIf(msgpack, 'msgpack is installed')
+    def test_msgpack_not_offered_without_package(self):
+        self.client.force_authenticate(user=self.teacher)
+        response = self.client.get(self.url, {'month': '2025-02'}, HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response.status_code, status.HTTP_406_NOT_ACCEPTABLE)
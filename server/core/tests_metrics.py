@@ -0,0 +1,45 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from .models import User
+from .metrics import registry
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        registry.reset()
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='teacher', password='pwd', role=User.Role.TEACHER)
+        self.admin = User.objects.create_user(username='admin', password='pwd', role=User.Role.TEACHER, is_staff=True)
+
+    def test_records_and_exposes_per_view_metrics(self):
+        self.client.force_authenticate(user=self.teacher)
+        self.client.get(reverse('student_list'))
+        self.client.get(reverse('student_list'))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.admin)
+        body = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('cas_request_duration_seconds_count{view="student_list",method="GET"} 2', body)
+        self.assertIn('cas_request_duration_seconds_bucket{view="student_list",method="GET",le="+Inf"} 2', body)
+        self.assertIn('cas_db_queries_total{view="student_list",method="GET"} 2', body)
+        self.assertIn('cas_response_bytes_total{view="student_list",method="GET"}', body)
+        self.assertIn('# TYPE cas_render_seconds_total counter', body)
+
+    @override_settings(METRICS_SLOW_REQUEST_MS=1e-6)
+    def test_slow_requests_are_logged_with_sql(self):
+        client = APIClient()
+        client.force_authenticate(user=self.teacher)
+        with self.assertLogs('core.metrics', level='WARNING') as logs:
+            client.get(reverse('student_list'))
+        self.assertIn('Slow request GET', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled_metrics_leave_responses_alone(self):
+        client = APIClient()
+        client.force_authenticate(user=self.teacher)
+        response = client.get(reverse('student_list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('student_list', registry.render())
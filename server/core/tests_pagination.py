@@ -0,0 +1,64 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from .models import User, AttendanceRecord
+from datetime import date, timedelta
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='teacher', password='pwd', role=User.Role.TEACHER)
+        self.student = User.objects.create_user(username='student', first_name='Asha', role=User.Role.STUDENT)
+        self.others = [User.objects.create_user(username=f's{i}', role=User.Role.STUDENT) for i in range(4)]
+        for offset in range(10):
+            AttendanceRecord.objects.create(student=self.student, date=date(2025, 3, 1) + timedelta(days=offset), status='PRESENT')
+
+    def walk(self, url, params):
+        pages, results = 0, []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages += 1
+            results.extend(response.data['results'])
+            if not response.data['next']:
+                return pages, results
+            response = self.client.get(response.data['next'])
+
+    def test_unpaginated_by_default(self):
+        self.client.force_authenticate(user=self.teacher)
+        response = self.client.get(reverse('student_list'))
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 5)
+
+    def test_student_attendance_pages_by_date(self):
+        self.client.force_authenticate(user=self.student)
+        pages, results = self.walk(reverse('student_attendance_list'), {'month': '2025-03', 'page_size': 3})
+        self.assertEqual(pages, 4)
+        self.assertEqual([r['date'] for r in results], [(date(2025, 3, 1) + timedelta(days=i)).isoformat() for i in range(10)])
+
+    def test_student_list_pages_by_id(self):
+        self.client.force_authenticate(user=self.teacher)
+        pages, results = self.walk(reverse('student_list'), {'page_size': 2})
+        self.assertEqual(pages, 3)
+        self.assertEqual(len({r['id'] for r in results}), 5)
+
+    def test_invalid_cursor(self):
+        self.client.force_authenticate(user=self.teacher)
+        response = self.client.get(reverse('student_list'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class FieldProjectionTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.student = User.objects.create_user(username='student', first_name='Asha', role=User.Role.STUDENT)
+        AttendanceRecord.objects.create(student=self.student, date=date(2025, 3, 1), status='ABSENT')
+        self.client.force_authenticate(user=self.student)
+
+    def test_fields_limit_payload(self):
+        response = self.client.get(reverse('student_attendance_list'), {'month': '2025-03', 'fields': 'date,status,student_name'})
+        self.assertEqual(response.data, [{'date': '2025-03-01', 'status': 'ABSENT', 'student_name': 'Asha'}])
+
+    def test_unknown_field(self):
+        response = self.client.get(reverse('student_attendance_list'), {'month': '2025-03', 'fields': 'date,password'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,75 @@
+from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+from .models import User, AttendanceRecord, Classroom, Enrollment, DailyAttendanceRollup, MonthlyStudentRollup
+from .rollups import rebuild_rollups
+from datetime import date
+from io import StringIO
+
+def snapshot():
+    daily = set(DailyAttendanceRollup.objects.values_list('classroom_id', 'date', 'present', 'absent', 'total'))
+    monthly = set(MonthlyStudentRollup.objects.values_list('student_id', 'month', 'present', 'absent', 'total'))
+    return daily, monthly
+
+class RollupMaintenanceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='teacher', password='pwd', role=User.Role.TEACHER)
+        self.classroom = Classroom.objects.create(name='10-A')
+        self.students = [
+            User.objects.create_user(username=f'student{i}', role=User.Role.STUDENT)
+            for i in range(3)
+        ]
+        for student in self.students[:2]:
+            Enrollment.objects.create(student=student, classroom=self.classroom)
+        self.client.force_authenticate(user=self.teacher)
+
+    def assertRollupsMatchRebuild(self):
+        incremental = snapshot()
+        rebuild_rollups()
+        self.assertEqual(incremental, snapshot())
+
+    def test_write_paths_keep_rollups_current(self):
+        self.client.post(reverse('attendance_mark'), {
+            'date': '2025-03-03',
+            'records': [
+                {'student_id': self.students[0].id, 'status': 'PRESENT'},
+                {'student_id': self.students[1].id, 'status': 'ABSENT'},
+                {'student_id': self.students[2].id, 'status': 'ABSENT'},
+            ]
+        }, format='json')
+        school = DailyAttendanceRollup.objects.get(classroom=None, date=date(2025, 3, 3))
+        self.assertEqual((school.present, school.absent, school.total), (1, 2, 3))
+        classroom = DailyAttendanceRollup.objects.get(classroom=self.classroom, date=date(2025, 3, 3))
+        self.assertEqual((classroom.present, classroom.absent, classroom.total), (1, 1, 2))
+        self.assertRollupsMatchRebuild()
+
+        response = self.client.post(reverse('bulk_attendance_range'), {
+            'student_ids': [self.students[0].id], 'start_date': '2025-03-01',
+            'end_date': '2025-03-10', 'status': 'ABSENT',
+        }, format='json')
+        b''.join(response.streaming_content)
+        monthly = MonthlyStudentRollup.objects.get(student=self.students[0], month=date(2025, 3, 1))
+        self.assertEqual((monthly.absent, monthly.total), (10, 10))
+        self.assertRollupsMatchRebuild()
+
+        self.client.post(reverse('bulk_attendance'), {
+            'student_id': self.students[1].id, 'month': '2025-02', 'status': 'PRESENT',
+        }, format='json')
+        self.assertEqual(MonthlyStudentRollup.objects.get(student=self.students[1], month=date(2025, 2, 1)).present, 28)
+        self.assertRollupsMatchRebuild()
+
+    def test_class_analytics_reads_rollups(self):
+        AttendanceRecord.objects.create(student=self.students[0], date=date(2025, 3, 3), status='PRESENT')
+        response = self.client.get(reverse('class_analytics'), {'month': '2025-03'})
+        # Written behind the write paths' back, so not visible until a rebuild
+        self.assertEqual(response.data['overview']['total_records'], 0)
+
+        out = StringIO()
+        call_command('rebuild_rollups', stdout=out)
+        self.assertIn('Rebuilt', out.getvalue())
+        response = self.client.get(reverse('class_analytics'), {'month': '2025-03'})
+        self.assertEqual(response.data['overview']['total_records'], 1)
@@ -0,0 +1,29 @@
+from django.test import TestCase
+from django.core.management import call_command
+from .models import User, AttendanceRecord, Classroom, Enrollment, MonthlyStudentRollup
+from io import StringIO
+
+class SeedSchoolTests(TestCase):
+    def seed(self, **options):
+        call_command('seed_data', stdout=StringIO(), classrooms=2, students=3, days=5, **options)
+
+    def test_generates_school(self):
+        self.seed(absence_rate=1.0)
+        self.assertEqual(Classroom.objects.count(), 2)
+        self.assertEqual(User.objects.filter(role=User.Role.STUDENT).count(), 6)
+        self.assertEqual(Enrollment.objects.count(), 6)
+        self.assertEqual(AttendanceRecord.objects.count(), 30)
+        self.assertFalse(AttendanceRecord.objects.filter(status='PRESENT').exists())
+        self.assertFalse(AttendanceRecord.objects.filter(date__week_day__in=[1, 7]).exists())
+        self.assertTrue(MonthlyStudentRollup.objects.exists())
+
+        # Students share one password hash and can log in
+        student = User.objects.get(username='student6')
+        self.assertTrue(student.check_password('password123'))
+        self.assertEqual(User.objects.values('password').distinct().count(), 1)
+
+    def test_rerun_is_idempotent(self):
+        self.seed(absence_rate=0.0)
+        self.seed(absence_rate=1.0)
+        self.assertEqual(AttendanceRecord.objects.count(), 30)
+        self.assertFalse(AttendanceRecord.objects.filter(status='ABSENT').exists())
@@ -0,0 +1,29 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from .models import User, AttendanceRecord
+from .serializers import AttendanceRecordSerializer, record_values, serialize_record_rows
+from datetime import date
+
+class FastRecordSerializationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='teacher', password='pwd', role=User.Role.TEACHER)
+        for i in range(20):
+            student = User.objects.create_user(username=f'student{i}', first_name=f'S{i}', role=User.Role.STUDENT)
+            AttendanceRecord.objects.create(
+                student=student, date=date(2025, 3, 3), marked_by=self.teacher,
+                status='ABSENT' if i % 3 else 'PRESENT', absence_reason='Sick' if i % 3 else None
+            )
+
+    def test_matches_model_serializer(self):
+        records = AttendanceRecord.objects.order_by('id')
+        expected = AttendanceRecordSerializer(records.select_related('student'), many=True).data
+        self.assertEqual(serialize_record_rows(record_values(records)), [dict(row) for row in expected])
+
+    def test_list_is_one_query(self):
+        self.client.force_authenticate(user=self.teacher)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('attendance_list'), {'date': '2025-03-03'})
+        self.assertEqual(len(response.data), 20)
+        self.assertEqual(response.data[0]['student_username'][:7], 'student')
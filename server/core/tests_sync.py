@@ -0,0 +1,86 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from .models import User, Classroom, Enrollment, AttendanceRecord, AttendanceTombstone
+from .attendance import upsert_roll_call
+from datetime import date
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class AttendanceChangesTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='teacher', role=User.Role.TEACHER)
+        self.student = User.objects.create_user(username='student', role=User.Role.STUDENT)
+        self.other = User.objects.create_user(username='other', role=User.Role.STUDENT)
+        self.classroom = Classroom.objects.create(name='10A')
+        Enrollment.objects.create(student=self.student, classroom=self.classroom)
+        self.record = AttendanceRecord.objects.create(student=self.student, date=date(2025, 3, 3), status='PRESENT')
+        AttendanceRecord.objects.create(student=self.other, date=date(2025, 3, 3), status='ABSENT')
+        self.url = reverse('attendance_changes')
+        self.client.force_authenticate(user=self.teacher)
+
+    def poll(self, url=None, **params):
+        response = self.client.get(url or self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def test_initial_sync_then_empty_delta(self):
+        data = self.poll()
+        self.assertEqual(len(data['changed']), 2)
+        self.assertEqual(data['deleted'], [])
+        self.assertFalse(data['has_more'])
+        with self.assertNumQueries(2):
+            self.client.get(self.url, {'cursor': data['cursor']})
+        again = self.poll(cursor=data['cursor'])
+        self.assertEqual((again['changed'], again['deleted']), ([], []))
+
+    def test_updates_after_cursor(self):
+        cursor = self.poll()['cursor']
+        upsert_roll_call(date(2025, 3, 3), {self.student.id: 'ABSENT'}, self.teacher)
+        data = self.poll(cursor=cursor)
+        self.assertEqual([(r['id'], r['status']) for r in data['changed']], [(self.record.id, 'ABSENT')])
+
+    def test_bulk_overwrite_leaves_tombstones(self):
+        cursor = self.poll()['cursor']
+        response = self.client.post(reverse('bulk_attendance'),
+                                    {'student_id': self.student.id, 'month': '2025-03', 'status': 'ABSENT'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = self.poll(cursor=cursor)
+        self.assertEqual(data['deleted'], [{'id': self.record.id, 'student': self.student.id, 'date': '2025-03-03'}])
+        self.assertEqual(len(data['changed']), 31)
+        self.assertNotIn(self.record.id, {r['id'] for r in data['changed']})
+
+    def test_deleting_student_leaves_tombstones(self):
+        self.student.delete()
+        self.assertEqual(list(AttendanceTombstone.objects.values_list('record_id', flat=True)), [self.record.id])
+
+    def test_pages_with_limit(self):
+        seen = []
+        cursor = None
+        while True:
+            data = self.poll(limit=1, **({'cursor': cursor} if cursor else {}))
+            seen.extend(r['id'] for r in data['changed'])
+            cursor = data['cursor']
+            if not data['has_more']:
+                break
+        self.assertEqual(len(seen), 2)
+        self.assertEqual(len(set(seen)), 2)
+
+    def test_scoping(self):
+        scoped = reverse('classroom_attendance_changes', args=[self.classroom.id])
+        self.assertEqual([r['student'] for r in self.poll(scoped)['changed']], [self.student.id])
+        self.assertEqual(self.poll(start='2025-03-04')['changed'], [])
+        self.client.force_authenticate(user=self.other)
+        own = self.poll(reverse('student_attendance_changes'))
+        self.assertEqual([r['student'] for r in own['changed']], [self.other.id])
+
+    @override_settings(SYNC_SETTLE_SECONDS=3600)
+    def test_cursor_holds_back_unsettled_rows(self):
+        cursor = self.poll()['cursor']
+        # Recent rows are resent until they settle, in case an older transaction commits late
+        self.assertEqual(len(self.poll(cursor=cursor)['changed']), 2)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get(self.url, {'cursor': 'nope'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'limit': 'x'}).status_code, status.HTTP_400_BAD_REQUEST)
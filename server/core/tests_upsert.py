@@ -0,0 +1,68 @@
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from .models import User, AttendanceRecord
+from datetime import date
+
+class AttendanceUpsertTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='teacher', password='pwd', role=User.Role.TEACHER)
+        self.students = [
+            User.objects.create_user(username=f'student{i}', role=User.Role.STUDENT)
+            for i in range(60)
+        ]
+        self.url = reverse('attendance_mark')
+        self.client.force_authenticate(user=self.teacher)
+
+    def post_roll_call(self, students, status_val='PRESENT', day=date(2025, 3, 10)):
+        return self.client.post(self.url, {
+            'date': day.isoformat(),
+            'records': [{'student_id': s.id, 'status': status_val} for s in students]
+        }, format='json')
+
+    def test_creates_and_updates_records(self):
+        response = self.post_roll_call(self.students[:3])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(response.data[0]['student_username'], 'student0')
+
+        response = self.post_roll_call(self.students[:3], status_val='ABSENT')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AttendanceRecord.objects.count(), 3)
+        self.assertFalse(AttendanceRecord.objects.exclude(status='ABSENT').exists())
+        self.assertEqual(AttendanceRecord.objects.first().marked_by, self.teacher)
+
+    def test_query_count_is_constant(self):
+        with CaptureQueriesContext(connection) as small:
+            self.post_roll_call(self.students[:5])
+        with CaptureQueriesContext(connection) as large:
+            self.post_roll_call(self.students, day=date(2025, 3, 11))
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(AttendanceRecord.objects.filter(date=date(2025, 3, 11)).count(), 60)
+
+    def test_invalid_payload_writes_nothing(self):
+        response = self.client.post(self.url, {
+            'date': '2025-03-10',
+            'records': [
+                {'student_id': self.students[0].id, 'status': 'PRESENT'},
+                {'student_id': self.students[1].id, 'status': 'LATE'},
+                {'student_id': 999999, 'status': 'PRESENT'},
+            ]
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([e['index'] for e in response.data['details']], [1, 2])
+        self.assertFalse(AttendanceRecord.objects.exists())
+
+    def test_resubmitting_unchanged_roll_call_writes_nothing(self):
+        self.post_roll_call(self.students[:3])
+        before = dict(AttendanceRecord.objects.values_list('id', 'updated_at'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post_roll_call(self.students[:3])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(dict(AttendanceRecord.objects.values_list('id', 'updated_at')), before)
+        self.assertFalse([q for q in queries if q['sql'].startswith(('INSERT', 'UPDATE'))])
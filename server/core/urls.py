@@ -2,15 +2,28 @@ from django.urls import path
 from .views import (
     CustomTokenObtainPairView, 
     UserMeView,
+    ClassroomListView,
     StudentListView,
     AttendanceListView,
     AttendanceUpsertView,
+    AttendanceIngestView,
     StudentAttendanceListView,
+    StudentAttendanceCalendarView,
     StudentAbsenceReasonUpdateView,
+    ClassAttendanceMatrixView,
+    AttendanceChangesView,
     ClassMonthlySummaryView,
     StudentMonthlySummaryView,
-    BulkAttendanceView
+    BulkAttendanceView,
+    BulkRangeAttendanceView,
+    AttendanceExportView,
+    CSVImportView,
+    JobListView,
+    JobDetailView,
+    JobDownloadView,
+    MetricsView
 )
+from . import async_views
 
 urlpatterns = [
     path('auth/login/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -20,9 +33,13 @@ urlpatterns = [
     path('teacher/students/', StudentListView.as_view(), name='student_list'),
     path('teacher/attendance/', AttendanceListView.as_view(), name='attendance_list'),
     path('teacher/attendance/mark/', AttendanceUpsertView.as_view(), name='attendance_mark'),
+    path('teacher/attendance/ingest/', AttendanceIngestView.as_view(), name='attendance_ingest'),
+    path('teacher/attendance/changes/', AttendanceChangesView.as_view(), name='attendance_changes'),
     
     # Student Routes
     path('student/attendance/', StudentAttendanceListView.as_view(), name='student_attendance_list'),
+    path('student/attendance/calendar/', StudentAttendanceCalendarView.as_view(), name='student_attendance_calendar'),
+    path('student/attendance/changes/', AttendanceChangesView.as_view(), name='student_attendance_changes'),
     path('student/attendance/<int:pk>/reason/', StudentAbsenceReasonUpdateView.as_view(), name='student_absence_reason_update'),
     
     # Teacher Analytics Routes
@@ -31,4 +48,43 @@ urlpatterns = [
     
     # Bulk Attendance
     path('teacher/attendance/bulk/', BulkAttendanceView.as_view(), name='bulk_attendance'),
+    path('teacher/attendance/bulk/range/', BulkRangeAttendanceView.as_view(), name='bulk_attendance_range'),
+
+    # Export
+    path('teacher/attendance/export/', AttendanceExportView.as_view(), name='attendance_export'),
+
+    # Import
+    path('teacher/import/roster/', CSVImportView.as_view(kind='roster'), name='roster_import'),
+    path('teacher/import/attendance/', CSVImportView.as_view(kind='attendance'), name='attendance_import'),
+
+    # Background jobs (?background=1 on bulk marks and imports, POST on exports)
+    path('teacher/jobs/', JobListView.as_view(), name='job_list'),
+    path('teacher/jobs/<int:pk>/', JobDetailView.as_view(), name='job_detail'),
+    path('teacher/jobs/<int:pk>/download/', JobDownloadView.as_view(), name='job_download'),
+
+    # Classroom-scoped Teacher Routes (joined through Enrollment)
+    path('teacher/classrooms/', ClassroomListView.as_view(), name='classroom_list'),
+    path('teacher/classrooms/<int:classroom_id>/students/', StudentListView.as_view(), name='classroom_student_list'),
+    path('teacher/classrooms/<int:classroom_id>/attendance/', AttendanceListView.as_view(), name='classroom_attendance_list'),
+    path('teacher/classrooms/<int:classroom_id>/attendance/mark/', AttendanceUpsertView.as_view(), name='classroom_attendance_mark'),
+    path('teacher/classrooms/<int:classroom_id>/attendance/ingest/', AttendanceIngestView.as_view(), name='classroom_attendance_ingest'),
+    path('teacher/classrooms/<int:classroom_id>/attendance/bulk/', BulkRangeAttendanceView.as_view(), name='classroom_bulk_attendance'),
+    path('teacher/classrooms/<int:classroom_id>/analytics/', ClassMonthlySummaryView.as_view(), name='classroom_analytics'),
+    path('teacher/classrooms/<int:classroom_id>/attendance/matrix/', ClassAttendanceMatrixView.as_view(), name='classroom_attendance_matrix'),
+    path('teacher/classrooms/<int:classroom_id>/attendance/changes/', AttendanceChangesView.as_view(), name='classroom_attendance_changes'),
+    path('teacher/classrooms/<int:classroom_id>/attendance/export/', AttendanceExportView.as_view(), name='classroom_attendance_export'),
+
+    # Async (ASGI) versions of the hot read endpoints, same paths under async/
+    path('async/student/attendance/', async_views.student_attendance, name='async_student_attendance_list'),
+    path('async/teacher/attendance/', async_views.attendance_list, name='async_attendance_list'),
+    path('async/teacher/classrooms/<int:classroom_id>/attendance/', async_views.attendance_list, name='async_classroom_attendance_list'),
+    path('async/teacher/analytics/class/', async_views.class_analytics, name='async_class_analytics'),
+    path('async/teacher/classrooms/<int:classroom_id>/analytics/', async_views.class_analytics, name='async_classroom_analytics'),
+    path('async/teacher/analytics/student/', async_views.student_analytics, name='async_student_analytics'),
+    path('async/teacher/attendance/events/', async_views.attendance_events, name='async_attendance_events'),
+    path('async/teacher/classrooms/<int:classroom_id>/attendance/events/', async_views.attendance_events, name='async_classroom_attendance_events'),
+    path('async/student/attendance/events/', async_views.attendance_events, name='async_student_attendance_events'),
+
+    # Operations
+    path('metrics/', MetricsView.as_view(), name='metrics'),
 ]
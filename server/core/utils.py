@@ -0,0 +1,30 @@
+from datetime import date
+
+from django.conf import settings
+
+
+def month_bounds(year, month):
+    """Half-open [first day, first day of next month) range for a month."""
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def parse_month(month_str):
+    """
+    Parse 'YYYY-MM' into half-open month bounds.
+    Raises ValueError on malformed input, like the views already expect.
+    """
+    year, month = map(int, month_str.split('-'))
+    return month_bounds(year, month)
+
+
+def academic_year(day):
+    """The academic year containing `day`, named after the calendar year it starts in."""
+    return day.year if day.month >= settings.ACADEMIC_YEAR_START_MONTH else day.year - 1
+
+
+def academic_year_bounds(year):
+    """Half-open [first day, first day of the next year) range for academic year `year`."""
+    start_month = settings.ACADEMIC_YEAR_START_MONTH
+    return date(year, start_month, 1), date(year + 1, start_month, 1)
@@ -2,11 +2,42 @@ from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
-from .serializers import UserSerializer, CustomTokenObtainPairSerializer, StudentSerializer, AttendanceRecordSerializer
-from .models import User, AttendanceRecord
-from django.db import transaction
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.parsers import MultiPartParser
+from .serializers import (
+    UserSerializer, CustomTokenObtainPairSerializer, StudentSerializer, AttendanceRecordSerializer, ClassroomSerializer,
+    JobSerializer,
+    record_values, serialize_record_rows,
+)
+from .models import User, AttendanceRecord, AttendanceTombstone, Classroom, Enrollment, Job
+from .attendance import (
+    AttendanceValidationError, parse_date, validate_roll_call, upsert_roll_call, records_changed,
+    backfill_dates, iter_backfill, mark_student_dates, parse_student_ids,
+)
+from .utils import parse_month
+from .analytics import class_summary, student_summary
+from .cache import cached_response, class_key, student_key
+from .metrics import registry as metrics_registry
+from .exports import ExportError, export_rows, iter_csv, write_parquet
+from .calendars import month_calendar, run_length, class_matrix
+from .renderers import optional_renderers
+from .sync import MAX_SYNC_LIMIT, SYNC_LIMIT, changes_since
+from .jobs import enqueue, save_upload
+from .ingest import ingest_roll_calls, parse_since
+from .imports import (
+    ATTENDANCE_COLUMNS, ROSTER_COLUMNS, ImportFormatError, import_attendance, import_roster, read_csv
+)
+from django.db.models import Count
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.contrib.auth.hashers import make_password
+from django.core.serializers.json import DjangoJSONEncoder
+import io
+import itertools
+import json
+import os
+import tempfile
 from datetime import datetime
-from django.db.models import Count, Q
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
@@ -18,25 +49,132 @@ class UserMeView(generics.RetrieveAPIView):
     def get_object(self):
         return self.request.user
 
-class StudentListView(generics.ListAPIView):
-    queryset = User.objects.filter(role=User.Role.STUDENT)
+class ClassroomScopeMixin:
+    """
+    Scopes a view to one classroom when it is routed under teacher/classrooms/<classroom_id>/.
+    Without the URL kwarg the view keeps its school-wide behaviour.
+    """
+    def get_classroom_id(self):
+        classroom_id = self.kwargs.get('classroom_id')
+        if classroom_id is not None and not Classroom.objects.filter(pk=classroom_id).exists():
+            raise NotFound('Classroom not found')
+        return classroom_id
+
+class BackgroundJobMixin:
+    """
+    ?background=1 stores the validated work as a core.jobs Job for `manage.py run_workers`
+    and answers 202 with the job, instead of doing the work in the request. With an
+    Idempotency-Key header, a retried request returns the job created by the first one.
+    """
+    def wants_background(self):
+        return self.request.query_params.get('background') in ('1', 'true')
+
+    def enqueue(self, kind, params, upload_path=None):
+        key = self.request.headers.get('Idempotency-Key')
+        job, created = enqueue(kind, params, self.request.user, key)
+        if not created and upload_path:
+            # The first request's copy of the file is the one that will be imported
+            os.remove(upload_path)
+        return Response(
+            JobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK,
+            headers={'Location': reverse('job_detail', args=[job.pk])},
+        )
+
+class FieldProjectionMixin:
+    """
+    Optional ?fields=a,b projection for list views.
+    Limits both the serialized fields and the columns loaded with .only().
+    """
+    fields_query_param = 'fields'
+
+    def get_projected_fields(self):
+        if not hasattr(self, '_projected_fields'):
+            self._projected_fields = None
+            raw = self.request.query_params.get(self.fields_query_param)
+            if raw:
+                requested = [name.strip() for name in raw.split(',') if name.strip()]
+                allowed = self.get_serializer_class().Meta.fields
+                unknown = [name for name in requested if name not in allowed]
+                if unknown:
+                    raise ValidationError({'fields': f'Unknown fields: {", ".join(unknown)}'})
+                self._projected_fields = requested
+        return self._projected_fields
+
+    def project_queryset(self, queryset):
+        fields = self.get_projected_fields()
+        if fields is None:
+            return queryset
+        serializer = self.get_serializer_class()()
+        columns = {'pk', *getattr(self, 'keyset_ordering', ())}
+        related = set()
+        for name in fields:
+            source = serializer.fields[name].source.replace('.', '__')
+            columns.add(source)
+            if '__' in source:
+                related.add(source.split('__')[0])
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*(column for column in columns if column != 'pk'))
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_projected_fields()
+        if fields is not None:
+            kwargs['fields'] = fields
+        return super().get_serializer(*args, **kwargs)
+
+class FastRecordListMixin:
+    """
+    List AttendanceRecords via .values() with the student columns joined in,
+    bypassing model instantiation and DRF field serialization. Output matches
+    AttendanceRecordSerializer, including ?fields= projection and pagination.
+    """
+    def list(self, request, *args, **kwargs):
+        fields = self.get_projected_fields()
+        rows = record_values(self.get_queryset(), fields, extra=getattr(self, 'keyset_ordering', ()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serialize_record_rows(page, fields))
+        return Response(serialize_record_rows(rows, fields))
+
+class ClassroomListView(generics.ListAPIView):
+    serializer_class = ClassroomSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return Classroom.objects.annotate(student_count=Count('enrollments')).order_by('name')
+
+class StudentListView(FieldProjectionMixin, ClassroomScopeMixin, generics.ListAPIView):
     serializer_class = StudentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('id',)
 
-class AttendanceListView(generics.ListAPIView):
+    def get_queryset(self):
+        students = User.objects.filter(role=User.Role.STUDENT)
+        classroom_id = self.get_classroom_id()
+        if classroom_id is not None:
+            students = students.filter(enrollments__classroom_id=classroom_id)
+        return self.project_queryset(students)
+
+class AttendanceListView(FastRecordListMixin, FieldProjectionMixin, ClassroomScopeMixin, generics.ListAPIView):
     serializer_class = AttendanceRecordSerializer
     permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('date', 'id')
 
     def get_queryset(self):
         date = self.request.query_params.get('date')
         if not date:
             return AttendanceRecord.objects.none()
-        return AttendanceRecord.objects.filter(date=date)
+        records = AttendanceRecord.objects.filter(date=date).select_related('student')
+        classroom_id = self.get_classroom_id()
+        if classroom_id is not None:
+            records = records.filter(student__enrollments__classroom_id=classroom_id)
+        return self.project_queryset(records)
 
-class AttendanceUpsertView(APIView):
+class AttendanceUpsertView(ClassroomScopeMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
 
-    def post(self, request):
+    def post(self, request, *args, **kwargs):
         # Expects: { date: 'YYYY-MM-DD', records: [ { student_id: 1, status: 'PRESENT' }, ... ] }
         date = request.data.get('date')
         records = request.data.get('records', [])
@@ -44,36 +182,44 @@ class AttendanceUpsertView(APIView):
         if not date:
             return Response({'error': 'Date is required'}, status=400)
 
-        response_data = []
-        
-        with transaction.atomic():
-            for record in records:
-                student_id = record.get('student_id')
-                status = record.get('status')
-                
-                if not student_id or not status:
-                    continue
+        try:
+            date = parse_date(date)
+            statuses = validate_roll_call(records, classroom_id=self.get_classroom_id())
+        except AttendanceValidationError as e:
+            return Response({'error': 'Invalid attendance records', 'details': e.errors}, status=400)
 
-                obj, created = AttendanceRecord.objects.update_or_create(
-                    date=date,
-                    student_id=student_id,
-                    defaults={
-                        'status': status,
-                        'marked_by': request.user
-                    }
-                )
-                response_data.append(AttendanceRecordSerializer(obj).data)
-        
-        return Response(response_data)
+        written = upsert_roll_call(date, statuses, request.user)
+        return Response(AttendanceRecordSerializer(written, many=True).data)
+
+class AttendanceIngestView(ClassroomScopeMixin, APIView):
+    """
+    Batched, idempotent roll calls from offline clients (see core.ingest).
+    POST { roll_calls: [ { key, date, records: [ { student_id, status } ], if_unmodified_since } ] },
+    optionally with an If-Unmodified-Since header for every roll call.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        if request.user.role != User.Role.TEACHER:
+            return Response({'error': 'Only teachers can perform this action'}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            since = parse_since(request.headers.get('If-Unmodified-Since'))
+            results = ingest_roll_calls(
+                request.data.get('roll_calls'), request.user, classroom_id=self.get_classroom_id(), since=since
+            )
+        except AttendanceValidationError as e:
+            return Response({'error': 'Invalid roll-call batch', 'details': e.errors}, status=400)
+        return Response({'results': results})
 
 # Student APIs
-class StudentAttendanceListView(generics.ListAPIView):
+class StudentAttendanceListView(FastRecordListMixin, FieldProjectionMixin, generics.ListAPIView):
     """
     Get attendance records for the authenticated student for a specific month.
     Query parameter: month (YYYY-MM format)
     """
     serializer_class = AttendanceRecordSerializer
     permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('date', 'id')
 
     def get_queryset(self):
         user = self.request.user
@@ -88,19 +234,116 @@ class StudentAttendanceListView(generics.ListAPIView):
         
         try:
             # Parse month (YYYY-MM format)
-            year, month_num = month.split('-')
-            year = int(year)
-            month_num = int(month_num)
+            start, end = parse_month(month)
             
             # Filter by student and month
-            return AttendanceRecord.objects.filter(
+            return self.project_queryset(AttendanceRecord.objects.filter(
                 student=user,
-                date__year=year,
-                date__month=month_num
-            ).order_by('date')
+                date__gte=start,
+                date__lt=end
+            ).select_related('student').order_by('date'))
         except (ValueError, AttributeError):
             return AttendanceRecord.objects.none()
 
+class StudentAttendanceCalendarView(APIView):
+    """
+    Compact month calendar: present/absent bitmasks (bit d-1 = day d), plus sparse
+    maps of absence reasons and absent record ids keyed by day.
+    Query parameters: month (YYYY-MM), encoding (bits, the default, or rle to get a
+    'runs' string such as 'U2P3A1' instead of the masks), student_id (teachers only).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        month_str = request.query_params.get('month')
+        if not month_str:
+            return Response({'error': 'Month parameter is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if user.role == User.Role.TEACHER:
+            student_id = request.query_params.get('student_id')
+            if not student_id:
+                return Response({'error': 'student_id is required'}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            student_id = user.id
+
+        try:
+            start, end = parse_month(month_str)
+            student_id = int(student_id)
+        except ValueError:
+            return Response({'error': 'Invalid format'}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = month_calendar(student_id, start, end)
+        if request.query_params.get('encoding') == 'rle':
+            data['runs'] = run_length(data.pop('present'), data.pop('absent'), data['days'])
+        return Response(data)
+
+class ClassAttendanceMatrixView(ClassroomScopeMixin, APIView):
+    """
+    A classroom's month as a students x days grid, in one query.
+    Column-oriented: parallel student_id/username/first_name/last_name lists and a
+    `status` string per student where character d-1 is day d (P, A or U for unmarked).
+    Query parameter: month (YYYY-MM). Send `Accept: application/msgpack` for
+    MessagePack when msgpack is installed.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = optional_renderers()
+
+    def get(self, request, *args, **kwargs):
+        user = request.user
+        if user.role != User.Role.TEACHER:
+            return Response({'error': 'Only teachers can access this data'}, status=status.HTTP_403_FORBIDDEN)
+
+        month_str = request.query_params.get('month')
+        if not month_str:
+            return Response({'error': 'Month parameter is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            start, end = parse_month(month_str)
+        except ValueError:
+            return Response({'error': 'Invalid month format. Use YYYY-MM'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(class_matrix(self.get_classroom_id(), start, end))
+
+class AttendanceChangesView(ClassroomScopeMixin, APIView):
+    """
+    Change feed: attendance records created, updated or deleted since `cursor`.
+    Returns {changed, deleted, cursor, has_more}; poll again with the returned cursor
+    (immediately while has_more is true). Students see their own records; teachers see
+    everyone's, or one classroom's when routed under it.
+    Query parameters: cursor, limit, start and end (YYYY-MM-DD, inclusive, optional).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        user = request.user
+        records = AttendanceRecord.objects.all()
+        tombstones = AttendanceTombstone.objects.all()
+        if user.role == User.Role.TEACHER:
+            classroom_id = self.get_classroom_id()
+            if classroom_id is not None:
+                records = records.filter(student__enrollments__classroom_id=classroom_id)
+                tombstones = tombstones.filter(
+                    student_id__in=Enrollment.objects.filter(classroom_id=classroom_id).values('student_id')
+                )
+        else:
+            records = records.filter(student=user)
+            tombstones = tombstones.filter(student_id=user.id)
+
+        try:
+            for param, lookup in (('start', 'date__gte'), ('end', 'date__lte')):
+                if request.query_params.get(param):
+                    day = parse_date(request.query_params[param])
+                    records = records.filter(**{lookup: day})
+                    tombstones = tombstones.filter(**{lookup: day})
+        except AttendanceValidationError:
+            return Response({'error': 'Invalid date format. Use YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.query_params.get('limit', SYNC_LIMIT)), 1), MAX_SYNC_LIMIT)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(changes_since(records, tombstones, request.query_params.get('cursor'), limit))
+
 class StudentAbsenceReasonUpdateView(generics.UpdateAPIView):
     """
     Update absence reason for a specific attendance record.
@@ -119,7 +362,7 @@ class StudentAbsenceReasonUpdateView(generics.UpdateAPIView):
             return AttendanceRecord.objects.none()
         
         # Only return records that belong to this student
-        return AttendanceRecord.objects.filter(student=user)
+        return AttendanceRecord.objects.filter(student=user).select_related('student')
     
     def update(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -135,19 +378,21 @@ class StudentAbsenceReasonUpdateView(generics.UpdateAPIView):
         absence_reason = request.data.get('absence_reason', '')
         instance.absence_reason = absence_reason
         instance.save()
+        records_changed([instance.student_id], [instance.date])
         
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
 # Teacher Analytics APIs
-class ClassMonthlySummaryView(APIView):
+class ClassMonthlySummaryView(ClassroomScopeMixin, APIView):
     """
     Get aggregated attendance stats for the entire class for a specific month.
     Query parameter: month (YYYY-MM format)
+    Routed under a classroom, only that classroom's enrolled students are counted.
     """
     permission_classes = [permissions.IsAuthenticated]
 
-    def get(self, request):
+    def get(self, request, *args, **kwargs):
         user = request.user
         if user.role != User.Role.TEACHER:
             return Response({'error': 'Only teachers can access this data'}, status=status.HTTP_403_FORBIDDEN)
@@ -157,53 +402,18 @@ class ClassMonthlySummaryView(APIView):
             return Response({'error': 'Month parameter is required'}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            year, month = map(int, month_str.split('-'))
-            
-            # Get all records for this month
-            records = AttendanceRecord.objects.filter(
-                date__year=year,
-                date__month=month
-            )
+            start, end = parse_month(month_str)
+            classroom_id = self.get_classroom_id()
 
-            # Overall stats
-            total_records = records.count()
-            present_count = records.filter(status=AttendanceRecord.Status.PRESENT).count()
-            absent_count = records.filter(status=AttendanceRecord.Status.ABSENT).count()
-            attendance_rate = (present_count / total_records * 100) if total_records > 0 else 0
-
-            # Daily breakdown
-            # We want to group by date. 
-            # Since we are using simple Django ORM, let's just iterate or use values().
-            # values('date') will group by date if we annotate.
-            from django.db.models import Count, Q
-            
-            daily_stats = records.values('date').annotate(
-                present=Count('id', filter=Q(status=AttendanceRecord.Status.PRESENT)),
-                absent=Count('id', filter=Q(status=AttendanceRecord.Status.ABSENT)),
-                total=Count('id')
-            ).order_by('date')
-
-            # Format daily stats
-            daily_breakdown = []
-            for day in daily_stats:
-                rate = (day['present'] / day['total'] * 100) if day['total'] > 0 else 0
-                daily_breakdown.append({
-                    'date': day['date'],
-                    'present': day['present'],
-                    'absent': day['absent'],
-                    'rate': round(rate, 1)
-                })
+            def compute():
+                overview, daily_breakdown = class_summary(start, end, classroom_id)
+                return {
+                    'month': f'{start:%Y-%m}',
+                    'overview': overview,
+                    'daily': daily_breakdown
+                }
 
-            return Response({
-                'month': month_str,
-                'overview': {
-                    'total_records': total_records,
-                    'present': present_count,
-                    'absent': absent_count,
-                    'attendance_rate': round(attendance_rate, 1)
-                },
-                'daily': daily_breakdown
-            })
+            return cached_response(request, class_key(start, classroom_id), start, compute)
 
         except ValueError:
             return Response({'error': 'Invalid month format. Use YYYY-MM'}, status=status.HTTP_400_BAD_REQUEST)
@@ -227,46 +437,28 @@ class StudentMonthlySummaryView(APIView):
             return Response({'error': 'Month and student_id are required'}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            year, month = map(int, month_str.split('-'))
-            
-            records = AttendanceRecord.objects.filter(
-                student_id=student_id,
-                date__year=year,
-                date__month=month
-            ).order_by('date')
-
-            if not records.exists():
-                # Check if student exists just to be sure? Or just return empty stats.
-                # Returning empty stats is fine.
-                pass
+            start, end = parse_month(month_str)
+            student_id = int(student_id)
 
-            total = records.count()
-            present = records.filter(status=AttendanceRecord.Status.PRESENT).count()
-            absent = records.filter(status=AttendanceRecord.Status.ABSENT).count()
-            rate = (present / total * 100) if total > 0 else 0
+            def compute():
+                stats, absences = student_summary(student_id, start, end)
+                return {
+                    'student_id': student_id,
+                    'month': f'{start:%Y-%m}',
+                    'stats': stats,
+                    'absences': absences
+                }
 
-            # List absences with reasons
-            absences = records.filter(status=AttendanceRecord.Status.ABSENT).values('id', 'date', 'absence_reason')
-
-            return Response({
-                'student_id': student_id,
-                'month': month_str,
-                'stats': {
-                    'total': total,
-                    'present': present,
-                    'absent': absent,
-                    'rate': round(rate, 1)
-                },
-                'absences': list(absences)
-            })
+            return cached_response(request, student_key(start, student_id), start, compute)
 
         except ValueError:
             return Response({'error': 'Invalid format'}, status=status.HTTP_400_BAD_REQUEST)
 
-class BulkAttendanceView(APIView):
+class BulkAttendanceView(BackgroundJobMixin, APIView):
     """
     Mark attendance for a specific student for an entire month.
     POST parameters: student_id, month (YYYY-MM), status (PRESENT/ABSENT), overwrite (bool)
+    With ?background=1 the marks are made by a background job.
     """
     permission_classes = [permissions.IsAuthenticated]
 
@@ -312,44 +504,250 @@ class BulkAttendanceView(APIView):
             if not dates:
                 return Response({'error': 'No valid dates to mark (cannot mark future months)'}, status=status.HTTP_400_BAD_REQUEST)
 
-            with transaction.atomic():
-                if overwrite:
-                    # Delete existing records for VALID dates only
-                    AttendanceRecord.objects.filter(
-                        student_id=student_id,
-                        date__in=dates
-                    ).delete()
-                    
-                    final_dates_to_create = dates
-                else:
-                    # Find existing records for the month/dates we are about to mark
-                    existing_dates = AttendanceRecord.objects.filter(
-                        student_id=student_id,
-                        date__in=dates
-                    ).values_list('date', flat=True)
-                    
-                    # Filter out dates that already have records
-                    final_dates_to_create = [d for d in dates if d not in existing_dates]
-
-                # Bulk create new records
-                records_to_create = [
-                    AttendanceRecord(
-                        student_id=student_id,
-                        date=d,
-                        status=status_val,
-                        marked_by=user
-                    ) for d in final_dates_to_create
-                ]
-                
-                if records_to_create:
-                    AttendanceRecord.objects.bulk_create(records_to_create)
+            if self.wants_background():
+                return self.enqueue('bulk_attendance', {
+                    'student_id': student_id, 'dates': dates, 'status': status_val, 'overwrite': overwrite,
+                })
+
+            created = mark_student_dates(student_id, dates, status_val, user, overwrite)
 
             return Response({
-                'message': f'Successfully marked {len(records_to_create)} days as {status_val}',
-                'count': len(records_to_create)
+                'message': f'Successfully marked {created} days as {status_val}',
+                'count': created
             })
 
         except ValueError:
             return Response({'error': 'Invalid month format. Use YYYY-MM'}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class BulkRangeAttendanceView(BackgroundJobMixin, ClassroomScopeMixin, APIView):
+    """
+    Mark attendance for many students over an arbitrary date range.
+    POST parameters: student_ids (list) or classroom_id, start_date, end_date (YYYY-MM-DD),
+    status (PRESENT/ABSENT), overwrite (bool), exclude_weekdays (list of 0-6, 0=Monday),
+    holidays (list of YYYY-MM-DD).
+    Streams NDJSON progress, one line per chunk and a final line with "done": true,
+    or with ?background=1 runs as a background job.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        user = request.user
+        if user.role != User.Role.TEACHER:
+            return Response({'error': 'Only teachers can perform this action'}, status=status.HTTP_403_FORBIDDEN)
+
+        student_ids = request.data.get('student_ids')
+        classroom_id = self.get_classroom_id() or request.data.get('classroom_id')
+        status_val = request.data.get('status')
+        overwrite = request.data.get('overwrite', True)
+
+        if status_val not in [AttendanceRecord.Status.PRESENT, AttendanceRecord.Status.ABSENT]:
+            return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            start = parse_date(request.data.get('start_date'))
+            end = parse_date(request.data.get('end_date'))
+            holidays = [parse_date(d) for d in request.data.get('holidays', [])]
+            exclude_weekdays = [int(d) for d in request.data.get('exclude_weekdays', [])]
+        except (AttendanceValidationError, TypeError, ValueError):
+            return Response({'error': 'Invalid dates, holidays or exclude_weekdays'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if end < start:
+            return Response({'error': 'end_date must not be before start_date'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if student_ids is not None and not (isinstance(student_ids, list) and student_ids):
+            return Response({'error': 'student_ids must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        if not student_ids and not classroom_id:
+            return Response({'error': 'student_ids or classroom_id is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if student_ids:
+            try:
+                student_ids = parse_student_ids(student_ids)
+            except AttendanceValidationError as e:
+                return Response({'error': 'Invalid student_ids', 'details': e.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        students = User.objects.filter(role=User.Role.STUDENT)
+        if classroom_id:
+            students = students.filter(enrollments__classroom_id=classroom_id)
+        if student_ids:
+            students = students.filter(id__in=student_ids)
+
+        try:
+            resolved_ids = list(students.order_by('id').values_list('id', flat=True))
+        except (TypeError, ValueError):
+            return Response({'error': 'Invalid student_ids or classroom_id'}, status=status.HTTP_400_BAD_REQUEST)
+        if student_ids and len(resolved_ids) != len(student_ids):
+            return Response({'error': 'Unknown student in student_ids'}, status=status.HTTP_400_BAD_REQUEST)
+
+        dates = backfill_dates(start, end, exclude_weekdays, holidays)
+        if not dates:
+            return Response({'error': 'No valid dates to mark (cannot mark future dates)'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if self.wants_background():
+            return self.enqueue('backfill', {
+                'student_ids': resolved_ids, 'dates': dates, 'status': status_val, 'overwrite': overwrite,
+            })
+
+        progress = iter_backfill(resolved_ids, dates, status_val, user, overwrite=overwrite)
+        lines = (json.dumps(event, cls=DjangoJSONEncoder) + '\n' for event in progress)
+        return StreamingHttpResponse(lines, content_type='application/x-ndjson')
+
+class AttendanceExportView(BackgroundJobMixin, ClassroomScopeMixin, APIView):
+    """
+    Stream attendance for a date range as CSV (default) or Parquet.
+    Query parameters: start, end (YYYY-MM-DD, inclusive), classroom_id (optional),
+    output (csv/parquet). `format` is reserved by DRF content negotiation.
+    POST with the same query parameters writes the file in a background job instead,
+    downloadable from the job once it has finished.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        return self.get(request, *args, background=True, **kwargs)
+
+    def get(self, request, *args, background=False, **kwargs):
+        user = request.user
+        if user.role != User.Role.TEACHER:
+            return Response({'error': 'Only teachers can export attendance'}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            start = parse_date(request.query_params.get('start'))
+            end = parse_date(request.query_params.get('end'))
+        except AttendanceValidationError:
+            return Response({'error': 'start and end are required (YYYY-MM-DD)'}, status=status.HTTP_400_BAD_REQUEST)
+        if end < start:
+            return Response({'error': 'end must not be before start'}, status=status.HTTP_400_BAD_REQUEST)
+
+        classroom_id = self.get_classroom_id() or request.query_params.get('classroom_id')
+        if classroom_id is not None:
+            try:
+                classroom_id = int(classroom_id)
+            except ValueError:
+                return Response({'error': 'classroom_id must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        output = request.query_params.get('output', 'csv')
+        if background:
+            if output not in ('csv', 'parquet'):
+                return Response({'error': 'output must be csv or parquet'}, status=status.HTTP_400_BAD_REQUEST)
+            return self.enqueue('export', {'start': start, 'end': end, 'classroom_id': classroom_id, 'output': output})
+        filename = f'attendance_{start}_{end}'
+        rows = export_rows(start, end, classroom_id)
+
+        if output == 'csv':
+            response = StreamingHttpResponse(iter_csv(rows), content_type='text/csv')
+            response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+            return response
+        if output == 'parquet':
+            spool = tempfile.TemporaryFile()
+            try:
+                write_parquet(rows, spool)
+            except ExportError as e:
+                spool.close()
+                return Response({'error': str(e)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+            spool.seek(0)
+            return FileResponse(spool, as_attachment=True, filename=f'{filename}.parquet',
+                                content_type='application/vnd.apache.parquet')
+        return Response({'error': 'output must be csv or parquet'}, status=status.HTTP_400_BAD_REQUEST)
+
+class CSVImportView(BackgroundJobMixin, APIView):
+    """
+    Import a roster or historical attendance from an uploaded CSV (multipart field `file`).
+    Optional form fields: start_row (resume after this data row), password (roster: initial
+    password for new users). Streams NDJSON progress, one line per batch with its per-row
+    errors and a final line with "done": true. With ?background=1 the file is imported by a
+    background job, whose result collects the per-row errors.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser]
+    kind = 'attendance'
+
+    def post(self, request, *args, **kwargs):
+        user = request.user
+        if user.role != User.Role.TEACHER:
+            return Response({'error': 'Only teachers can import data'}, status=status.HTTP_403_FORBIDDEN)
+
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'A CSV file is required in the "file" field'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            start_row = int(request.data.get('start_row', 0))
+        except (TypeError, ValueError):
+            return Response({'error': 'start_row must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if self.wants_background():
+            return self.enqueue_import(upload, start_row)
+
+        text = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        try:
+            if self.kind == 'roster':
+                rows = read_csv(text, ROSTER_COLUMNS, start_row)
+            else:
+                rows = read_csv(text, ATTENDANCE_COLUMNS, start_row)
+            # Prime the generator so header errors surface as a 400, not mid-stream
+            first = next(rows, None)
+        except (ImportFormatError, UnicodeDecodeError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        rows = itertools.chain([first] if first else [], rows)
+
+        if self.kind == 'roster':
+            progress = import_roster(rows, password=request.data.get('password') or None)
+        else:
+            progress = import_attendance(rows, user)
+        lines = (json.dumps(event, cls=DjangoJSONEncoder) + '\n' for event in progress)
+        return StreamingHttpResponse(lines, content_type='application/x-ndjson')
+
+    def enqueue_import(self, upload, start_row):
+        columns = ROSTER_COLUMNS if self.kind == 'roster' else ATTENDANCE_COLUMNS
+        path = save_upload(upload)
+        try:
+            # Check the header now so a bad file is a 400, not a failed job
+            with open(path, encoding='utf-8-sig', newline='') as f:
+                next(read_csv(f, columns), None)
+        except (ImportFormatError, UnicodeDecodeError) as e:
+            os.remove(path)
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        params = {'path': path, 'start_row': start_row}
+        if self.kind == 'roster' and self.request.data.get('password'):
+            # Jobs store the hash, never the password itself
+            params['password_hash'] = make_password(self.request.data['password'])
+        return self.enqueue(f'import_{self.kind}', params, upload_path=path)
+
+class JobListView(generics.ListAPIView):
+    """The requesting teacher's background jobs, newest first."""
+    serializer_class = JobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('-id',)
+
+    def get_queryset(self):
+        return Job.objects.filter(created_by=self.request.user).order_by('-id')
+
+class JobDetailView(generics.RetrieveAPIView):
+    """Status, progress and result of one of the requesting teacher's jobs."""
+    serializer_class = JobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return Job.objects.filter(created_by=self.request.user)
+
+class JobDownloadView(APIView):
+    """The file written by a finished export job."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        job = Job.objects.filter(created_by=request.user, pk=pk).first()
+        if job is None:
+            raise NotFound('Job not found')
+        result = job.result or {}
+        if job.status != Job.Status.SUCCEEDED or not result.get('file'):
+            return Response({'error': 'This job has no file to download'}, status=status.HTTP_409_CONFLICT)
+        try:
+            handle = open(result['file'], 'rb')
+        except FileNotFoundError:
+            return Response({'error': 'The file is no longer available'}, status=status.HTTP_410_GONE)
+        return FileResponse(handle, as_attachment=True, filename=result['filename'])
+
+class MetricsView(APIView):
+    """Per-view request metrics in Prometheus text format. Admin (is_staff) only."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return HttpResponse(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')